@@ -0,0 +1,74 @@
+# benchmarks/bench_ingest.py
+"""
+Throughput of reading and parsing a command file: the previous text-mode
+open()/strip()/parse() loop against mmap-based ingest.iter_commands(),
+which splits, filters and parses whole blocks.
+
+    PYTHONPATH=src python benchmarks/bench_ingest.py [megabytes]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from toy_robot.command import CommandParser, Direction
+from toy_robot.ingest import iter_commands
+
+
+def write_workload(path: str, megabytes: int, seed: int = 0):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(10_000):
+        r = rng.random()
+        if r < 0.1:
+            lines.append("# generated comment line")
+        elif r < 0.15:
+            lines.append("")
+        elif r < 0.3:
+            lines.append(f"PLACE {rng.randint(0, 4)},{rng.randint(0, 4)},{rng.choice(list(Direction)).name}")
+        else:
+            lines.append(rng.choice(["MOVE", "LEFT", "RIGHT", "REPORT"]))
+    block = ("\n".join(lines) + "\n").encode()
+    with open(path, "wb") as f:
+        for _ in range(max(1, megabytes * (1 << 20) // len(block))):
+            f.write(block)
+
+
+def text_loop(path: str) -> int:
+    n = 0
+    with open(path, "r") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            CommandParser.parse(line)
+            n += 1
+    return n
+
+
+def mmap_loop(path: str) -> int:
+    n = 0
+    for _ in iter_commands(path):
+        n += 1
+    return n
+
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cmds.txt")
+        write_workload(path, megabytes)
+        size = os.path.getsize(path)
+        results = {}
+        for name, fn in [("text-mode loop", text_loop), ("mmap ingest", mmap_loop)]:
+            start = time.perf_counter()
+            n = fn(path)
+            elapsed = time.perf_counter() - start
+            results[name] = n
+            print(f"{name:16s} {size / elapsed / (1 << 20):8.1f} MB/s  {n / elapsed:12,.0f} commands/sec")
+        assert len(set(results.values())) == 1
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_parser.py
+"""
+Lines/sec of CommandParser.parse against the previous two-pass parser
+(is_valid() followed by a second strip/upper/split).
+
+    PYTHONPATH=src python benchmarks/bench_parser.py
+"""
+import random
+import time
+from typing import Optional
+
+from toy_robot.command import Command, CommandType, CommandParser, Direction
+
+
+def legacy_parse(cmd: str) -> Optional[Command]:
+    if not CommandParser.is_valid(cmd):
+        return None
+
+    s = cmd.strip().upper()
+    if s in CommandParser.SIMPLE_CMDS:
+        return Command(type=CommandParser.SIMPLE_CMDS[s])
+    if s.startswith("PLACE"):
+        parts = s.split(None, 1)
+        tokens = [p.strip() for p in parts[1].split(",")]
+        return Command(type=CommandType.PLACE, x=int(tokens[0]), y=int(tokens[1]), facing=Direction[tokens[2]])
+
+
+def workload(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    simple = ["MOVE", "LEFT", "RIGHT", "REPORT", "move", " report "]
+    lines = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.25:
+            lines.append(f"PLACE {rng.randint(0, 4)},{rng.randint(0, 4)},{rng.choice(list(Direction)).name}")
+        elif r < 0.95:
+            lines.append(rng.choice(simple))
+        else:
+            lines.append(rng.choice(["JUMP", "PLACE 1,2", "MOVE 3", "PLACE x,1,NORTH"]))
+    return lines
+
+
+def bench(fn, lines, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            fn(line)
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+
+def main():
+    lines = workload(200_000)
+    as_bytes = [line.encode() for line in lines]
+    assert [legacy_parse(l) for l in lines] == [CommandParser.parse(l) for l in lines]
+
+    base = bench(legacy_parse, lines)
+    for name, fn, data in [
+        ("legacy parse (str)", legacy_parse, lines),
+        ("parse (str)", CommandParser.parse, lines),
+        ("parse (bytes)", CommandParser.parse, as_bytes),
+    ]:
+        rate = bench(fn, data)
+        print(f"{name:20s} {rate:12,.0f} lines/sec  x{rate / base:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# benchmarks/suite.py
+"""
+Throughput benchmarks for the parser, the robot engine and the CLI.
+
+Every (target, workload) pair runs in a fresh interpreter so that its
+peak RSS is its own. Results are lines/sec, ns per line and peak RSS, and
+can be saved as JSON and compared with a stored baseline:
+
+    PYTHONPATH=src python benchmarks/suite.py --save baseline.json
+    PYTHONPATH=src python benchmarks/suite.py --baseline baseline.json --tolerance 0.15
+
+With --baseline, the exit status is 1 if any benchmark got slower than
+the tolerance allows.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [HERE, os.path.join(HERE, "..", "src")]
+
+from toy_robot import Robot, CommandParser, ParseCache
+from toy_robot.cli import OutputBuffer, SUMMARY, VERBOSE, run_file
+from workloads import WORKLOADS, Workload
+
+TARGETS = ["is_valid", "parse", "parse_bytes", "execute", "cli_summary", "cli_summary_cache", "cli_verbose"]
+
+
+class NullStream:
+    def write(self, text: str):
+        pass
+
+
+def _prepare(target: str, workload: Workload, tmp: str) -> Callable[[], None]:
+    """Set up one benchmark and return the function to time."""
+    lines = workload.lines
+    if target == "is_valid":
+        return lambda: [CommandParser.is_valid(line) for line in lines]
+    if target == "parse":
+        return lambda: [CommandParser.parse(line) for line in lines]
+    if target == "parse_bytes":
+        encoded = [line.encode() for line in lines]
+        return lambda: [CommandParser.parse(line) for line in encoded]
+    if target == "execute":
+        commands = [c for c in map(CommandParser.parse, lines) if c is not None]
+
+        def run():
+            execute = Robot(workload.table).execute_command
+            for cmd in commands:
+                execute(cmd)
+        return run
+    if target.startswith("cli_"):
+        path = os.path.join(tmp, "commands.txt")
+        with open(path, "w") as f:
+            f.write(workload.text())
+        mode = VERBOSE if target == "cli_verbose" else SUMMARY
+        if target == "cli_summary_cache":
+            return lambda: run_file(path, mode, OutputBuffer(NullStream()), workload.table, cache=ParseCache(64))
+        return lambda: run_file(path, mode, OutputBuffer(NullStream()), workload.table)
+    raise ValueError(f"unknown target: {target}")
+
+
+def run_one(target: str, workload_name: str, lines: int, seed: int, repeat: int) -> Dict:
+    workload = WORKLOADS[workload_name](lines, seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        fn = _prepare(target, workload, tmp)
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    return {
+        "lines": lines,
+        "seconds": best,
+        "lines_per_sec": lines / best,
+        "ns_per_line": best / lines * 1e9,
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // (1024 if sys.platform == "darwin" else 1),
+    }
+
+
+def run_suite(targets: List[str], workloads: List[str], lines: int, seed: int, repeat: int) -> Dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.join(HERE, "..", "src"), os.environ.get("PYTHONPATH", "")]))
+    results = {}
+    for target in targets:
+        for workload in workloads:
+            name = f"{target}:{workload}"
+            out = subprocess.run(
+                [sys.executable, __file__, "--one", name, "--lines", str(lines), "--seed", str(seed),
+                 "--repeat", str(repeat)],
+                check=True, capture_output=True, text=True, env=env,
+            )
+            results[name] = json.loads(out.stdout)
+            r = results[name]
+            print(f"{name:32s} {r['lines_per_sec']:14,.0f} lines/s {r['ns_per_line']:10,.0f} ns/line "
+                  f"{r['peak_rss_kb'] / 1024:8.1f} MiB", file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "lines": lines,
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Names (with details) of benchmarks slower than baseline by more than `tolerance`."""
+    regressions = []
+    for name, base in baseline["results"].items():
+        now = current["results"].get(name)
+        if now is None:
+            continue
+        ratio = now["lines_per_sec"] / base["lines_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append(f"{name}: {ratio:.2f}x of baseline "
+                               f"({now['lines_per_sec']:,.0f} vs {base['lines_per_sec']:,.0f} lines/s)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", default=",".join(TARGETS), help="comma-separated subset of " + ",".join(TARGETS))
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help="comma-separated subset of " + ",".join(WORKLOADS))
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", metavar="JSON", help="write results to this file")
+    parser.add_argument("--baseline", metavar="JSON", help="compare with results saved earlier")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown against the baseline")
+    parser.add_argument("--one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.one:
+        target, workload = args.one.split(":")
+        print(json.dumps(run_one(target, workload, args.lines, args.seed, args.repeat)))
+        return
+
+    current = run_suite(args.targets.split(","), args.workloads.split(","), args.lines, args.seed, args.repeat)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
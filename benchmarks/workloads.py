@@ -0,0 +1,78 @@
+# benchmarks/workloads.py
+"""Seeded synthetic command scripts for the benchmark suite."""
+import random
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+from toy_robot import Table
+from toy_robot.command import Direction
+
+FACING_NAMES = [d.name for d in Direction]
+SIMPLE = ["MOVE", "LEFT", "RIGHT", "REPORT"]
+INVALID = ["JUMP", "PLACE 1,2", "MOVE 3", "PLACE x,1,NORTH", "PLACE 1,2,UP", "REPORT NOW", "PLACE1,2,NORTH"]
+
+
+@dataclass
+class Workload:
+    name: str
+    lines: List[str]
+    table: Table
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _place(rng: random.Random, table: Table) -> str:
+    return f"PLACE {rng.randrange(table.width)},{rng.randrange(table.height)},{rng.choice(FACING_NAMES)}"
+
+
+def place_heavy(n: int, seed: int) -> Workload:
+    rng, table = random.Random(seed), Table()
+    lines = [_place(rng, table) if rng.random() < 0.8 else rng.choice(SIMPLE) for _ in range(n)]
+    return Workload("place_heavy", lines, table)
+
+
+def move_heavy(n: int, seed: int) -> Workload:
+    rng, table = random.Random(seed), Table()
+    lines = [_place(rng, table)]
+    for _ in range(n - 1):
+        r = rng.random()
+        lines.append("MOVE" if r < 0.7 else rng.choice(["LEFT", "RIGHT"]) if r < 0.95 else "REPORT")
+    return Workload("move_heavy", lines, table)
+
+
+def mostly_invalid(n: int, seed: int) -> Workload:
+    rng, table = random.Random(seed), Table()
+    lines = [rng.choice(INVALID) if rng.random() < 0.9 else rng.choice(SIMPLE) for _ in range(n)]
+    return Workload("mostly_invalid", lines, table)
+
+
+def comment_heavy(n: int, seed: int) -> Workload:
+    rng, table = random.Random(seed), Table()
+    lines = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.6:
+            lines.append("# " + "generated comment " * rng.randint(1, 4))
+        elif r < 0.7:
+            lines.append("")
+        elif r < 0.75:
+            lines.append(_place(rng, table))
+        else:
+            lines.append(rng.choice(SIMPLE))
+    return Workload("comment_heavy", lines, table)
+
+
+def large_table(n: int, seed: int) -> Workload:
+    rng, table = random.Random(seed), Table(width=100_000, height=100_000)
+    lines = [_place(rng, table) if rng.random() < 0.05 else rng.choice(SIMPLE) for _ in range(n)]
+    return Workload("large_table", lines, table)
+
+
+WORKLOADS: Dict[str, Callable[[int, int], Workload]] = {
+    "place_heavy": place_heavy,
+    "move_heavy": move_heavy,
+    "mostly_invalid": mostly_invalid,
+    "comment_heavy": comment_heavy,
+    "large_table": large_table,
+}
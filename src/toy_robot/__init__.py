@@ -1,4 +1,3 @@
-# src/toy_robot/__init__.py
-from .robot import Robot, Table, main
-from .command import Position, Direction, Command, CommandType, CommandParser
-
+from .robot import Robot, RunResult, Table, main
+from .command import Position, Direction, Command, CommandType, CommandParser, ParseCache
+from .program import CompiledProgram
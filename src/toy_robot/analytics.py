@@ -0,0 +1,209 @@
+# analytics.py
+"""
+Coverage and movement statistics for long command streams, using NumPy.
+
+A pass over the commands records only their kinds and the valid PLACEs.
+Facings come from one cumulative sum of the turns, restarted at each
+PLACE. Positions come from cumulative sums of the MOVE offsets, taken
+window by window. A window stops at the first move that would leave the
+table or hit an obstacle: that move is blocked, and the sum restarts
+after it. Windows grow while no move is blocked and shrink when moves
+are blocked often. Stretches where most moves are blocked run in a plain
+loop, where NumPy would not pay off.
+"""
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .command import Command, CommandType
+from .fleet import Fleet
+from .robot import Robot, Table, FACINGS, FACING_CODES, NOT_PLACED
+
+# tables with more cells than this get no visit-count array
+MAX_HEATMAP_CELLS = 1 << 24
+
+_MOVE, _LEFT, _RIGHT, _REPORT, _PLACE = range(5)
+_KINDS = {CommandType.MOVE: _MOVE, CommandType.LEFT: _LEFT, CommandType.RIGHT: _RIGHT,
+          CommandType.REPORT: _REPORT, CommandType.PLACE: _PLACE}
+
+_DX = np.array([Robot.MOVE_OFFSETS[d][0] for d in FACINGS], dtype=np.int64)
+_DY = np.array([Robot.MOVE_OFFSETS[d][1] for d in FACINGS], dtype=np.int64)
+
+# windows at most this long are run in a plain loop, SCALAR_STEPS moves at a time
+SCALAR_WINDOW = 16
+SCALAR_STEPS = 256
+MAX_WINDOW = 1 << 16
+# flush collected cells into the visit counts after this many
+_FLUSH_CELLS = 1 << 22
+
+
+@dataclass
+class Analytics:
+    """
+    Movement statistics of one robot over a command stream.
+
+    visits[x, y] counts arrivals at cell (x, y): each successful PLACE or
+    MOVE ending there. It is None if the table is larger than
+    MAX_HEATMAP_CELLS or if it was not asked for.
+    """
+    visits: Optional[np.ndarray]
+    distance: int          # successful moves
+    blocked_moves: int     # MOVEs refused by the table edge or an obstacle
+    unplaced_commands: int  # MOVE/LEFT/RIGHT ignored before the first valid PLACE
+    places: int            # successful PLACEs
+    rejected_places: int   # PLACEs off the table or onto an obstacle
+    turns: int             # successful LEFTs and RIGHTs
+    final_state: int       # robot state after the stream, as Table.encode()
+
+
+class _Visits:
+    # accumulates visited cells, packed as x * height + y
+    def __init__(self, table: Table, enabled: bool):
+        self.height = table.height
+        self.counts = np.zeros(table.width * table.height, dtype=np.int64) if enabled else None
+        self.parts: List[np.ndarray] = []
+        self.cells = array("q")
+        self.size = 0
+
+    def add_array(self, x: np.ndarray, y: np.ndarray):
+        if self.counts is not None and len(x):
+            self.parts.append(x * self.height + y)
+            self.size += len(x)
+            if self.size >= _FLUSH_CELLS:
+                self.flush()
+
+    def add(self, x: int, y: int):
+        if self.counts is not None:
+            self.cells.append(x * self.height + y)
+
+    def flush(self):
+        if self.counts is None:
+            return
+        if self.cells:
+            self.parts.append(np.frombuffer(self.cells, dtype=np.int64).copy())
+            self.cells = array("q")
+        if self.parts:
+            cells = np.concatenate(self.parts)
+            self.counts += np.bincount(cells, minlength=len(self.counts))
+        self.parts, self.size = [], 0
+
+
+def analyze(commands: Iterable[Command], table: Optional[Table] = None, heatmap: bool = True) -> Analytics:
+    """
+    Run a command stream on a robot that starts unplaced and return its
+    movement statistics. The counts are the same as replaying the stream
+    with Robot.execute_command() and inspecting the robot after each step.
+    """
+    table = table if table is not None else Table()
+    heatmap = heatmap and table.width * table.height <= MAX_HEATMAP_CELLS
+
+    # one pass over the stream: command kinds and the valid PLACEs
+    kinds = array("b")
+    place_at, place_x, place_y, place_f = array("q"), array("q"), array("q"), array("b")
+    rejected = 0
+    codes, is_valid_xy = _KINDS, table.is_valid_xy
+    for i, cmd in enumerate(commands):
+        kind = codes[cmd.type]
+        kinds.append(kind)
+        if kind == _PLACE:
+            if is_valid_xy(cmd.x, cmd.y):
+                place_at.append(i)
+                place_x.append(cmd.x)
+                place_y.append(cmd.y)
+                place_f.append(FACING_CODES[cmd.facing])
+            else:
+                rejected += 1
+
+    kind = np.frombuffer(kinds, dtype=np.int8) if kinds else np.zeros(0, dtype=np.int8)
+    place_at = np.array(place_at, dtype=np.int64)
+    place_x = np.array(place_x, dtype=np.int64)
+    place_y = np.array(place_y, dtype=np.int64)
+    visits = _Visits(table, heatmap)
+    visits.add_array(place_x, place_y)
+
+    # segment k >= 1 runs from the k-th valid PLACE; segment 0 is unplaced
+    starts = np.zeros(len(kind), dtype=np.int64)
+    starts[place_at] = 1
+    segment = np.cumsum(starts)
+    placed = segment > 0
+
+    # facing after each command: the PLACE's facing plus the turns since
+    turn = np.where(kind == _LEFT, -1, 0) + np.where(kind == _RIGHT, 1, 0)
+    turned = np.cumsum(turn)
+    base_facing = np.concatenate(([0], np.array(place_f, dtype=np.int64)))
+    base_turned = np.concatenate(([0], turned[place_at]))
+    facing = (base_facing[segment] + turned - base_turned[segment]) % 4
+
+    is_move = kind == _MOVE
+    unplaced = int(np.count_nonzero((is_move | (turn != 0)) & ~placed))
+    turns = int(np.count_nonzero((turn != 0) & placed))
+
+    moves = np.flatnonzero(is_move & placed)
+    distance, blocked, x, y, current = _walk(table, segment[moves], _DX[facing[moves]], _DY[facing[moves]],
+                                             place_x, place_y, visits)
+    visits.flush()
+
+    final_state = NOT_PLACED
+    if len(place_at):
+        if current != len(place_at):
+            # no moves after the last PLACE
+            x, y = int(place_x[-1]), int(place_y[-1])
+        final_state = ((y * table.width + x) << 2 | int(facing[-1])) + 1
+    heat = visits.counts.reshape(table.width, table.height) if heatmap else None
+    return Analytics(heat, distance, blocked, unplaced, len(place_at), rejected, turns, final_state)
+
+
+def _walk(table: Table, segment: np.ndarray, dx: np.ndarray, dy: np.ndarray,
+          place_x: np.ndarray, place_y: np.ndarray, visits: _Visits) -> Tuple[int, int, int, int, int]:
+    # Moves of placed robots, in order, with the segment each belongs to.
+    # Returns (successful, blocked, x, y, segment) as of the last move.
+    valid, valid_xy = Fleet(table, 0).is_valid, table.is_valid_xy
+    n = len(segment)
+    # for each move, the index of the first move of the next segment
+    segment_end = np.searchsorted(segment, segment, side="right")
+    distance = blocked = 0
+    current = x = y = 0
+    j, window = 0, 4 * SCALAR_WINDOW
+    while j < n:
+        k = int(segment[j])
+        if k != current:
+            current, x, y = k, int(place_x[k - 1]), int(place_y[k - 1])
+        end = int(segment_end[j])
+
+        if window <= SCALAR_WINDOW:
+            stop = min(end, j + SCALAR_STEPS)
+            refused = 0
+            for mx, my in zip(dx[j:stop].tolist(), dy[j:stop].tolist()):
+                if valid_xy(x + mx, y + my):
+                    x += mx
+                    y += my
+                    visits.add(x, y)
+                else:
+                    refused += 1
+            distance += stop - j - refused
+            blocked += refused
+            # the next window guesses the gap between blocked moves
+            window = (stop - j) // (refused + 1)
+            j = stop
+            continue
+
+        stop = min(end, j + window)
+        cx = x + np.cumsum(dx[j:stop])
+        cy = y + np.cumsum(dy[j:stop])
+        bad = np.flatnonzero(~valid(cx, cy))
+        b = int(bad[0]) if len(bad) else stop - j
+        if b:
+            visits.add_array(cx[:b], cy[:b])
+            distance += b
+            x, y = int(cx[b - 1]), int(cy[b - 1])
+        if len(bad):
+            blocked += 1
+            j += b + 1
+            window = 2 * (b + 1)
+        else:
+            j = stop
+            window = min(2 * window, MAX_WINDOW)
+    return distance, blocked, x, y, current
@@ -0,0 +1,70 @@
+# batch.py
+from __future__ import annotations
+import glob
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .cli import OutputBuffer, run_file
+
+
+def expand_paths(specs: Iterable[str]) -> List[str]:
+    """
+    Expand files, directories (all files below, recursively) and glob
+    patterns into a sorted, de-duplicated list of paths per spec.
+    Specs that match nothing are kept so that they are reported as missing.
+    """
+    paths: List[str] = []
+    seen = set()
+    for spec in specs:
+        if os.path.isdir(spec):
+            found = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(spec)
+                for name in names
+            )
+        elif any(c in spec for c in "*?["):
+            found = sorted(p for p in glob.glob(spec, recursive=True) if os.path.isfile(p))
+        else:
+            found = []
+        for p in found or [spec]:
+            if p not in seen:
+                seen.add(p)
+                paths.append(p)
+    return paths
+
+
+def run_one(path: str, mode: str) -> Tuple[bool, str]:
+    """Run one command file, returning (found, output text)."""
+    stream = io.StringIO()
+    out = OutputBuffer(stream)
+    try:
+        run_file(path, mode, out)
+    except (FileNotFoundError, IsADirectoryError):
+        out.flush()
+        return False, stream.getvalue() + f"Error: file not found: {path}\n"
+    out.flush()
+    return True, stream.getvalue()
+
+
+def run_batch(paths: List[str], mode: str, jobs: Optional[int] = None,
+              chunksize: Optional[int] = None) -> Iterator[Tuple[str, bool, str]]:
+    """
+    Run many command files in a process pool and yield (path, found, output)
+    in the order of `paths`, whatever order the workers finish in.
+    Files are handed to workers in chunks to amortise the IPC cost.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    task = partial(run_one, mode=mode)
+    if jobs == 1 or len(paths) <= 1:
+        for path in paths:
+            yield (path, *task(path))
+        return
+
+    if chunksize is None:
+        chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for path, (found, text) in zip(paths, pool.map(task, paths, chunksize=chunksize)):
+            yield path, found, text
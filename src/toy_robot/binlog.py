@@ -0,0 +1,198 @@
+# binlog.py
+"""
+Compact binary encoding of Command streams.
+
+After the 4-byte MAGIC header, the stream is a sequence of records, each
+starting with one byte:
+
+    ccaabbdd   cc = 1..3: a group of cc simple commands. The 2-bit opcodes
+                          (MOVE=0, LEFT=1, RIGHT=2, REPORT=3) sit in aa, bb
+                          and dd, first command in aa.
+    00ff0000   cc = 0:    a PLACE facing `ff` (NORTH, EAST, SOUTH, WEST),
+                          followed by x and y as zigzag LEB128 varints.
+
+Runs of simple commands therefore take 2.67 bits per command, and a PLACE
+on a small table takes 3 bytes.
+"""
+from __future__ import annotations
+import argparse
+import io
+import os
+import sys
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Union
+
+from .command import Command, CommandType, CommandParser
+from .ingest import open_buffer, scan_lines
+from .robot import Robot, FACINGS, FACING_CODES
+
+MAGIC = b"TRB1"
+
+SIMPLE_OPCODES = {
+    CommandType.MOVE: 0,
+    CommandType.LEFT: 1,
+    CommandType.RIGHT: 2,
+    CommandType.REPORT: 3,
+}
+_SIMPLE_BY_OPCODE = [CommandParser.SIMPLE_INSTANCES[t.name] for t in SIMPLE_OPCODES]
+
+
+def _decode_table() -> List[Optional[tuple]]:
+    # header byte -> the commands of a simple group (None for PLACE records)
+    table: List[Optional[tuple]] = [None] * 64
+    for byte in range(64, 256):
+        count = byte >> 6
+        ops = [(byte >> shift) & 3 for shift in (4, 2, 0)][:count]
+        table.append(tuple(_SIMPLE_BY_OPCODE[op] for op in ops))
+    return table
+
+
+_GROUPS = _decode_table()
+
+
+def _write_varint(out: bytearray, value: int):
+    # zigzag keeps small negative coordinates short; ints of any size fit
+    value = value * 2 if value >= 0 else -value * 2 - 1
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class BinaryLogWriter:
+    """Appends Commands to a binary stream, packing simple commands into groups."""
+
+    def __init__(self, stream: BinaryIO, flush_size: int = 1 << 16):
+        self._stream = stream
+        self._flush_size = flush_size
+        self._buf = bytearray(MAGIC)
+        self._group = 0   # pending opcodes, first in the high bits
+        self._pending = 0
+        self.count = 0
+
+    def write(self, cmd: Command):
+        op = SIMPLE_OPCODES.get(cmd.type)
+        if op is not None:
+            self._group = self._group << 2 | op
+            self._pending += 1
+            if self._pending == 3:
+                self._flush_group()
+        else:
+            self._flush_group()
+            self._buf.append(FACING_CODES[cmd.facing] << 4)
+            _write_varint(self._buf, cmd.x)
+            _write_varint(self._buf, cmd.y)
+        self.count += 1
+        if len(self._buf) >= self._flush_size:
+            self._stream.write(self._buf)
+            self._buf.clear()
+
+    def _flush_group(self):
+        if self._pending:
+            ops = self._group << 2 * (3 - self._pending)
+            self._buf.append(self._pending << 6 | ops)
+            self._group = self._pending = 0
+
+    def close(self):
+        self._flush_group()
+        self._stream.write(self._buf)
+        self._buf.clear()
+
+
+def encode(commands: Iterable[Command]) -> bytes:
+    """Encode a command stream in memory."""
+    out = io.BytesIO()
+    writer = BinaryLogWriter(out)
+    for cmd in commands:
+        writer.write(cmd)
+    writer.close()
+    return out.getvalue()
+
+
+def iter_commands(buf: Union[bytes, memoryview]) -> Iterator[Command]:
+    """Decode commands straight from a buffer (bytes, memoryview or mmap)."""
+    with memoryview(buf) as view:
+        yield from _decode(view)
+
+
+def _decode(view: memoryview) -> Iterator[Command]:
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError("not a binary command log")
+    groups = _GROUPS
+    place = CommandType.PLACE
+    pos, end = len(MAGIC), len(view)
+    while pos < end:
+        byte = view[pos]
+        pos += 1
+        group = groups[byte]
+        if group is not None:
+            yield from group
+            continue
+        if byte & 0xCF:
+            # only the facing bits may be set in a PLACE header
+            raise ValueError(f"bad record header byte 0x{byte:02x} at offset {pos - 1}")
+
+        values = []
+        for _ in range(2):
+            value = shift = 0
+            while True:
+                if pos >= end:
+                    raise ValueError("truncated PLACE record")
+                b = view[pos]
+                pos += 1
+                value |= (b & 0x7F) << shift
+                shift += 7
+                if b < 0x80:
+                    break
+            values.append((value >> 1) ^ -(value & 1))
+        yield Command(place, values[0], values[1], FACINGS[(byte >> 4) & 3])
+
+
+def execute(buf: Union[bytes, memoryview], robot: Robot) -> List[str]:
+    """Run a binary log on `robot`, returning its REPORT outputs."""
+    reports = []
+    report = CommandType.REPORT
+    execute_command = robot.execute_command
+    for cmd in iter_commands(buf):
+        result = execute_command(cmd)
+        if cmd.type == report:
+            reports.append(result)
+    return reports
+
+
+def execute_file(path: Union[str, os.PathLike], robot: Robot) -> List[str]:
+    """Run a binary log file on `robot` through a read-only mmap."""
+    with open_buffer(path) as buf:
+        return execute(buf, robot)
+
+
+def convert(text_path: Union[str, os.PathLike], bin_path: Union[str, os.PathLike]) -> int:
+    """
+    Convert a text command file to a binary log, returning the number of
+    commands written. Invalid lines are dropped, as main() ignores them.
+    """
+    with open_buffer(text_path) as buf, open(bin_path, "wb") as f:
+        writer = BinaryLogWriter(f)
+        for _, line in scan_lines(buf):
+            cmd = CommandParser.parse(line)
+            if cmd is not None:
+                writer.write(cmd)
+        writer.close()
+        return writer.count
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m toy_robot.binlog",
+                                     description="Convert a text command file to a binary log.")
+    parser.add_argument("text_path")
+    parser.add_argument("bin_path")
+    args = parser.parse_args(argv)
+    try:
+        count = convert(args.text_path, args.bin_path)
+    except FileNotFoundError:
+        print(f"Error: file not found: {args.text_path}")
+        sys.exit(1)
+    print(f"wrote {count} commands to {args.bin_path}")
+
+
+if __name__ == "__main__":
+    main()
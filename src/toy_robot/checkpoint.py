@@ -0,0 +1,185 @@
+# checkpoint.py
+"""
+Random access into long command logs.
+
+A checkpoint index is a sidecar file recording, every `interval` commands,
+the packed robot state together with the line number and byte offset
+where execution resumes. seek() restores the nearest checkpoint at or
+before a line and replays only the lines after it, so finding the state
+at line N reads at most `interval` commands instead of N lines.
+
+Only the table size is stored in the index. Callers using obstacles
+must pass the same Table to seek() that the index was built with.
+"""
+from __future__ import annotations
+import argparse
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, Tuple, Union
+
+from .command import CommandParser
+from .ingest import open_buffer, scan_lines, scan_lines_at
+from .robot import Robot, Table, NOT_PLACED
+
+MAGIC = b"TRI1"
+INDEX_SUFFIX = ".ckpt"
+DEFAULT_INTERVAL = 100_000
+
+# magic, interval, table width, table height, size of the indexed log
+_HEADER = struct.Struct("<4sQQQQ")
+
+PathLike = Union[str, os.PathLike]
+
+
+def index_path(log_path: PathLike) -> str:
+    """Where the sidecar index of `log_path` is kept by default."""
+    return os.fspath(log_path) + INDEX_SUFFIX
+
+
+class CheckpointIndex:
+    """
+    Checkpoints of one log, each a (lineno, offset, state) triple: the
+    robot is in `state` after running every line before `lineno`, and
+    line `lineno` starts at byte `offset`. The first checkpoint is always
+    (1, 0, NOT_PLACED).
+    """
+
+    def __init__(self, interval: int, width: int, height: int, log_size: int, records: array):
+        self.interval = interval
+        self.width = width
+        self.height = height
+        self.log_size = log_size
+        self._records = records
+        self._linenos = records[0::3]
+
+    def __len__(self) -> int:
+        return len(self._linenos)
+
+    def __getitem__(self, i: int) -> Tuple[int, int, int]:
+        i = range(len(self))[i]
+        return tuple(self._records[3 * i:3 * i + 3])
+
+    def nearest(self, lineno: int) -> Tuple[int, int, int]:
+        """The last checkpoint whose lineno is at or before `lineno`."""
+        return self[max(bisect_right(self._linenos, lineno) - 1, 0)]
+
+    @classmethod
+    def build(cls, log_path: PathLike, table: Optional[Table] = None,
+              interval: int = DEFAULT_INTERVAL) -> CheckpointIndex:
+        """Run a log once, taking a checkpoint after every `interval` commands."""
+        if interval < 1:
+            raise ValueError("interval must be at least 1")
+        table = table if table is not None else Table()
+        robot = Robot(table)
+        execute_command = robot.execute_command
+        parse = CommandParser.parse
+        records = array("Q", (1, 0, NOT_PLACED))
+        count = 0
+        with open_buffer(log_path) as buf:
+            for lineno, offset, line in scan_lines_at(buf):
+                cmd = parse(line)
+                if cmd is None:
+                    continue
+                execute_command(cmd)
+                count += 1
+                if count % interval == 0:
+                    records.extend((lineno + 1, offset, robot.state))
+            size = len(buf)
+        return cls(interval, table.width, table.height, size, records)
+
+    def save(self, path: PathLike):
+        records = self._records
+        if sys.byteorder == "big":
+            records = array("Q", records)
+            records.byteswap()
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, self.interval, self.width, self.height, self.log_size))
+            f.write(records.tobytes())
+
+    @classmethod
+    def load(cls, path: PathLike) -> CheckpointIndex:
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _HEADER.size or data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: not a checkpoint index")
+        _, interval, width, height, log_size = _HEADER.unpack_from(data)
+        records = array("Q")
+        records.frombytes(data[_HEADER.size:])
+        if sys.byteorder == "big":
+            records.byteswap()
+        if len(records) % 3:
+            raise ValueError(f"{path}: truncated checkpoint index")
+        return cls(interval, width, height, log_size, records)
+
+
+def build_index(log_path: PathLike, out_path: Optional[PathLike] = None, table: Optional[Table] = None,
+                interval: int = DEFAULT_INTERVAL) -> CheckpointIndex:
+    """Build the index of a log and save it (next to the log by default)."""
+    index = CheckpointIndex.build(log_path, table, interval)
+    index.save(out_path if out_path is not None else index_path(log_path))
+    return index
+
+
+def seek(log_path: PathLike, index: Union[CheckpointIndex, PathLike, None], lineno: int,
+         table: Optional[Table] = None) -> Robot:
+    """
+    A robot in the state reached after running lines 1..lineno of the log.
+    `index` is a CheckpointIndex, the path of a saved one, or None for the
+    default sidecar path.
+    """
+    if not isinstance(index, CheckpointIndex):
+        index = CheckpointIndex.load(index if index is not None else index_path(log_path))
+    if table is None:
+        table = Table(index.width, index.height)
+    elif (table.width, table.height) != (index.width, index.height):
+        raise ValueError(f"index was built for a {index.width}x{index.height} table, "
+                         f"not {table.width}x{table.height}")
+
+    start, offset, state = index.nearest(lineno + 1)
+    robot = Robot(table)
+    robot.state = state
+    execute_command = robot.execute_command
+    parse = CommandParser.parse
+    with open_buffer(log_path) as buf:
+        if len(buf) < index.log_size:
+            raise ValueError(f"{log_path}: log is shorter than when it was indexed")
+        for n, line in scan_lines(buf, offset, lineno=start):
+            if n > lineno:
+                break
+            cmd = parse(line)
+            if cmd is not None:
+                execute_command(cmd)
+    return robot
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m toy_robot.checkpoint",
+                                     description="Index command logs and look up the robot state at any line.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("index", help="write the checkpoint index of a log")
+    build.add_argument("log")
+    build.add_argument("--interval", type=int, default=DEFAULT_INTERVAL, metavar="K",
+                       help=f"commands between checkpoints (default: {DEFAULT_INTERVAL})")
+    build.add_argument("--width", type=int, default=Table.width)
+    build.add_argument("--height", type=int, default=Table.height)
+    find = commands.add_parser("seek", help="print the robot state after a line")
+    find.add_argument("log")
+    find.add_argument("lineno", type=int)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "index":
+            index = build_index(args.log, table=Table(args.width, args.height), interval=args.interval)
+            print(f"wrote {len(index)} checkpoints to {index_path(args.log)}")
+        else:
+            print(seek(args.log, None, args.lineno))
+    except FileNotFoundError as e:
+        print(f"Error: file not found: {e.filename}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+# cli.py
+from __future__ import annotations
+import argparse
+import os
+import sys
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, TextIO, Tuple
+
+from .command import Command, CommandParser, CommandType, ParseCache
+from .ingest import iter_commands
+from .robot import Robot, Table
+from .trace import TraceRecorder, FORMATS as TRACE_FORMATS
+
+USAGE = "Usage: python toy_robot.py <commands_file>"
+SEPARATOR = "-" * 40
+
+# output modes
+VERBOSE = "verbose"            # every command with its result and state change
+QUIET = "quiet"                # final robot state only
+REPORTS_ONLY = "reports-only"  # REPORT results only
+SUMMARY = "summary"            # command counts only
+
+
+class OutputBuffer:
+    """Collects output text and writes it to `stream` in large chunks."""
+
+    def __init__(self, stream: TextIO, limit: int = 1 << 16):
+        self._stream = stream
+        self._limit = limit
+        self._parts: List[str] = []
+        self._size = 0
+
+    def write(self, text: str):
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self._limit:
+            self.flush()
+
+    def flush(self):
+        if self._parts:
+            self._stream.write("".join(self._parts))
+            self._parts.clear()
+            self._size = 0
+
+
+@dataclass
+class RunSummary:
+    successful: int = 0
+    failed: int = 0
+    invalid: int = 0
+
+    def format(self) -> str:
+        return (f"commands: {self.successful + self.failed + self.invalid}\n"
+                f"successful: {self.successful}\n"
+                f"failed: {self.failed}\n"
+                f"invalid: {self.invalid}\n")
+
+
+def run_lines(lines: Iterable[Tuple[int, bytes]], robot: Robot, mode: str, out: OutputBuffer,
+              trace: Optional[TraceRecorder] = None, cache: Optional[ParseCache] = None) -> RunSummary:
+    """
+    Execute (lineno, line) pairs on `robot`, writing output for `mode` to `out`.
+    Text is only formatted for the modes that print it. If `trace` is given,
+    every line is also recorded in it. Lines are parsed through `cache` if given.
+    """
+    parse = cache.parse if cache is not None else CommandParser.parse
+    return run_commands(((lineno, line, parse(line)) for lineno, line in lines), robot, mode, out, trace)
+
+
+def run_commands(commands: Iterable[Tuple[int, bytes, Optional[Command]]], robot: Robot, mode: str,
+                 out: OutputBuffer, trace: Optional[TraceRecorder] = None) -> RunSummary:
+    """
+    run_lines() for lines that are already parsed: (lineno, line, command)
+    triples as from ingest.scan_commands(), with command None for invalid lines.
+    """
+    summary = RunSummary()
+    report = CommandType.REPORT
+
+    if mode == VERBOSE:
+        for lineno, raw, cmd in commands:
+            line = raw.decode("utf-8", "replace").strip()
+            if cmd is None:
+                summary.invalid += 1
+                if trace is not None:
+                    trace.record(lineno, None, False, robot.state)
+                out.write(f"[line {lineno}] >>> {line}\nInvalid command\n{SEPARATOR}\n")
+                continue
+
+            old_state = str(robot)
+            result = robot.execute_command(cmd)
+            new_state = str(robot)
+            if result is False:
+                summary.failed += 1
+            else:
+                summary.successful += 1
+            if trace is not None:
+                trace.record(lineno, cmd.type, result is not False, robot.state)
+            out.write(f"[line {lineno}] >>> {line}\n"
+                      f"is_command_successful: {result}, old_state: {old_state}, new_state: {new_state}\n"
+                      f"{SEPARATOR}\n")
+    elif trace is not None:
+        write_reports = mode == REPORTS_ONLY
+        record = trace.record
+        for lineno, raw, cmd in commands:
+            if cmd is None:
+                summary.invalid += 1
+                record(lineno, None, False, robot.state)
+                continue
+            result = robot.execute_command(cmd)
+            if result is False:
+                summary.failed += 1
+            else:
+                summary.successful += 1
+                if write_reports and cmd.type == report:
+                    out.write(result + "\n")
+            record(lineno, cmd.type, result is not False, robot.state)
+    else:
+        write_reports = mode == REPORTS_ONLY
+        for _, _, cmd in commands:
+            if cmd is None:
+                summary.invalid += 1
+                continue
+            result = robot.execute_command(cmd)
+            if result is False:
+                summary.failed += 1
+            else:
+                summary.successful += 1
+                if write_reports and cmd.type == report:
+                    out.write(result + "\n")
+
+    if mode == QUIET:
+        out.write(f"{robot}\n")
+    elif mode == SUMMARY:
+        out.write(summary.format())
+    return summary
+
+
+def run_file(path: str, mode: str, out: OutputBuffer, table: Optional[Table] = None,
+             trace: Optional[TraceRecorder] = None, cache: Optional[ParseCache] = None) -> RunSummary:
+    """Run a command file on a fresh robot (raises FileNotFoundError)."""
+    robot = Robot(table if table is not None else Table())
+    commands = iter_commands(path, cache.parse if cache is not None else None)
+    return run_commands(commands, robot, mode, out, trace)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python toy_robot.py", description="Run toy robot command files.")
+    parser.add_argument("paths", nargs="+", metavar="path",
+                        help="commands file (with --batch: files, directories or glob patterns)")
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument("--quiet", dest="mode", action="store_const", const=QUIET,
+                       help="print the final robot state only")
+    modes.add_argument("--reports-only", dest="mode", action="store_const", const=REPORTS_ONLY,
+                       help="print REPORT results only")
+    modes.add_argument("--summary", dest="mode", action="store_const", const=SUMMARY,
+                       help="print counts of successful, failed and invalid commands")
+    parser.set_defaults(mode=VERBOSE)
+
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--batch", action="store_true",
+                       help="run many command files in a process pool, printing results in input order")
+    batch.add_argument("--jobs", type=int, default=None, metavar="N",
+                       help="worker processes for --batch, --tagged and --check (default: CPU count)")
+
+    tagged = parser.add_argument_group("tagged logs")
+    tagged.add_argument("--tagged", action="store_true",
+                        help='lines name their robot, as in "R17: MOVE"; robots are spread over --jobs processes')
+
+    check = parser.add_argument_group("lint mode")
+    check.add_argument("--check", action="store_true",
+                       help="only check which lines are valid commands; exit 1 if any is not "
+                            "(with --summary: counts only)")
+
+    parsing = parser.add_argument_group("parsing")
+    parsing.add_argument("--parse-cache", type=int, default=None, metavar="N",
+                         help="remember the parse of the last N distinct lines (hit rate shown with --profile)")
+
+    parallel = parser.add_argument_group("parallel mode")
+    parallel.add_argument("--parallel", type=int, default=None, metavar="N",
+                          help="split one large file into chunks run by N processes "
+                               "(with --quiet or --reports-only)")
+
+    follow = parser.add_argument_group("follow mode")
+    follow.add_argument("--follow", action="store_true",
+                        help="keep running lines as they are appended to the file (stop with Ctrl-C)")
+    follow.add_argument("--checkpoint", metavar="PATH",
+                        help="resume from and save the file offset and robot state in PATH")
+    follow.add_argument("--interval", type=float, default=1.0, metavar="SECONDS",
+                        help="how often --follow checks the file for new lines (default: 1)")
+
+    tracing = parser.add_argument_group("tracing")
+    tracing.add_argument("--trace", metavar="PATH",
+                         help="record every command's outcome and write it to PATH (.csv, .jsonl or .npy)")
+    tracing.add_argument("--trace-capacity", type=int, default=None, metavar="N",
+                         help="keep only the last N rows of the trace")
+
+    profile = parser.add_argument_group("profiling")
+    profile.add_argument("--profile", action="store_true",
+                         help="print time per phase and per command type to stderr at exit")
+    profile.add_argument("--profile-json", metavar="PATH",
+                         help="write the profile as JSON to PATH")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(USAGE)
+        sys.exit(2)
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    profiling = args.profile or args.profile_json
+    following = args.follow or args.checkpoint is not None
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.batch:
+        if profiling or args.trace or following or args.tagged or args.check or args.parse_cache is not None:
+            parser.error("--profile, --profile-json, --trace, --follow, --checkpoint, --tagged, --check "
+                         "and --parse-cache cannot be used with --batch")
+        sys.exit(run_batch_main(args))
+    if len(args.paths) > 1:
+        parser.error("more than one commands file needs --batch")
+    if args.parse_cache is not None:
+        if args.parse_cache < 1:
+            parser.error("--parse-cache must be at least 1")
+        if args.check or args.parallel is not None or args.tagged:
+            parser.error("--parse-cache cannot be used with --check, --parallel or --tagged")
+    if args.check:
+        if args.mode not in (VERBOSE, SUMMARY):
+            parser.error("--check needs the default output or --summary")
+        if args.parallel is not None or args.tagged or following or profiling or args.trace:
+            parser.error("--check cannot be used with --parallel, --tagged, --follow, --checkpoint, "
+                         "--profile or --trace")
+        sys.exit(run_check_main(args.paths[0], args.mode, args.jobs))
+    if args.parallel is not None:
+        if args.parallel < 1:
+            parser.error("--parallel must be at least 1")
+        if args.mode not in (QUIET, REPORTS_ONLY):
+            parser.error("--parallel needs --quiet or --reports-only")
+        if profiling or args.trace:
+            parser.error("--profile, --profile-json and --trace cannot be used with --parallel")
+    if args.tagged and (args.parallel is not None or following or profiling or args.trace):
+        parser.error("--tagged cannot be used with --parallel, --follow, --checkpoint, --profile or --trace")
+    if following:
+        if args.mode not in (VERBOSE, REPORTS_ONLY):
+            parser.error("--follow and --checkpoint need the default output or --reports-only")
+        if args.parallel is not None or profiling or args.trace:
+            parser.error("--follow and --checkpoint cannot be used with --parallel, --profile or --trace")
+    trace = None
+    if args.trace:
+        if os.path.splitext(args.trace)[1].lower() not in TRACE_FORMATS:
+            parser.error(f"--trace needs a {', '.join(TRACE_FORMATS)} file name")
+        if not os.path.isdir(os.path.dirname(args.trace) or "."):
+            parser.error(f"--trace directory not found: {os.path.dirname(args.trace)}")
+        if args.trace_capacity is not None and args.trace_capacity < 1:
+            parser.error("--trace-capacity must be at least 1")
+        trace = TraceRecorder(Table(), args.trace_capacity)
+
+    path = args.paths[0]
+    cache = ParseCache(args.parse_cache) if args.parse_cache is not None else None
+    out = OutputBuffer(sys.stdout)
+    profiler = None
+    if profiling:
+        from .instrument import Profiler
+        profiler = Profiler()
+        out = profiler.wrap_output(out)
+        profiler.install()
+    try:
+        if args.parallel is not None:
+            run_parallel_main(path, args.mode, out, args.parallel)
+        elif following:
+            run_follow_main(path, args, out, cache)
+        elif args.tagged:
+            from .tagged import run_tagged_file
+            run_tagged_file(path, args.mode, out, jobs=args.jobs)
+        else:
+            run_file(path, args.mode, out, trace=trace, cache=cache)
+    except FileNotFoundError:
+        out.write(f"Error: file not found: {path}\n")
+        sys.exit(1)
+    finally:
+        out.flush()
+        if profiler is not None:
+            profiler.uninstall()
+            if args.profile:
+                sys.stderr.write(profiler.format())
+                if cache is not None:
+                    sys.stderr.write(cache.format())
+            if args.profile_json:
+                profiler.dump_json(args.profile_json)
+    if trace is not None:
+        try:
+            trace.save(args.trace)
+        except OSError as e:
+            print(f"Error: cannot write trace {args.trace}: {e.strerror}")
+            sys.exit(1)
+
+
+def run_check_main(path: str, mode: str, jobs: Optional[int]) -> int:
+    from .lint import check_file
+
+    out = OutputBuffer(sys.stdout)
+    try:
+        result = check_file(path, jobs)
+        if mode == VERBOSE:
+            for lineno in result.invalid_lines:
+                out.write(f"[line {lineno}] Invalid command\n")
+        out.write(result.format())
+    except FileNotFoundError:
+        out.write(f"Error: file not found: {path}\n")
+        return 1
+    finally:
+        out.flush()
+    return 1 if result.invalid else 0
+
+
+def run_follow_main(path: str, args: argparse.Namespace, out: OutputBuffer, cache: Optional[ParseCache] = None):
+    from .follow import Follower
+
+    follower = Follower(path, args.mode, out, checkpoint=args.checkpoint, cache=cache)
+    if not args.follow:
+        follower.poll()
+        return
+    try:
+        follower.follow(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+def run_parallel_main(path: str, mode: str, out: OutputBuffer, jobs: int):
+    from .parallel import run_chunks
+
+    robot = Robot(Table())
+    for reports in run_chunks(path, robot, jobs):
+        if mode == REPORTS_ONLY:
+            for report in reports:
+                out.write(report + "\n")
+    if mode == QUIET:
+        out.write(f"{robot}\n")
+
+
+def run_batch_main(args: argparse.Namespace) -> int:
+    from .batch import expand_paths, run_batch
+
+    out = OutputBuffer(sys.stdout)
+    status = 0
+    try:
+        for path, found, text in run_batch(expand_paths(args.paths), args.mode, jobs=args.jobs):
+            out.write(f"=== {path} ===\n{text}")
+            if not found:
+                status = 1
+    finally:
+        out.flush()
+    return status
@@ -1,10 +1,12 @@
 from __future__ import annotations
-from typing import Optional
+import re
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum, auto
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Position:
     x: int
     y: int
@@ -16,20 +18,24 @@ class Direction(Enum):
     WEST  = "WEST"
     
     def left(self) -> Direction:
-        return {
-            Direction.NORTH: Direction.WEST,
-            Direction.WEST:  Direction.SOUTH,
-            Direction.SOUTH: Direction.EAST,
-            Direction.EAST:  Direction.NORTH,
-        }[self]
+        return _LEFT_OF[self]
 
     def right(self) -> Direction:
-        return {
-            Direction.NORTH: Direction.EAST,
-            Direction.EAST:  Direction.SOUTH,
-            Direction.SOUTH: Direction.WEST,
-            Direction.WEST:  Direction.NORTH,
-        }[self]
+        return _RIGHT_OF[self]
+
+_LEFT_OF = {
+    Direction.NORTH: Direction.WEST,
+    Direction.WEST:  Direction.SOUTH,
+    Direction.SOUTH: Direction.EAST,
+    Direction.EAST:  Direction.NORTH,
+}
+
+_RIGHT_OF = {
+    Direction.NORTH: Direction.EAST,
+    Direction.EAST:  Direction.SOUTH,
+    Direction.SOUTH: Direction.WEST,
+    Direction.WEST:  Direction.NORTH,
+}
 
 class CommandType(Enum):
     PLACE = auto()
@@ -38,7 +44,7 @@ class CommandType(Enum):
     RIGHT = auto()
     REPORT = auto()
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Command:
     type: CommandType
     x: Optional[int] = None
@@ -53,23 +59,83 @@ class CommandParser:
         "REPORT": CommandType.REPORT,
     }   
 
+    # Command is immutable, so argument-less commands share one instance each
+    SIMPLE_INSTANCES = {name: Command(type=t) for name, t in SIMPLE_CMDS.items()}
+    _SIMPLE_BYTES = {name.encode(): cmd for name, cmd in SIMPLE_INSTANCES.items()}
+    _FACING_STR = {d.name: d for d in Direction}
+    _FACING_BYTES = {d.name.encode(): d for d in Direction}
+    _PLACE = CommandType.PLACE
+    # bytes that str.strip()/split() treat as whitespace or that need decoding
+    _NON_ASCII_RULES = re.compile(rb"[\x1c-\x1f\x80-\xff]")
+    # robot-tagged lines: "R17: MOVE"
+    _TAG_STR = re.compile(r"\s*([A-Za-z0-9_.\-]+)\s*:(.*)", re.S)
+    _TAG_BYTES = re.compile(rb"\s*([A-Za-z0-9_.\-]+)\s*:(.*)", re.S)
+
+    @staticmethod
+    def parse(cmd: Union[str, bytes]) -> Optional[Command]:
+        """
+        Parse one line in a single pass, returning None if it is not a command.
+        str lines are accepted exactly when is_valid() accepts them; bytes
+        lines get the same verdict as their UTF-8 decoding.
+        """
+        if type(cmd) is bytes:
+            return CommandParser._SIMPLE_BYTES.get(cmd) or CommandParser._parse_bytes(cmd)
+        if isinstance(cmd, str):
+            return CommandParser.SIMPLE_INSTANCES.get(cmd) or CommandParser._parse_str(cmd)
+        if isinstance(cmd, (bytes, bytearray, memoryview)):
+            return CommandParser._parse_bytes(bytes(cmd))
+        return None
+
     @staticmethod
-    def parse(cmd: str) -> Optional[Command]:
-        if not CommandParser.is_valid(cmd):
+    def _parse_str(cmd: str) -> Optional[Command]:
+        s = cmd.strip().upper()
+
+        # simple commands must be alone (no trailing tokens)
+        simple = CommandParser.SIMPLE_INSTANCES.get(s)
+        if simple is not None:
+            return simple
+
+        if not s.startswith("PLACE"):
+            return None
+        parts = s.split(None, 1)
+        if len(parts) != 2 or parts[0] != "PLACE":
+            return None
+        bits = parts[1].split(",")
+        if len(bits) != 3:
+            return None
+        facing = CommandParser._FACING_STR.get(bits[2].strip())
+        if facing is None:
+            return None
+        try:
+            return Command(CommandParser._PLACE, int(bits[0]), int(bits[1]), facing)
+        except ValueError:
             return None
 
+    @staticmethod
+    def _parse_bytes(cmd: bytes) -> Optional[Command]:
         s = cmd.strip().upper()
 
-        # simple commands
-        if s in CommandParser.SIMPLE_CMDS:
-            return Command(type=CommandParser.SIMPLE_CMDS[s])
+        simple = CommandParser._SIMPLE_BYTES.get(s)
+        if simple is not None:
+            return simple
 
-        # parse PLACE
-        if s.startswith("PLACE"):
+        if s.startswith(b"PLACE"):
             parts = s.split(None, 1)
-            arg_str = parts[1]
-            tokens = [p.strip() for p in arg_str.split(",")]
-            return Command(type=CommandType.PLACE, x=int(tokens[0]), y=int(tokens[1]), facing=Direction[tokens[2]])
+            if len(parts) == 2 and parts[0] == b"PLACE":
+                bits = parts[1].split(b",")
+                if len(bits) == 3:
+                    facing = CommandParser._FACING_BYTES.get(bits[2].strip())
+                    if facing is not None:
+                        try:
+                            return Command(CommandParser._PLACE, int(bits[0]), int(bits[1]), facing)
+                        except ValueError:
+                            pass
+
+        # bytes methods only know ASCII whitespace and case; let the str rules
+        # settle lines that contain anything else
+        if CommandParser._NON_ASCII_RULES.search(cmd) is None:
+            return None
+        return CommandParser._parse_str(cmd.decode("utf-8", "replace"))
 
     @staticmethod
     def is_valid(cmd: str) -> bool:
@@ -114,3 +180,79 @@ class CommandParser:
             return True
 
         return False
+
+    @staticmethod
+    def split_tag(line: Union[str, bytes]) -> Optional[Tuple[Union[str, bytes], Union[str, bytes]]]:
+        """
+        Split a robot-tagged line such as "R17: MOVE" into its tag and the
+        rest ("R17", " MOVE"), both of the line's type. Tags are letters,
+        digits, "_", "." and "-". Returns None for lines without a tag.
+        """
+        pattern = CommandParser._TAG_BYTES if isinstance(line, bytes) else CommandParser._TAG_STR
+        m = pattern.match(line)
+        if m is None:
+            return None
+        return m.group(1), m.group(2)
+
+    @staticmethod
+    def parse_tagged(line: Union[str, bytes]) -> Optional[Tuple[str, Command]]:
+        """Parse a robot-tagged line into (tag, Command), or None if it is not one."""
+        split = CommandParser.split_tag(line)
+        if split is None:
+            return None
+        tag, rest = split
+        cmd = CommandParser.parse(rest)
+        if cmd is None:
+            return None
+        return (tag.decode("ascii") if isinstance(tag, bytes) else tag), cmd
+
+
+class ParseCache:
+    """
+    CommandParser.parse() behind a bounded LRU cache keyed on the raw line.
+
+    Scripts repeat a small set of distinct lines, so most lines are parsed
+    once. Rejected lines are cached too (as None). At most `maxsize` lines
+    are kept, so input where every line is distinct cannot grow memory
+    without limit. str and bytes lines are separate keys. Unhashable lines
+    (bytearray, memoryview) are parsed without the cache.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError("ParseCache maxsize must be at least 1")
+        self.maxsize = maxsize
+        # CommandParser.parse is looked up on each miss, so it can be swapped (e.g. by a Profiler)
+        self._parse = lru_cache(maxsize)(lambda line: CommandParser.parse(line))
+
+    def parse(self, line: Union[str, bytes]) -> Optional[Command]:
+        try:
+            return self._parse(line)
+        except TypeError:
+            return CommandParser.parse(line)
+
+    @property
+    def hits(self) -> int:
+        return self._parse.cache_info().hits
+
+    @property
+    def misses(self) -> int:
+        return self._parse.cache_info().misses
+
+    def __len__(self) -> int:
+        return self._parse.cache_info().currsize
+
+    def clear(self):
+        """Drop all cached lines and reset the statistics."""
+        self._parse.cache_clear()
+
+    def stats(self) -> Dict[str, float]:
+        info = self._parse.cache_info()
+        lookups = info.hits + info.misses
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": self.maxsize,
+                "hit_rate": info.hits / lookups if lookups else 0.0}
+
+    def format(self) -> str:
+        stats = self.stats()
+        return (f"parse cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.1%}), {stats['size']}/{stats['maxsize']} lines\n")
@@ -0,0 +1,151 @@
+# fleet.py
+from __future__ import annotations
+from typing import List, Optional, Union
+
+import numpy as np
+
+from .command import Position, Direction, Command, CommandType
+from .robot import Robot, Table, FACINGS, FACING_CODES
+
+# per-facing move offsets, indexed by facing code
+_DX = np.array([Robot.MOVE_OFFSETS[d][0] for d in FACINGS], dtype=np.int32)
+_DY = np.array([Robot.MOVE_OFFSETS[d][1] for d in FACINGS], dtype=np.int32)
+
+Mask = Optional[np.ndarray]
+
+
+class Fleet:
+    """
+    Many robots on one Table, stored as parallel NumPy arrays.
+
+    Every operation mirrors the scalar Robot method of the same name, but is
+    applied to the whole fleet (or to the robots selected by a boolean mask)
+    in one vectorized step. Results are per-robot boolean arrays; robots
+    outside the mask are left untouched and report False.
+    """
+
+    def __init__(self, table: Table, size: int):
+        self._table = table
+        self.x = np.zeros(size, dtype=np.int32)
+        self.y = np.zeros(size, dtype=np.int32)
+        self.facing = np.zeros(size, dtype=np.int8)
+        self.placed = np.zeros(size, dtype=bool)
+        self._blocked: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_arrays(cls, table: Table, x: np.ndarray, y: np.ndarray,
+                    facing: np.ndarray, placed: np.ndarray) -> Fleet:
+        """Wrap existing state arrays without copying them."""
+        if not (len(x) == len(y) == len(facing) == len(placed)):
+            raise ValueError("state arrays must all have the same length")
+        fleet = cls.__new__(cls)
+        fleet._table = table
+        fleet.x, fleet.y, fleet.facing, fleet.placed = x, y, facing, placed
+        fleet._blocked = None
+        return fleet
+
+    @property
+    def table(self) -> Table:
+        return self._table
+
+    def __len__(self) -> int:
+        return len(self.placed)
+
+    def _select(self, mask: Mask) -> np.ndarray:
+        if mask is None:
+            return np.ones(len(self), dtype=bool)
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != self.placed.shape:
+            raise ValueError(f"mask must have shape {self.placed.shape}, got {mask.shape}")
+        return mask
+
+    def is_valid(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Vectorized Table.is_valid: True where (x, y) is a free cell on the table."""
+        table = self._table
+        ok = (x >= 0) & (x < table.width) & (y >= 0) & (y < table.height)
+        if table.obstacles is not None and len(table.obstacles):
+            cells = np.where(ok, y.astype(np.int64) * table.width + x, -1)
+            ok &= ~np.isin(cells, self._blocked_cells())
+        return ok
+
+    def _blocked_cells(self) -> np.ndarray:
+        if self._blocked is None:
+            obstacles = self._table.obstacles
+            self._blocked = np.fromiter(obstacles.packed_cells(), dtype=np.int64, count=len(obstacles))
+        return self._blocked
+
+    def place(self, x: Union[int, np.ndarray], y: Union[int, np.ndarray],
+              facing: Union[Direction, np.ndarray], mask: Mask = None) -> np.ndarray:
+        """
+        Place the selected robots at (x, y) facing `facing`.
+        x, y and facing may be scalars or per-robot arrays (facing as codes).
+        """
+        sel = self._select(mask)
+        if isinstance(facing, Direction):
+            facing = FACING_CODES[facing]
+        # scalar coordinates are checked up front: they may not fit in int64
+        if isinstance(x, int) and isinstance(y, int) and not self._table.is_valid(Position(x, y)):
+            return np.zeros(len(self), dtype=bool)
+        x = np.broadcast_to(np.asarray(x, dtype=np.int64), sel.shape)
+        y = np.broadcast_to(np.asarray(y, dtype=np.int64), sel.shape)
+        facing = np.broadcast_to(np.asarray(facing, dtype=np.int8), sel.shape)
+
+        ok = sel & self.is_valid(x, y)
+        self.x[ok] = x[ok]
+        self.y[ok] = y[ok]
+        self.facing[ok] = facing[ok]
+        self.placed |= ok
+        return ok
+
+    def _turn(self, step: int, mask: Mask) -> np.ndarray:
+        ok = self._select(mask) & self.placed
+        self.facing[ok] = (self.facing[ok] + step) % 4
+        return ok
+
+    def left(self, mask: Mask = None) -> np.ndarray:
+        return self._turn(-1, mask)
+
+    def right(self, mask: Mask = None) -> np.ndarray:
+        return self._turn(1, mask)
+
+    def move(self, mask: Mask = None) -> np.ndarray:
+        active = self._select(mask) & self.placed
+        nx = self.x + _DX[self.facing]
+        ny = self.y + _DY[self.facing]
+        ok = active & self.is_valid(nx, ny)
+        self.x[ok] = nx[ok]
+        self.y[ok] = ny[ok]
+        return ok
+
+    def report(self, mask: Mask = None) -> List[str]:
+        """Robot.report() for each selected robot, in index order."""
+        idx = np.flatnonzero(self._select(mask))
+        names = [d.name for d in FACINGS]
+        out = []
+        for x, y, f, p in zip(self.x[idx].tolist(), self.y[idx].tolist(),
+                              self.facing[idx].tolist(), self.placed[idx].tolist()):
+            out.append(f"x:{x},y:{y},facing:{names[f]}" if p else "Robot not placed")
+        return out
+
+    def execute_command(self, cmd: Command, mask: Mask = None):
+        """
+        Execute a single Command on the selected robots.
+        Returns a boolean success array, or the list of reports for REPORT.
+        """
+        if cmd.type == CommandType.PLACE:
+            return self.place(cmd.x, cmd.y, cmd.facing, mask)
+        elif cmd.type == CommandType.MOVE:
+            return self.move(mask)
+        elif cmd.type == CommandType.LEFT:
+            return self.left(mask)
+        elif cmd.type == CommandType.RIGHT:
+            return self.right(mask)
+        elif cmd.type == CommandType.REPORT:
+            return self.report(mask)
+
+    def robot(self, i: int) -> Robot:
+        """A scalar Robot holding a copy of robot i's current state."""
+        r = Robot(self._table)
+        if self.placed[i]:
+            r.place(Position(int(self.x[i]), int(self.y[i])), FACINGS[self.facing[i]])
+        return r
@@ -0,0 +1,120 @@
+# follow.py
+"""
+Follow a command log that is being appended to.
+
+A Follower keeps one robot alive. Each poll() reads only the bytes added
+since the last one, runs the complete lines among them, and records the
+resume point (byte offset, line number, robot state) in an optional
+checkpoint file. A restarted Follower picks up from that checkpoint
+instead of re-running the log from the start.
+"""
+from __future__ import annotations
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from functools import partial
+from typing import Iterator, Optional, Tuple
+
+from .cli import OutputBuffer, run_commands
+from .command import Command, ParseCache
+from .ingest import BLOCK_SIZE, scan_commands
+from .robot import Robot, Table, NOT_PLACED
+
+
+@dataclass
+class Checkpoint:
+    """Where to resume: `offset` is the start of line `lineno`, reached in `state`."""
+    offset: int = 0
+    lineno: int = 1
+    state: int = NOT_PLACED
+
+
+def load_checkpoint(path: str, table: Table) -> Checkpoint:
+    """Read a checkpoint file; a missing file means starting from the top."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return Checkpoint()
+    if (data.get("width"), data.get("height")) != (table.width, table.height):
+        raise ValueError(f"{path}: checkpoint is for a {data.get('width')}x{data.get('height')} table")
+    return Checkpoint(data["offset"], data["lineno"], data["state"])
+
+
+def save_checkpoint(path: str, checkpoint: Checkpoint, table: Table):
+    """Write a checkpoint file atomically: readers see the old or the new one, never a mix."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(dict(asdict(checkpoint), width=table.width, height=table.height), f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class Follower:
+    """
+    Runs the new complete lines of a growing file on one robot, writing
+    output for `mode` (VERBOSE or REPORTS_ONLY) to `out`. A partial last
+    line is left for a later poll. If the file shrinks below the resume
+    offset, it is taken to have been replaced and is followed from the top
+    with a new robot. Lines are parsed through `cache` if given.
+    """
+
+    def __init__(self, path: str, mode: str, out: OutputBuffer, table: Optional[Table] = None,
+                 checkpoint: Optional[str] = None, block_size: int = BLOCK_SIZE,
+                 cache: Optional[ParseCache] = None):
+        self.path = path
+        self.mode = mode
+        self.out = out
+        self.robot = Robot(table if table is not None else Table())
+        self.checkpoint_path = checkpoint
+        self.block_size = block_size
+        self.cache = cache
+        self.position = Checkpoint()
+        if checkpoint is not None:
+            self.position = load_checkpoint(checkpoint, self.robot.table)
+        self.robot.state = self.position.state
+
+    def _new_lines(self, f) -> Iterator[Tuple[int, bytes, Optional[Command]]]:
+        parse = self.cache.parse if self.cache is not None else None
+        pending = b""
+        for block in iter(partial(f.read, self.block_size), b""):
+            data = pending + block
+            # a "\r" at the very end may be the first half of a "\r\n"
+            cut = max(data.rfind(b"\n"), data.rfind(b"\r", 0, len(data) - 1))
+            if cut < 0:
+                pending = data
+                continue
+            complete, pending = data[:cut + 1], data[cut + 1:]
+            yield from scan_commands(complete, lineno=self.position.lineno, parse=parse)
+            self.position.offset += len(complete)
+            self.position.lineno += len(complete.splitlines())
+
+    def poll(self) -> int:
+        """Run the lines appended since the last poll; returns the bytes consumed (raises FileNotFoundError)."""
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < self.position.offset:
+                self.position = Checkpoint()
+                self.robot.state = NOT_PLACED
+            start = self.position.offset
+            if size == start:
+                return 0
+            f.seek(start)
+            run_commands(self._new_lines(f), self.robot, self.mode, self.out)
+
+        self.out.flush()
+        self.position.state = self.robot.state
+        consumed = self.position.offset - start
+        if consumed and self.checkpoint_path is not None:
+            save_checkpoint(self.checkpoint_path, self.position, self.robot.table)
+        return consumed
+
+    def follow(self, interval: float = 1.0, polls: Optional[int] = None):
+        """poll() every `interval` seconds, forever or `polls` times."""
+        count = 0
+        while polls is None or count < polls:
+            if not self.poll():
+                time.sleep(interval)
+            count += 1
@@ -0,0 +1,189 @@
+# ingest.py
+"""
+Command lines out of large files, a block at a time.
+
+Files are memory-mapped and cut into blocks of whole lines. Each block is
+split, stripped and filtered with C-level bytes methods and itertools, so
+there is no Python code per line. scan_commands() also parses each
+distinct line of a block once, because scripts repeat a few lines many
+times. Lines end at b"\n", b"\r\n" or b"\r", as in text-mode files.
+"""
+from __future__ import annotations
+import mmap
+import os
+from contextlib import contextmanager
+from itertools import compress, count, repeat
+from operator import and_, gt
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+from .command import Command, CommandParser
+
+# the ASCII characters str.strip() treats as whitespace
+WHITESPACE = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+# bytes scanned per step; bounds peak memory independently of the file size
+BLOCK_SIZE = 1 << 22
+
+# lines of each block sampled to decide whether to parse distinct lines only
+DEDUPE_SAMPLE = 1 << 10
+
+Buffer = Union[bytes, mmap.mmap]
+
+# the class's own parse, to tell when it has been swapped (by a Profiler)
+_PARSE = CommandParser.__dict__["parse"]
+
+
+def _after_line_end(buf: Buffer, pos: int, stop: int, end: int) -> int:
+    # offset just past the last line end in buf[pos:stop], or else past the
+    # first one after it (`end` if there is none); b"\r\n" stays together
+    cut = max(buf.rfind(b"\n", pos, stop), buf.rfind(b"\r", pos, stop))
+    if cut < 0:
+        nl, cr = buf.find(b"\n", stop, end), buf.find(b"\r", stop, end)
+        cut = min(nl, cr) if nl >= 0 and cr >= 0 else max(nl, cr)
+        if cut < 0:
+            return end
+    if cut + 1 < end and buf[cut:cut + 2] == b"\r\n":
+        cut += 1
+    return cut + 1
+
+
+def iter_blocks(buf: Buffer, start: int = 0, end: int = -1,
+                block_size: int = BLOCK_SIZE) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (offset, block) pairs that cover buf[start:end] in order. Each
+    block is about `block_size` bytes, copied out of buf, and ends after a
+    line end (or at `end`), so no line is split between blocks.
+    """
+    if end < 0:
+        end = len(buf)
+    pos = start
+    while pos < end:
+        stop = min(pos + block_size, end)
+        if stop < end:
+            stop = _after_line_end(buf, pos, stop, end)
+        yield pos, buf[pos:stop]
+        pos = stop
+
+
+def _block_lines(block: bytes, lineno: int) -> Tuple[List[int], List[bytes], int]:
+    # (line numbers, lines, count of all lines) for the command lines of a block
+    lines = list(map(bytes.strip, block.splitlines(), repeat(WHITESPACE)))
+    # nonblank and not a comment: bool(line) > line.startswith(b"#")
+    keep = list(map(gt, map(bool, lines), map(bytes.startswith, lines, repeat(b"#"))))
+    if not block.isascii():
+        keep = list(map(and_, keep, map(_is_command_text, lines)))
+    return list(compress(count(lineno), keep)), list(compress(lines, keep)), len(lines)
+
+
+def scan_lines(buf: Buffer, start: int = 0, end: int = -1, lineno: int = 1,
+               block_size: int = BLOCK_SIZE) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (lineno, line) for each command line in buf[start:end].
+
+    Each yielded line is stripped of whitespace and is neither blank nor a
+    "#" comment; those are skipped without being decoded. `lineno` counts
+    every line, skipped or not, starting from the `lineno` argument.
+    buf[start:end] is copied one block at a time, so memory use does not
+    grow with the size of buf.
+    """
+    for _, block in iter_blocks(buf, start, end, block_size):
+        numbers, lines, total = _block_lines(block, lineno)
+        yield from zip(numbers, lines)
+        lineno += total
+
+
+def scan_commands(buf: Buffer, start: int = 0, end: int = -1, lineno: int = 1,
+                  block_size: int = BLOCK_SIZE, parse: Optional[Callable[[bytes], Optional[Command]]] = None
+                  ) -> Iterator[Tuple[int, bytes, Optional[Command]]]:
+    """
+    Like scan_lines(), but yield (lineno, line, command), where command is
+    parse(line), CommandParser.parse by default. Where a block repeats
+    itself, `parse` (such as a ParseCache's) is only called on its distinct
+    lines. While CommandParser.parse is swapped out, as by a Profiler,
+    `parse` is called for every line so that each line is counted.
+    """
+    dedupe = CommandParser.__dict__["parse"] is _PARSE
+    parse = parse if parse is not None else CommandParser.parse
+    for _, block in iter_blocks(buf, start, end, block_size):
+        numbers, lines, total = _block_lines(block, lineno)
+        # deduplicating only pays if a sample of the block repeats itself
+        if dedupe and len(set(lines[:DEDUPE_SAMPLE])) * 2 <= min(len(lines), DEDUPE_SAMPLE):
+            distinct = set(lines)
+            commands = dict(zip(distinct, map(parse, distinct)))
+            yield from zip(numbers, lines, map(commands.__getitem__, lines))
+        else:
+            yield from zip(numbers, lines, map(parse, lines))
+        lineno += total
+
+
+def scan_lines_at(buf: Buffer, start: int = 0, end: int = -1, lineno: int = 1,
+                  block_size: int = BLOCK_SIZE) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Like scan_lines(), but yield (lineno, next_offset, line), where
+    next_offset is where the line after it starts, so that a later
+    scan_lines(buf, next_offset, lineno=lineno + 1) resumes from there.
+    """
+    for offset, block in iter_blocks(buf, start, end, block_size):
+        ascii_only = block.isascii()
+        for lineno, raw in enumerate(block.splitlines(keepends=True), lineno):
+            offset += len(raw)
+            line = raw.strip(WHITESPACE)
+            if line and line[0] != 0x23 and (ascii_only or _is_command_text(line)):
+                yield lineno, offset, line
+        lineno += 1
+
+
+def chunk_ranges(buf: Buffer, parts: int, min_size: int = 1) -> List[Tuple[int, int]]:
+    """
+    Split buf into at most `parts` (start, end) byte ranges of similar size,
+    each ending just after a newline (or at the end of buf), so that every
+    line lies in exactly one range. Fewer ranges are made if buf is smaller
+    than parts * min_size bytes. An empty buf gives [(0, 0)].
+    """
+    size = len(buf)
+    parts = max(1, min(parts, size // max(min_size, 1)))
+    ranges = []
+    start = 0
+    for i in range(1, parts):
+        cut = size * i // parts
+        if cut <= start:
+            continue
+        nl = buf.find(b"\n", cut - 1)
+        if nl < 0 or nl + 1 >= size:
+            break
+        ranges.append((start, nl + 1))
+        start = nl + 1
+    ranges.append((start, size))
+    return ranges
+
+
+def _is_command_text(line: bytes) -> bool:
+    # non-ASCII whitespace only strips once decoded
+    if line.isascii():
+        return True
+    text = line.decode("utf-8", "replace").strip()
+    return bool(text) and not text.startswith("#")
+
+
+@contextmanager
+def open_buffer(path: Union[str, os.PathLike]) -> Iterator[Buffer]:
+    """Memory-map a file read-only (empty files map to b"")."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def iter_command_lines(path: Union[str, os.PathLike]) -> Iterator[Tuple[int, bytes]]:
+    """Yield (lineno, line) for each command line of a file, via mmap."""
+    with open_buffer(path) as buf:
+        yield from scan_lines(buf)
+
+
+def iter_commands(path: Union[str, os.PathLike], parse: Optional[Callable[[bytes], Optional[Command]]] = None
+                  ) -> Iterator[Tuple[int, bytes, Optional[Command]]]:
+    """Yield (lineno, line, command) for each command line of a file, via mmap (see scan_commands())."""
+    with open_buffer(path) as buf:
+        yield from scan_commands(buf, parse=parse)
@@ -0,0 +1,210 @@
+# instrument.py
+"""
+Opt-in profiling of CommandParser.parse, ParseCache.parse and
+Robot.execute_command.
+
+A Profiler swaps timed wrappers in for those methods while it is
+installed and puts the originals back afterwards, so code that never
+installs one runs exactly as before. A line parsed through a ParseCache
+is counted once, whether or not the cache had it:
+
+    with Profiler() as profiler:
+        run_file(path, QUIET, out)
+    print(profiler.format())
+"""
+from __future__ import annotations
+import json
+from collections import Counter
+from time import perf_counter_ns
+from typing import Dict, Optional
+
+from .command import CommandParser, CommandType, ParseCache
+from .robot import Robot
+
+BUCKETS = 64
+
+
+class LatencyHistogram:
+    """Call latencies in power-of-two buckets: bucket i holds [2**(i-1), 2**i) ns."""
+    __slots__ = ("counts", "total_ns")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.total_ns = 0
+
+    def add(self, ns: int):
+        self.counts[min(ns.bit_length(), BUCKETS - 1)] += 1
+        self.total_ns += ns
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, q: float) -> int:
+        """Upper bound in ns of the bucket holding the q-th percentile (0 if empty)."""
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return 1 << i
+        return 0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ns": self.total_ns,
+            "buckets": {str(1 << i): n for i, n in enumerate(self.counts) if n},
+        }
+
+
+class _TimedOutput:
+    # wraps a cli.OutputBuffer, adding the time spent writing to the profiler
+    __slots__ = ("_out", "_profiler")
+
+    def __init__(self, out, profiler: Profiler):
+        self._out = out
+        self._profiler = profiler
+
+    def write(self, text: str):
+        start = perf_counter_ns()
+        self._out.write(text)
+        self._profiler.output_ns += perf_counter_ns() - start
+
+    def flush(self):
+        start = perf_counter_ns()
+        self._out.flush()
+        self._profiler.output_ns += perf_counter_ns() - start
+
+
+class Profiler:
+    """
+    Per-CommandType counters and latency histograms for parsing and
+    execution. Parse results are keyed by CommandType, with None for
+    rejected lines.
+    """
+
+    def __init__(self):
+        self.parse: Dict[Optional[CommandType], LatencyHistogram] = {}
+        self.execute: Dict[CommandType, LatencyHistogram] = {}
+        self.failed: Counter = Counter()
+        self.output_ns = 0
+        self.wall_ns = 0
+        self._saved = None
+        self._started = 0
+
+    @property
+    def rejected(self) -> int:
+        hist = self.parse.get(None)
+        return hist.count if hist is not None else 0
+
+    def install(self):
+        if self._saved is not None:
+            raise RuntimeError("profiler is already installed")
+        self._saved = (CommandParser.__dict__["parse"], ParseCache.__dict__["parse"],
+                       Robot.__dict__["execute_command"])
+        parse, cache_parse, execute_command = CommandParser.parse, ParseCache.parse, Robot.execute_command
+        parse_stats, execute_stats, failed = self.parse, self.execute, self.failed
+        # set while a ParseCache lookup runs, so its misses are not counted twice
+        in_cache = False
+
+        def record_parse(result, ns):
+            kind = result.type if result is not None else None
+            hist = parse_stats.get(kind)
+            if hist is None:
+                hist = parse_stats[kind] = LatencyHistogram()
+            hist.add(ns)
+
+        def timed_parse(cmd):
+            if in_cache:
+                return parse(cmd)
+            start = perf_counter_ns()
+            result = parse(cmd)
+            record_parse(result, perf_counter_ns() - start)
+            return result
+
+        def timed_cache_parse(cache, line):
+            nonlocal in_cache
+            in_cache = True
+            start = perf_counter_ns()
+            try:
+                result = cache_parse(cache, line)
+            finally:
+                in_cache = False
+            record_parse(result, perf_counter_ns() - start)
+            return result
+
+        def timed_execute_command(robot, cmd):
+            start = perf_counter_ns()
+            result = execute_command(robot, cmd)
+            ns = perf_counter_ns() - start
+            hist = execute_stats.get(cmd.type)
+            if hist is None:
+                hist = execute_stats[cmd.type] = LatencyHistogram()
+            hist.add(ns)
+            if result is False:
+                failed[cmd.type] += 1
+            return result
+
+        CommandParser.parse = staticmethod(timed_parse)
+        ParseCache.parse = timed_cache_parse
+        Robot.execute_command = timed_execute_command
+        self._started = perf_counter_ns()
+
+    def uninstall(self):
+        if self._saved is None:
+            return
+        self.wall_ns += perf_counter_ns() - self._started
+        CommandParser.parse, ParseCache.parse, Robot.execute_command = self._saved
+        self._saved = None
+
+    def __enter__(self) -> Profiler:
+        self.install()
+        return self
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+    def wrap_output(self, out):
+        """Wrap an OutputBuffer so that time spent writing output is counted."""
+        return _TimedOutput(out, self)
+
+    def phases(self) -> Dict[str, int]:
+        """Nanoseconds spent parsing, executing, writing output, and elsewhere."""
+        parse = sum(h.total_ns for h in self.parse.values())
+        execute = sum(h.total_ns for h in self.execute.values())
+        other = max(self.wall_ns - parse - execute - self.output_ns, 0)
+        return {"parse": parse, "execute": execute, "output": self.output_ns, "other": other}
+
+    def to_dict(self) -> dict:
+        return {
+            "wall_ns": self.wall_ns,
+            "phases_ns": self.phases(),
+            "rejected": self.rejected,
+            "parse": {(k.name if k is not None else "INVALID"): h.to_dict() for k, h in self.parse.items()},
+            "execute": {k.name: dict(h.to_dict(), failed=self.failed[k]) for k, h in self.execute.items()},
+        }
+
+    def dump_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def format(self) -> str:
+        """Human-readable breakdown by phase and by command type."""
+        wall = self.wall_ns or 1
+        lines = [f"profile: {self.wall_ns / 1e6:.3f} ms", f"{'phase':<10}{'ms':>12}{'share':>9}"]
+        for name, ns in self.phases().items():
+            lines.append(f"{name:<10}{ns / 1e6:>12.3f}{ns / wall:>9.1%}")
+
+        lines.append(f"{'command':<10}{'parsed':>10}{'executed':>10}{'failed':>8}"
+                     f"{'mean ns':>10}{'p50 ns':>10}{'p99 ns':>10}")
+        for kind in CommandType:
+            parsed, executed = self.parse.get(kind), self.execute.get(kind)
+            if parsed is None and executed is None:
+                continue
+            hist = executed or LatencyHistogram()
+            mean = hist.total_ns // hist.count if hist.count else 0
+            lines.append(f"{kind.name:<10}{parsed.count if parsed else 0:>10}{hist.count:>10}"
+                         f"{self.failed[kind]:>8}{mean:>10}{hist.percentile(50):>10}{hist.percentile(99):>10}")
+        lines.append(f"{'invalid':<10}{self.rejected:>10}")
+        return "\n".join(lines) + "\n"
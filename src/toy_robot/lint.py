@@ -0,0 +1,139 @@
+# lint.py
+"""
+Check which lines of a command file are valid, without parsing them into
+Commands or running a Robot.
+
+ASCII lines are checked against precompiled byte patterns that accept
+exactly what CommandParser.is_valid() accepts. Lines with non-ASCII bytes
+fall back to is_valid() on their UTF-8 decoding. Real files repeat a few
+distinct lines many times. So each block of the file is counted by
+distinct line (collections.Counter, in C), and each distinct line is
+checked once. Blocks are only walked line by line to number the invalid
+lines they contain.
+"""
+from __future__ import annotations
+import os
+import re
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Optional
+
+from .command import CommandParser
+from .ingest import Buffer, chunk_ranges, iter_blocks, open_buffer
+
+# ASCII whitespace as str.strip() and str.split() see it
+_WS = rb"[\t\x0b\x0c\r\x1c-\x1f ]"
+# what int() accepts, in ASCII
+_INT = rb"[+-]?[0-9]+(?:_[0-9]+)*"
+_COMMAND = (rb"%(ws)s*(?:MOVE|LEFT|RIGHT|REPORT"
+            rb"|PLACE%(ws)s+%(int)s%(ws)s*,%(ws)s*%(int)s%(ws)s*,%(ws)s*(?:NORTH|EAST|SOUTH|WEST))%(ws)s*"
+            % {b"ws": _WS, b"int": _INT})
+_IGNORED = rb"%s*(?:#[^\n]*)?" % _WS
+
+COMMAND_LINE = re.compile(_COMMAND, re.I)
+IGNORED_LINE = re.compile(_IGNORED)
+
+# bytes checked per step
+BLOCK_SIZE = 1 << 16
+# distinct lines whose verdicts are remembered during one check
+VERDICT_CACHE_SIZE = 1 << 12
+# chunks smaller than this are not worth a worker round trip
+MIN_CHUNK_BYTES = 1 << 22
+
+# line verdicts
+VALID, INVALID, IGNORED = "valid", "invalid", "ignored"
+
+
+def classify(line: bytes) -> str:
+    """
+    VALID if CommandParser.is_valid() accepts the line's UTF-8 decoding,
+    IGNORED for blank and "#" comment lines, INVALID otherwise.
+    """
+    if line.isascii():
+        if COMMAND_LINE.fullmatch(line):
+            return VALID
+        return IGNORED if IGNORED_LINE.fullmatch(line) else INVALID
+    text = line.decode("utf-8", "replace")
+    if CommandParser.is_valid(text):
+        return VALID
+    text = text.strip()
+    return IGNORED if not text or text.startswith("#") else INVALID
+
+
+@dataclass
+class CheckResult:
+    """Line counts of a checked file, and the numbers of its invalid lines."""
+    lines: int = 0
+    valid: int = 0
+    ignored: int = 0
+    invalid_lines: array = field(default_factory=lambda: array("q"))
+
+    @property
+    def invalid(self) -> int:
+        return len(self.invalid_lines)
+
+    def extend(self, other: CheckResult):
+        """Append the result of the lines that follow these."""
+        self.invalid_lines.extend(n + self.lines for n in other.invalid_lines)
+        self.lines += other.lines
+        self.valid += other.valid
+        self.ignored += other.ignored
+
+    def format(self) -> str:
+        return (f"lines: {self.lines}\n"
+                f"valid: {self.valid}\n"
+                f"ignored: {self.ignored}\n"
+                f"invalid: {self.invalid}\n")
+
+
+def check_buffer(buf: Buffer, start: int = 0, end: int = -1, block_size: int = BLOCK_SIZE) -> CheckResult:
+    """Check the lines in buf[start:end]; line numbers count from 1 at `start`."""
+    result = CheckResult()
+    verdicts = {}
+    for _, block in iter_blocks(buf, start, end, block_size):
+        lines = block.splitlines()
+
+        invalid = set()
+        for line, count in Counter(lines).items():
+            verdict = verdicts.get(line)
+            if verdict is None:
+                if len(verdicts) >= VERDICT_CACHE_SIZE:
+                    verdicts.clear()
+                verdict = verdicts[line] = classify(line)
+            if verdict is VALID:
+                result.valid += count
+            elif verdict is IGNORED:
+                result.ignored += count
+            else:
+                invalid.add(line)
+        if invalid:
+            result.invalid_lines.extend(n for n, line in enumerate(lines, result.lines + 1) if line in invalid)
+        result.lines += len(lines)
+    return result
+
+
+def check_range(path: str, start: int, end: int) -> CheckResult:
+    """Check bytes [start, end) of a file."""
+    with open_buffer(path) as buf:
+        return check_buffer(buf, start, end)
+
+
+def check_file(path: str, jobs: Optional[int] = 1, min_chunk: int = MIN_CHUNK_BYTES) -> CheckResult:
+    """
+    Check a file (raises FileNotFoundError). With jobs > 1 (None: CPU
+    count), chunks of at least `min_chunk` bytes are checked in parallel.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    with open_buffer(path) as buf:
+        ranges = chunk_ranges(buf, jobs, min_chunk)
+        if jobs == 1 or len(ranges) == 1:
+            return check_buffer(buf)
+
+    result = CheckResult()
+    with ProcessPoolExecutor(max_workers=min(jobs, len(ranges))) as pool:
+        for part in pool.map(partial(check_range, path), *zip(*ranges)):
+            result.extend(part)
+    return result
@@ -0,0 +1,135 @@
+# obstacles.py
+from __future__ import annotations
+import os
+from typing import Iterable, Iterator, Tuple, Union
+
+from .ingest import iter_command_lines
+
+Cell = Tuple[int, int]
+
+# rough per-cell cost of a hashed index, used to pick the cheaper index
+HASHED_BYTES_PER_CELL = 64
+
+
+class ObstacleIndex:
+    """
+    The blocked cells of a table, immutable once built.
+    Subclasses trade memory for speed: see BitmapObstacles and HashedObstacles.
+    """
+    __slots__ = ("_width", "_height", "_count")
+
+    def __init__(self, width: int, height: int):
+        self._width = width
+        self._height = height
+        self._count = 0
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    def is_blocked(self, x: int, y: int) -> bool:
+        """True if on-table cell (x, y) is blocked."""
+        raise NotImplementedError
+
+    def packed_cells(self) -> Iterator[int]:
+        """Blocked cells as y * width + x, in no particular order."""
+        raise NotImplementedError
+
+    def __iter__(self) -> Iterator[Cell]:
+        for cell in self.packed_cells():
+            y, x = divmod(cell, self._width)
+            yield x, y
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _pack(self, cells: Iterable[Cell]) -> Iterator[int]:
+        for x, y in cells:
+            if not (0 <= x < self._width and 0 <= y < self._height):
+                raise ValueError(f"obstacle ({x},{y}) is off the {self._width}x{self._height} table")
+            yield y * self._width + x
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._width}x{self._height}, {self._count} cells)"
+
+
+class BitmapObstacles(ObstacleIndex):
+    """One bit per cell: width*height/8 bytes, for densely blocked tables."""
+    __slots__ = ("_bits",)
+
+    def __init__(self, width: int, height: int, cells: Iterable[Cell] = ()):
+        super().__init__(width, height)
+        bits = bytearray((width * height + 7) // 8)
+        for i in self._pack(cells):
+            if not bits[i >> 3] & (1 << (i & 7)):
+                bits[i >> 3] |= 1 << (i & 7)
+                self._count += 1
+        self._bits = bytes(bits)
+
+    def is_blocked(self, x: int, y: int) -> bool:
+        i = y * self._width + x
+        return bool(self._bits[i >> 3] & (1 << (i & 7)))
+
+    def packed_cells(self) -> Iterator[int]:
+        for byte_index, byte in enumerate(self._bits):
+            if byte:
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        yield byte_index * 8 + bit
+
+
+class HashedObstacles(ObstacleIndex):
+    """A set of blocked cells: memory grows with the obstacle count, not the table area."""
+    __slots__ = ("_cells",)
+
+    def __init__(self, width: int, height: int, cells: Iterable[Cell] = ()):
+        super().__init__(width, height)
+        self._cells = frozenset(self._pack(cells))
+        self._count = len(self._cells)
+
+    def is_blocked(self, x: int, y: int) -> bool:
+        return y * self._width + x in self._cells
+
+    def packed_cells(self) -> Iterator[int]:
+        return iter(self._cells)
+
+
+def make_index(width: int, height: int, cells: Iterable[Cell], kind: str = "auto") -> ObstacleIndex:
+    """
+    Build an obstacle index. kind is "bitmap", "hashed" or "auto", which
+    picks whichever of the two needs less memory for these cells.
+    """
+    if kind == "bitmap":
+        return BitmapObstacles(width, height, cells)
+    if kind == "hashed":
+        return HashedObstacles(width, height, cells)
+    if kind != "auto":
+        raise ValueError(f"unknown obstacle index kind: {kind!r}")
+
+    cells = list(cells)
+    if width * height // 8 <= len(cells) * HASHED_BYTES_PER_CELL:
+        return BitmapObstacles(width, height, cells)
+    return HashedObstacles(width, height, cells)
+
+
+def read_cells(path: Union[str, os.PathLike]) -> Iterator[Cell]:
+    """
+    Read "x,y" lines from a file. Blank lines and "#" comments are ignored;
+    anything else raises ValueError.
+    """
+    for lineno, line in iter_command_lines(path):
+        parts = line.split(b",")
+        try:
+            x, y = parts
+            yield int(x), int(y)
+        except ValueError:
+            raise ValueError(f"{path}:{lineno}: expected 'x,y', got {line.decode('utf-8', 'replace')!r}") from None
+
+
+def load_obstacles(path: Union[str, os.PathLike], width: int, height: int, kind: str = "auto") -> ObstacleIndex:
+    """Bulk-load an obstacle index from a file of "x,y" lines."""
+    return make_index(width, height, read_cells(path), kind)
@@ -0,0 +1,77 @@
+# optimize.py
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+from .command import Command, CommandType
+from .robot import Robot
+
+_TURN_STEPS = {CommandType.LEFT: -1, CommandType.RIGHT: 1}
+
+
+@dataclass(frozen=True)
+class Run:
+    """
+    `count` consecutive commands executed as one step.
+
+    MOVE runs advance up to `count` cells. LEFT/RIGHT runs (mixed freely)
+    turn by their net `turns` clockwise quarter turns, reduced modulo 4.
+    PLACE and REPORT are never merged: their runs hold one command.
+    """
+    command: Command
+    count: int = 1
+    turns: int = 0
+
+
+def collapse(commands: Iterable[Command]) -> Iterator[Run]:
+    """Merge runs of MOVE and of LEFT/RIGHT in a command stream, lazily."""
+    pending: Optional[Command] = None
+    count = turns = 0
+
+    for cmd in commands:
+        step = _TURN_STEPS.get(cmd.type)
+        if pending is not None:
+            if cmd.type == CommandType.MOVE and pending.type == CommandType.MOVE:
+                count += 1
+                continue
+            if step is not None and pending.type in _TURN_STEPS:
+                count += 1
+                turns += step
+                continue
+            yield Run(pending, count, turns % 4)
+            pending = None
+
+        if cmd.type == CommandType.MOVE or step is not None:
+            pending, count, turns = cmd, 1, step or 0
+        else:
+            yield Run(cmd)
+
+    if pending is not None:
+        yield Run(pending, count, turns % 4)
+
+
+def execute_runs(robot: Robot, runs: Iterable[Run], results: Optional[list] = None) -> List[str]:
+    """
+    Execute collapsed runs on `robot` and return the REPORT outputs.
+    If `results` is given, it is extended with what execute_command() would
+    have returned for each original command, in order.
+    """
+    reports = []
+    for run in runs:
+        kind = run.command.type
+        if kind == CommandType.MOVE:
+            done = robot.advance(run.count)
+            if results is not None:
+                results.extend([True] * done)
+                results.extend([False] * (run.count - done))
+        elif kind in _TURN_STEPS:
+            ok = robot.rotate(run.turns)
+            if results is not None:
+                results.extend([ok] * run.count)
+        else:
+            result = robot.execute_command(run.command)
+            if kind == CommandType.REPORT:
+                reports.append(result)
+            if results is not None:
+                results.append(result)
+    return reports
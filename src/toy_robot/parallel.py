@@ -0,0 +1,59 @@
+# parallel.py
+"""
+Run one large command file on several CPUs.
+
+The file is split into chunks at line boundaries. Each chunk is compiled
+in a worker process into a CompiledProgram: a map from start state to end
+state, plus the states at each REPORT. Starting from NOT_PLACED, the
+parent chains the chunk programs in file order. The final state and the
+reports are exactly those of a sequential run.
+"""
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterator, List, Optional, Tuple
+
+from .ingest import chunk_ranges, open_buffer, scan_commands
+from .program import CompiledProgram
+from .robot import Robot, Table
+
+# chunks smaller than this are not worth a worker round trip
+MIN_CHUNK_BYTES = 1 << 20
+
+
+def compile_chunk(path: str, start: int, end: int, table: Table) -> CompiledProgram:
+    """Compile the valid commands in bytes [start, end) of a file."""
+    with open_buffer(path) as buf:
+        commands = (cmd for _, _, cmd in scan_commands(buf, start, end) if cmd is not None)
+        return CompiledProgram.compile(commands, table)
+
+
+def run_chunks(path: str, robot: Robot, jobs: Optional[int] = None,
+               min_chunk: int = MIN_CHUNK_BYTES) -> Iterator[Tuple[str, ...]]:
+    """
+    Run a command file on `robot`, compiling chunks of it in up to `jobs`
+    processes, and yield the REPORT outputs of each chunk in file order.
+    `robot` is advanced chunk by chunk as the results come in.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    with open_buffer(path) as buf:
+        ranges = chunk_ranges(buf, jobs, min_chunk)
+
+    task = partial(compile_chunk, path, table=robot.table)
+    if jobs == 1 or len(ranges) == 1:
+        for start, end in ranges:
+            yield task(start, end).run(robot)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(ranges))) as pool:
+        for program in pool.map(task, *zip(*ranges)):
+            yield program.run(robot)
+
+
+def run_parallel(path: str, jobs: Optional[int] = None, table: Optional[Table] = None,
+                 min_chunk: int = MIN_CHUNK_BYTES) -> Tuple[Robot, List[str]]:
+    """Run a command file on a new robot; returns (robot, REPORT outputs)."""
+    robot = Robot(table if table is not None else Table())
+    reports = [r for chunk in run_chunks(path, robot, jobs, min_chunk) for r in chunk]
+    return robot, reports
@@ -0,0 +1,153 @@
+# planner.py
+"""
+Shortest MOVE/LEFT/RIGHT scripts that drive a robot to a target cell.
+
+On tables small enough for precomputed Transitions, a breadth-first
+search runs backwards from the target over the whole state space once,
+giving the distance of every state to the target. The distance field is
+cached per (table, target), so later queries against the same target only
+walk down it: O(path length). Larger tables are searched forwards with A*
+on each query instead.
+"""
+from __future__ import annotations
+import heapq
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+from .command import Command, CommandParser, Direction, Position
+from .robot import Robot, Table, MAX_PRECOMPUTED_STATES, NOT_PLACED
+
+MOVE, LEFT, RIGHT = (CommandParser.SIMPLE_INSTANCES[name] for name in ("MOVE", "LEFT", "RIGHT"))
+
+# distance of states from which the target cannot be reached
+UNREACHABLE = -1
+
+# A* gives up after expanding this many states
+MAX_SEARCH_STATES = 1 << 20
+
+
+@lru_cache(maxsize=32)
+def _reverse_moves(table: Table) -> List[int]:
+    # MOVE is one-to-one apart from blocked moves (which map a state to
+    # itself), so each state has at most one MOVE predecessor
+    moves = table.transitions().move
+    previous = [NOT_PLACED] * table.state_count
+    for state in range(1, table.state_count):
+        nxt = moves[state]
+        if nxt != state:
+            previous[nxt] = state
+    return previous
+
+
+def _target_states(table: Table, target: Position, facing: Optional[Direction]) -> List[int]:
+    if not table.is_valid(target):
+        return []
+    facings = [facing] if facing is not None else list(Direction)
+    return [table.encode(target, f) for f in facings]
+
+
+@lru_cache(maxsize=64)
+def distance_field(table: Table, target: Position, facing: Optional[Direction] = None) -> Sequence[int]:
+    """
+    Commands needed to reach `target` (facing `facing`, or any facing if
+    None) from every state, indexed by state; UNREACHABLE where it cannot
+    be reached. Results are cached, least recently used first out, and
+    shared by callers, so they are returned as tuples.
+    """
+    if table.state_count > MAX_PRECOMPUTED_STATES:
+        raise ValueError(f"table has {table.state_count} states; distance fields need at most "
+                         f"{MAX_PRECOMPUTED_STATES}")
+    t = table.transitions()
+    previous_move = _reverse_moves(table)
+    # LEFT and RIGHT undo each other: the state that LEFT takes to s is right[s]
+    previous_left, previous_right = t.right, t.left
+
+    dist = [UNREACHABLE] * table.state_count
+    queue = _target_states(table, target, facing)
+    for state in queue:
+        dist[state] = 0
+    for state in queue:
+        d = dist[state] + 1
+        for prev in (previous_move[state], previous_left[state], previous_right[state]):
+            if prev != NOT_PLACED and dist[prev] == UNREACHABLE:
+                dist[prev] = d
+                queue.append(prev)
+    return tuple(dist)
+
+
+def _walk(table: Table, dist: Sequence[int], state: int) -> Optional[List[Command]]:
+    # follow the distance field downhill from `state`
+    d = dist[state]
+    if d == UNREACHABLE:
+        return None
+    t = table.transitions()
+    steps = ((MOVE, t.move), (LEFT, t.left), (RIGHT, t.right))
+    commands = []
+    while d > 0:
+        for cmd, nxt in steps:
+            if dist[nxt[state]] == d - 1:
+                commands.append(cmd)
+                state = nxt[state]
+                break
+        d -= 1
+    return commands
+
+
+def _search(table: Table, start: int, target: Position, facing: Optional[Direction],
+            limit: int) -> Optional[List[Command]]:
+    # A* over states with the Manhattan distance to the target as heuristic
+    goals = set(_target_states(table, target, facing))
+    if not goals:
+        return None
+    t = table.transitions()
+    steps = ((MOVE, t.move), (LEFT, t.left), (RIGHT, t.right))
+    width = table.width
+
+    def estimate(state: int) -> int:
+        y, x = divmod((state - 1) >> 2, width)
+        return abs(x - target.x) + abs(y - target.y)
+
+    came_from = {start: None}
+    cost = {start: 0}
+    heap = [(estimate(start), 0, start)]
+    while heap:
+        _, g, state = heapq.heappop(heap)
+        if state in goals:
+            commands = []
+            while came_from[state] is not None:
+                state, cmd = came_from[state]
+                commands.append(cmd)
+            commands.reverse()
+            return commands
+        if g > cost[state]:
+            continue
+        if len(cost) > limit:
+            raise ValueError(f"gave up after exploring {limit} states")
+        for cmd, nxt in steps:
+            s = nxt[state]
+            if s != state and g + 1 < cost.get(s, g + 2):
+                cost[s] = g + 1
+                came_from[s] = (state, cmd)
+                heapq.heappush(heap, (g + 1 + estimate(s), g + 1, s))
+    return None
+
+
+def plan_state(table: Table, state: int, target: Position, facing: Optional[Direction] = None,
+               limit: int = MAX_SEARCH_STATES) -> Optional[List[Command]]:
+    """
+    A shortest list of MOVE/LEFT/RIGHT commands taking a robot in packed
+    `state` to `target`, facing `facing` (any facing if None). Returns
+    None if the target cannot be reached. The commands are the shared
+    instances from CommandParser.SIMPLE_INSTANCES.
+    """
+    if state == NOT_PLACED:
+        raise ValueError("robot is not placed")
+    if table.state_count <= MAX_PRECOMPUTED_STATES:
+        return _walk(table, distance_field(table, target, facing), state)
+    return _search(table, state, target, facing, limit)
+
+
+def plan(robot: Robot, target: Position, facing: Optional[Direction] = None,
+         limit: int = MAX_SEARCH_STATES) -> Optional[List[Command]]:
+    """plan_state() from the robot's current state."""
+    return plan_state(robot.table, robot.state, target, facing, limit)
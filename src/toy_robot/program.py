@@ -0,0 +1,149 @@
+# program.py
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Tuple
+from .command import Position, Direction, Command, CommandType, CommandParser
+from .robot import Robot, Table
+
+# (start state -> class index, current state of each class) at one REPORT
+_ReportRecord = Tuple[List[int], Tuple[int, ...]]
+
+
+class CompiledProgram:
+    """
+    A command script compiled into a lookup table over every start state.
+
+    A robot on a Table has table.state_count possible states, so the effect of
+    a whole script is a function from start state to end state, plus the
+    states the robot is in at each REPORT. compile() evaluates that function
+    once for all start states; afterwards each run is a table lookup.
+    """
+
+    # refuse to compile for tables whose state space is unreasonably large
+    MAX_STATES = 1 << 20
+
+    def __init__(self, table: Table, end: List[int], records: List[_ReportRecord]):
+        self._table = table
+        self._end = end
+        self._records = records
+        self._reports: Dict[int, Tuple[str, ...]] = {}
+
+    @classmethod
+    def compile(cls, commands: Iterable[Command], table: Optional[Table] = None) -> CompiledProgram:
+        if table is None:
+            table = Table()
+        count = table.state_count
+        if count > cls.MAX_STATES:
+            raise ValueError(f"table has {count} states, more than MAX_STATES={cls.MAX_STATES}")
+
+        # Start states are tracked in classes that share the same current
+        # state. Once two starts meet they stay together, so after the first
+        # valid PLACE there is a single class and each command costs O(1).
+        classes = list(range(count))
+        owner = list(range(count))
+        records: List[_ReportRecord] = []
+        robot = Robot(table)
+        commands = iter(commands)
+        t = table.transitions()
+        # LEFT and RIGHT are one-to-one, so only MOVE and PLACE can merge classes
+        turns = {CommandType.LEFT: t.left, CommandType.RIGHT: t.right}
+
+        for cmd in commands:
+            kind = cmd.type
+            if kind == CommandType.REPORT:
+                records.append((owner, tuple(classes)))
+                continue
+            turn = turns.get(kind)
+            if turn is not None:
+                classes = [turn[state] for state in classes]
+                continue
+
+            if kind == CommandType.MOVE:
+                moves = t.move
+                nxt = [moves[state] for state in classes]
+                if len(set(nxt)) == len(nxt):
+                    classes = nxt
+                    continue
+            elif table.is_valid_xy(cmd.x, cmd.y):
+                nxt = [table.encode(Position(cmd.x, cmd.y), cmd.facing)] * len(classes)
+            else:
+                continue
+
+            index: Dict[int, int] = {}
+            remap = []
+            classes = []
+            for state in nxt:
+                c = index.get(state)
+                if c is None:
+                    c = index[state] = len(classes)
+                    classes.append(state)
+                remap.append(c)
+            owner = [remap[c] for c in owner]
+            if len(classes) == 1:
+                break
+
+        if len(classes) == 1:
+            # classes never split, so the rest of the script runs on one robot
+            robot.state = classes[0]
+            execute_command = robot.execute_command
+            report = CommandType.REPORT
+            for cmd in commands:
+                if cmd.type == report:
+                    records.append((owner, (robot.state,)))
+                else:
+                    execute_command(cmd)
+            classes = [robot.state]
+
+        return cls(table, [classes[c] for c in owner], records)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], table: Optional[Table] = None) -> CompiledProgram:
+        """Compile the valid lines of a script; invalid lines are ignored like in main()."""
+        cmds = (CommandParser.parse(line) for line in lines)
+        return cls.compile((cmd for cmd in cmds if cmd is not None), table)
+
+    @property
+    def table(self) -> Table:
+        return self._table
+
+    def _check_state(self, state: int):
+        if not self._table.is_valid_state(state):
+            raise ValueError(f"{state} is not a start state on {self._table}")
+
+    def end_state(self, state: int) -> int:
+        """End state of a robot that starts the script in `state`."""
+        self._check_state(state)
+        return self._end[state]
+
+    def report_states(self, state: int) -> List[int]:
+        """States the robot is in at each REPORT, for a given start state."""
+        self._check_state(state)
+        return [states[owner[state]] for owner, states in self._records]
+
+    def reports(self, state: int) -> Tuple[str, ...]:
+        """REPORT outputs produced for a given start state."""
+        out = self._reports.get(state)
+        if out is None:
+            self._check_state(state)
+            robot = Robot(self._table)
+            out = []
+            for s in self.report_states(state):
+                robot.state = s
+                out.append(robot.report())
+            out = self._reports[state] = tuple(out)
+        return out
+
+    def run(self, robot: Robot) -> Tuple[str, ...]:
+        """Apply the script to `robot` (on this program's table) and return its REPORT outputs."""
+        if robot.table != self._table:
+            raise ValueError(f"robot is on {robot.table}, but the program was compiled for {self._table}")
+        start = robot.state
+        robot.state = self._end[start]
+        return self.reports(start)
+
+    def run_from(self, pos: Optional[Position], facing: Optional[Direction]) -> Tuple[Robot, Tuple[str, ...]]:
+        """Run the script on a new robot starting at (pos, facing); pos must be a free cell."""
+        if pos is not None and facing is not None and not self._table.is_valid(pos):
+            raise ValueError(f"cannot start at ({pos.x},{pos.y}) on {self._table}")
+        robot = Robot(self._table)
+        robot.state = self._table.encode(pos, facing)
+        return robot, self.run(robot)
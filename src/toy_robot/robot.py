@@ -1,89 +1,329 @@
 # toy_robot.py
 from __future__ import annotations
 from dataclasses import dataclass
-import re
-import sys
-from typing import Iterable, List, Optional
-from .command import Position, Direction, Command, CommandType, CommandParser
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple, Union
+from .command import Position, Direction, Command, CommandType, CommandParser, ParseCache
+from .obstacles import ObstacleIndex, load_obstacles
+
+# facing codes index into this tuple; the order is clockwise so that a
+# right turn is +1 and a left turn is -1 (mod 4)
+FACINGS = tuple(Direction)
+FACING_CODES = {d: i for i, d in enumerate(FACINGS)}
+
+MOVE_OFFSETS = {
+    Direction.NORTH: (0, 1),
+    Direction.EAST:  (1, 0),
+    Direction.SOUTH: (0, -1),
+    Direction.WEST:  (-1, 0),
+}
+
+# encoded state of a robot that has not been placed
+NOT_PLACED = 0
+
+# tables with more states than this compute transitions instead of storing them
+MAX_PRECOMPUTED_STATES = 1 << 16
 
 @dataclass(frozen=True)
 class Table:
     width: int = 5
     height: int = 5
+    # blocked cells; a robot can neither be placed on nor move into them
+    obstacles: Optional[ObstacleIndex] = None
+
+    def __post_init__(self):
+        obstacles = self.obstacles
+        if obstacles is not None and (obstacles.width, obstacles.height) != (self.width, self.height):
+            raise ValueError(f"obstacle index is for a {obstacles.width}x{obstacles.height} table, "
+                             f"not {self.width}x{self.height}")
 
     def is_valid(self, pos: Position) -> bool:
-        return 0 <= pos.x < self.width and 0 <= pos.y < self.height
-        
+        return self.is_valid_xy(pos.x, pos.y)
+
+    def is_valid_xy(self, x: int, y: int) -> bool:
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        return self.obstacles is None or not self.obstacles.is_blocked(x, y)
+
+    @classmethod
+    def with_obstacles(cls, width: int, height: int, path: str, kind: str = "auto") -> Table:
+        """A table whose obstacles are bulk-loaded from a file of "x,y" lines."""
+        return cls(width, height, load_obstacles(path, width, height, kind))
+
+    @property
+    def state_count(self) -> int:
+        """Number of distinct robot states: 4 facings per cell, plus NOT_PLACED."""
+        return self.width * self.height * 4 + 1
+
+    def encode(self, pos: Optional[Position], facing: Optional[Direction]) -> int:
+        """Pack a robot state into an int in range(state_count)."""
+        if pos is None or facing is None:
+            return NOT_PLACED
+        return ((pos.y * self.width + pos.x) << 2 | FACING_CODES[facing]) + 1
+
+    def is_valid_state(self, state: int) -> bool:
+        """True for NOT_PLACED and for states of a robot on a free cell of this table."""
+        if state == NOT_PLACED:
+            return True
+        if not 0 < state < self.state_count:
+            return False
+        y, x = divmod((state - 1) >> 2, self.width)
+        return self.obstacles is None or not self.obstacles.is_blocked(x, y)
+
+    def decode(self, state: int) -> Tuple[Optional[Position], Optional[Direction]]:
+        """Inverse of encode()."""
+        if state == NOT_PLACED:
+            return None, None
+        cell, f = divmod(state - 1, 4)
+        y, x = divmod(cell, self.width)
+        return Position(x, y), FACINGS[f]
+
+    def transitions(self) -> Transitions:
+        """Next-state lookups for this table (shared by equal tables)."""
+        return _transitions(self)
+
+
+class Transitions:
+    """
+    Next state after MOVE, LEFT and RIGHT, each indexed by packed state.
+    A MOVE that would leave the table maps a state to itself, and every
+    command maps NOT_PLACED to itself.
+    """
+    __slots__ = ("move", "left", "right")
+
+    def __init__(self, move, left, right):
+        self.move = move
+        self.left = left
+        self.right = right
+
+
+class _MoveRule:
+    # computes Transitions.move entries for tables too big to precompute
+    __slots__ = ("_table", "_deltas")
+
+    def __init__(self, table: Table):
+        self._table = table
+        self._deltas = [MOVE_OFFSETS[d] for d in FACINGS]
+
+    def __getitem__(self, state: int) -> int:
+        if state == NOT_PLACED:
+            return state
+        cell, f = divmod(state - 1, 4)
+        y, x = divmod(cell, self._table.width)
+        dx, dy = self._deltas[f]
+        if self._table.is_valid_xy(x + dx, y + dy):
+            return state + (dy * self._table.width + dx) * 4
+        return state
+
+
+class _TurnRule:
+    # computes Transitions.left/right entries for tables too big to precompute
+    __slots__ = ("_step",)
+
+    def __init__(self, step: int):
+        self._step = step
+
+    def __getitem__(self, state: int) -> int:
+        if state == NOT_PLACED:
+            return state
+        f = (state - 1) & 3
+        return state - f + ((f + self._step) & 3)
+
+
+@lru_cache(maxsize=32)
+def _transitions(table: Table) -> Transitions:
+    rules = Transitions(_MoveRule(table), _TurnRule(-1), _TurnRule(1))
+    if table.state_count > MAX_PRECOMPUTED_STATES:
+        return rules
+    states = range(table.state_count)
+    return Transitions([rules.move[s] for s in states],
+                       [rules.left[s] for s in states],
+                       [rules.right[s] for s in states])
+
+
+def _pack_bits(flags: bytearray) -> bytearray:
+    # one 0/1 byte per flag -> one bit per flag, least significant first
+    bits = bytearray()
+    for i in range(0, len(flags), 8):
+        bits.append((int.from_bytes(flags[i:i + 8], "little") * 0x0102040810204080 >> 56) & 0xFF)
+    return bits
+
+
+@dataclass
+class RunResult:
+    """
+    Outcome of Robot.run(): the final state, one success bit per command
+    (command i is bit i % 8 of successes[i // 8]) and the REPORT outputs
+    in order.
+    """
+    state: int
+    count: int
+    successes: bytearray
+    reports: List[str]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def succeeded(self, i: int) -> bool:
+        if not 0 <= i < self.count:
+            raise IndexError("command index out of range")
+        return bool(self.successes[i >> 3] >> (i & 7) & 1)
+
+    @property
+    def successful(self) -> int:
+        return int.from_bytes(self.successes, "little").bit_count()
+
+    @property
+    def failed(self) -> int:
+        return self.count - self.successful
+
+
+# stands in for lines that do not parse; its type matches no command
+_UNPARSED = Command(None)
+
+
 class Robot:
+    """
+    A robot on a Table. Its state is one int packed with Table.encode(), and
+    MOVE/LEFT/RIGHT are lookups in the table's precomputed Transitions.
+    """
+    __slots__ = ("_table", "_state", "_moves", "_lefts", "_rights")
 
-    MOVE_OFFSETS = {
-        Direction.NORTH: (0, 1),
-        Direction.EAST:  (1, 0),
-        Direction.SOUTH: (0, -1),
-        Direction.WEST:  (-1, 0),
+    MOVE_OFFSETS = MOVE_OFFSETS
+
+    # CommandType -> name of the method that executes it
+    HANDLERS = {
+        CommandType.MOVE: "move",
+        CommandType.LEFT: "left",
+        CommandType.RIGHT: "right",
+        CommandType.REPORT: "report",
     }
 
     def __init__(self, table: Table):
         self._table = table
-        self._pos: Optional[Position] = None
-        self._facing: Optional[Direction] = None
+        self._state = NOT_PLACED
+        t = table.transitions()
+        self._moves, self._lefts, self._rights = t.move, t.left, t.right
+
+    @property
+    def table(self) -> Table:
+        return self._table
 
     @property
     def pos(self) -> Optional[Position]:
         """Current position (x, y) of the robot, or None if not placed."""
-        return self._pos
+        return self._table.decode(self._state)[0]
 
     @property
     def facing(self) -> Optional[Direction]:
         """Current facing direction of the robot, or None if not placed."""
-        return self._facing
+        return self._table.decode(self._state)[1]
+
+    # older spellings of pos/facing
+    _pos = pos
+    _facing = facing
+
+    @property
+    def state(self) -> int:
+        """Current state packed with Table.encode()."""
+        return self._state
+
+    @state.setter
+    def state(self, state: int):
+        if not self._table.is_valid_state(state):
+            raise ValueError(f"{state} is not a robot state on {self._table}")
+        self._state = state
 
     def is_placed(self) -> bool:
-        return self._pos is not None and self._facing is not None
+        return self._state != NOT_PLACED
 
     def place(self, pos: Position, facing: Direction) -> bool:
-        if self._table.is_valid(pos):
-            self._pos = pos
-            self._facing = facing
+        return self._place(pos.x, pos.y, facing)
+
+    def _place(self, x: int, y: int, facing: Direction) -> bool:
+        table = self._table
+        if table.is_valid_xy(x, y):
+            self._state = ((y * table.width + x) << 2 | FACING_CODES[facing]) + 1
             return True
 
         return False
 
     def left(self) -> bool:
-        if self.is_placed():
-            self._facing = self._facing.left()
+        if self._state:
+            self._state = self._lefts[self._state]
             return True
 
         return False    
 
     def right(self) -> bool:
-        if self.is_placed():
-            self._facing = self._facing.right()
+        if self._state:
+            self._state = self._rights[self._state]
             return True
 
         return False
 
     def move(self) -> bool:
-        if not self.is_placed():
+        state = self._state
+        if not state:
             return False
 
-        dx, dy = self.MOVE_OFFSETS[self._facing]
-        nxt = Position(self._pos.x + dx, self._pos.y + dy)
-        if self._table.is_valid(nxt):
-            self._pos = nxt 
+        nxt = self._moves[state]
+        if nxt != state:
+            self._state = nxt
             return True
 
         return False
 
+    def advance(self, steps: int) -> int:
+        """
+        Same as calling move() `steps` times; returns how many moves succeeded.
+        On a table without obstacles this is O(1).
+        """
+        state = self._state
+        if not state or steps <= 0:
+            return 0
+
+        table = self._table
+        if table.obstacles is not None:
+            moves = self._moves
+            done = 0
+            while done < steps:
+                nxt = moves[state]
+                if nxt == state:
+                    break
+                state = nxt
+                done += 1
+            self._state = state
+            return done
+
+        cell, f = divmod(state - 1, 4)
+        y, x = divmod(cell, table.width)
+        dx, dy = MOVE_OFFSETS[FACINGS[f]]
+        room = (x if dx < 0 else table.width - 1 - x) if dx else (y if dy < 0 else table.height - 1 - y)
+        done = min(steps, room)
+        self._state = state + (dy * table.width + dx) * 4 * done
+        return done
+
+    def rotate(self, turns: int) -> bool:
+        """Turn right `turns` times (negative: left); same result as right()/left()."""
+        if not self._state:
+            return False
+        rights = self._rights
+        for _ in range(turns % 4):
+            self._state = rights[self._state]
+        return True
+
     def report(self) -> Optional[str]:
-        if not self.is_placed():
+        if not self._state:
             return "Robot not placed"
-        return f"x:{self._pos.x},y:{self._pos.y},facing:{self._facing.name}"
+        pos, facing = self._table.decode(self._state)
+        return f"x:{pos.x},y:{pos.y},facing:{facing.name}"
 
     def __str__(self):
-        if not self.is_placed():
+        if not self._state:
             return "Robot not placed"
-        return f"Robot at ({self._pos.x},{self._pos.y}) facing {self._facing.name}"        
+        pos, facing = self._table.decode(self._state)
+        return f"Robot at ({pos.x},{pos.y}) facing {facing.name}"        
 
     def execute_command(self, cmd: Command):
         """
@@ -92,53 +332,85 @@ class Robot:
         - Mutates robot state
         - Appends to outputs list if REPORT is executed
         """
+        name = self.HANDLERS.get(cmd.type)
+        if name is not None:
+            return getattr(self, name)()
         if cmd.type == CommandType.PLACE:
-            return self.place(Position(cmd.x, cmd.y), cmd.facing)
-        elif cmd.type == CommandType.MOVE:
-            return self.move()
-        elif cmd.type == CommandType.LEFT:
-            return self.left()
-        elif cmd.type == CommandType.RIGHT:
-            return self.right()
-        elif cmd.type == CommandType.REPORT:
-            return self.report()
+            return self._place(cmd.x, cmd.y, cmd.facing)
+
+    def run(self, commands: Iterable[Command]) -> RunResult:
+        """
+        Execute commands in order, with the same effects as execute_command()
+        on each, in one loop. A command succeeds unless execute_command()
+        would return False; REPORT always succeeds.
+        """
+        flags = bytearray()
+        reports: List[str] = []
+        self._run(commands, flags, reports)
+        return RunResult(self._state, len(flags), _pack_bits(flags), reports)
+
+    def run_lines(self, lines: Iterable[Union[str, bytes]], cache: Optional[ParseCache] = None) -> RunResult:
+        """
+        run() on command lines, parsed through `cache` if given. Every line
+        gets a success bit: lines that do not parse (blank and comment lines
+        included) fail and change nothing.
+        """
+        parse = cache.parse if cache is not None else CommandParser.parse
+        return self.run(parse(line) or _UNPARSED for line in lines)
+
+    def _run(self, commands: Iterable[Command], flags: bytearray, reports: List[str]):
+        # execute_command() with the dispatch and the transition lookups inlined
+        table = self._table
+        is_valid_xy, width, codes = table.is_valid_xy, table.width, FACING_CODES
+        moves, lefts, rights = self._moves, self._lefts, self._rights
+        ok, report = flags.append, reports.append
+        texts = {}  # REPORT output by state
+        MOVE, LEFT, RIGHT, REPORT, PLACE = (CommandType.MOVE, CommandType.LEFT, CommandType.RIGHT,
+                                            CommandType.REPORT, CommandType.PLACE)
+        state = self._state
+        try:
+            for cmd in commands:
+                t = cmd.type
+                if t is MOVE:
+                    nxt = moves[state]
+                    ok(nxt != state)
+                    state = nxt
+                elif t is LEFT:
+                    state = lefts[state]
+                    ok(state != NOT_PLACED)
+                elif t is RIGHT:
+                    state = rights[state]
+                    ok(state != NOT_PLACED)
+                elif t is REPORT:
+                    text = texts.get(state)
+                    if text is None:
+                        self._state = state
+                        text = texts[state] = self.report()
+                    report(text)
+                    ok(1)
+                elif t is PLACE and is_valid_xy(cmd.x, cmd.y):
+                    state = ((cmd.y * width + cmd.x) << 2 | codes[cmd.facing]) + 1
+                    ok(1)
+                else:
+                    ok(0)
+        finally:
+            self._state = state
+
+    def _run_each(self, commands: Iterable[Command], flags: bytearray, reports: List[str]):
+        # _run() through execute_command(), for subclasses that extend the commands
+        report = CommandType.REPORT
+        for cmd in commands:
+            result = self.execute_command(cmd)
+            if cmd.type is report:
+                reports.append(result)
+            flags.append(result is not False and result is not None)
 
 
 # --- read file input, for each line, print input, output, and state
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python toy_robot.py <commands_file>")
-        sys.exit(2)
-
-    path = sys.argv[1]
-    robot = Robot(Table())
-
-    try:
-        with open(path, "r") as f:
-            for lineno, raw in enumerate(f, start=1):
-                #print(f'is_placed: {robot.is_placed()}')
-                line = raw.strip()
-                if not line or line.startswith("#"):
-                    continue
-
-                cmd = CommandParser.parse(line)
-                print(f"[line {lineno}] >>> {line}")
-
-                if cmd is None:
-                    print("Invalid command")
-                    print("-" * 40)
-                    continue
-
-                old_state = str(robot)
-                result = robot.execute_command(cmd)
-                new_state = str(robot)
-
-                print(f"is_command_successful: {result}, old_state: {old_state}, new_state: {new_state}")
-                print("-" * 40)
-
-    except FileNotFoundError:
-        print(f"Error: file not found: {path}")
-        sys.exit(1)
+    # the CLI lives in toy_robot.cli, which itself imports this module
+    from .cli import main as cli_main
+    cli_main()
 
 
 if __name__ == "__main__":
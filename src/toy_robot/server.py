@@ -0,0 +1,153 @@
+# server.py
+from __future__ import annotations
+import argparse
+import asyncio
+from typing import List, Optional
+
+from .command import CommandParser, CommandType, ParseCache
+from .ingest import WHITESPACE, _is_command_text
+from .robot import Robot, Table
+
+INVALID = b"Invalid command\n"
+BUSY = b"Server busy\n"
+
+
+class RobotServer:
+    """
+    Line-oriented robot sessions over asyncio streams.
+
+    Every connection gets its own Robot. Clients send command lines (several
+    may be in flight at once); the server answers each REPORT with
+    Robot.report() and each invalid line with "Invalid command", in order.
+    Blank and comment lines are ignored like in the CLI.
+
+    Memory per session is bounded: lines longer than `max_line` bytes are
+    rejected, reading stops while the client is not consuming replies
+    (`write_high_water` bytes buffered), and at most `max_sessions`
+    connections are served at once.
+
+    With `parse_cache` set, lines are parsed through a ParseCache of that
+    size, shared by all sessions.
+    """
+
+    def __init__(self, table: Optional[Table] = None, max_line: int = 1024,
+                 write_high_water: int = 1 << 16, max_sessions: Optional[int] = None,
+                 parse_cache: Optional[int] = None):
+        self._table = table if table is not None else Table()
+        self._max_line = max_line
+        self._write_high_water = write_high_water
+        self._max_sessions = max_sessions
+        self.parse_cache = ParseCache(parse_cache) if parse_cache is not None else None
+        self._parse = self.parse_cache.parse if self.parse_cache is not None else CommandParser.parse
+        self._servers: List[asyncio.AbstractServer] = []
+        self.sessions = 0
+
+    async def start_tcp(self, host: Optional[str] = None, port: int = 0) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self.handle, host, port, limit=self._max_line)
+        self._servers.append(server)
+        return server
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        server = await asyncio.start_unix_server(self.handle, path, limit=self._max_line)
+        self._servers.append(server)
+        return server
+
+    async def serve_forever(self):
+        await asyncio.gather(*(s.serve_forever() for s in self._servers))
+
+    def close(self):
+        for server in self._servers:
+            server.close()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self._max_sessions is not None and self.sessions >= self._max_sessions:
+            writer.write(BUSY)
+            writer.close()
+            return
+
+        self.sessions += 1
+        writer.transport.set_write_buffer_limits(high=self._write_high_water)
+        robot = Robot(self._table)
+        try:
+            await self._session(robot, reader, writer)
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    async def _session(self, robot: Robot, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        skipping = False
+        while True:
+            try:
+                line = await reader.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                line = e.partial  # last line without a newline, or b"" at EOF
+                if not line:
+                    break
+            except asyncio.LimitOverrunError as e:
+                # drop the oversized line piece by piece, then reject it once
+                await reader.readexactly(e.consumed)
+                skipping = True
+                continue
+
+            if skipping:
+                skipping = False
+                writer.write(INVALID)
+            else:
+                reply = self._execute(robot, line)
+                if reply is not None:
+                    writer.write(reply)
+            # returns at once unless the client is behind on reading replies
+            await writer.drain()
+
+            if not line.endswith(b"\n"):
+                break
+
+    def _execute(self, robot: Robot, line: bytes) -> Optional[bytes]:
+        cmd = self._parse(line)
+        if cmd is None:
+            s = line.strip(WHITESPACE)
+            # non-ASCII blank and comment lines are only seen as such once decoded
+            if not s or s.startswith(b"#") or not _is_command_text(s):
+                return None
+            return INVALID
+        result = robot.execute_command(cmd)
+        if cmd.type == CommandType.REPORT:
+            return result.encode() + b"\n"
+        return None
+
+
+async def serve(host: Optional[str], port: Optional[int], unix_path: Optional[str], **options):
+    server = RobotServer(**options)
+    if port is not None:
+        await server.start_tcp(host, port)
+    if unix_path is not None:
+        await server.start_unix(unix_path)
+    await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m toy_robot.server", description="Serve robot sessions.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="TCP port")
+    parser.add_argument("--unix", default=None, metavar="PATH", help="Unix socket path")
+    parser.add_argument("--max-sessions", type=int, default=None)
+    parser.add_argument("--max-line", type=int, default=1024, help="longest accepted line, in bytes")
+    parser.add_argument("--parse-cache", type=int, default=None, metavar="N",
+                        help="remember the parse of the last N distinct lines")
+    args = parser.parse_args(argv)
+    if args.port is None and args.unix is None:
+        parser.error("give --port and/or --unix")
+    if args.parse_cache is not None and args.parse_cache < 1:
+        parser.error("--parse-cache must be at least 1")
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix,
+                          max_sessions=args.max_sessions, max_line=args.max_line,
+                          parse_cache=args.parse_cache))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
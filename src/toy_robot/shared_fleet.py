@@ -0,0 +1,181 @@
+# shared_fleet.py
+"""
+A Fleet split across worker processes over shared memory.
+
+The fleet's state arrays (x, y, facing, placed) and a per-robot success
+counter live in one multiprocessing.shared_memory block. Each worker wraps
+a disjoint slice of those arrays with Fleet.from_arrays() and applies
+command batches to it; only the commands travel through pipes. The parent
+reads states and REPORT results straight from the shared arrays.
+"""
+from __future__ import annotations
+import multiprocessing as mp
+import os
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .command import Command, CommandType
+from .fleet import Fleet
+from .robot import Table
+
+# seconds between checks that a worker we are waiting on is still alive
+WORKER_POLL_SECONDS = 0.5
+
+# (name, dtype) of each shared array, laid out in this order so that
+# every array starts aligned
+_LAYOUT = (("successes", np.int64), ("x", np.int32), ("y", np.int32),
+           ("facing", np.int8), ("placed", np.bool_))
+
+
+def _views(buf, size: int) -> List[np.ndarray]:
+    arrays, offset = [], 0
+    for _, dtype in _LAYOUT:
+        arrays.append(np.ndarray(size, dtype=dtype, buffer=buf, offset=offset))
+        offset += size * np.dtype(dtype).itemsize
+    return arrays
+
+
+def _block_size(size: int) -> int:
+    return max(1, size * sum(np.dtype(dtype).itemsize for _, dtype in _LAYOUT))
+
+
+def _worker(conn, shm_name: str, size: int, lo: int, hi: int, table: Table):
+    shm = SharedMemory(name=shm_name)
+    arrays = _views(shm.buf, size)
+    successes = arrays[0][lo:hi]
+    fleet = Fleet.from_arrays(table, *(a[lo:hi] for a in arrays[1:]))
+    try:
+        while True:
+            batch = conn.recv()
+            if batch is None:
+                break
+            try:
+                for cmd in batch:
+                    successes += fleet.execute_command(cmd)
+            except Exception as e:  # reported to the parent, which raises
+                conn.send(f"{type(e).__name__}: {e}")
+            else:
+                conn.send(None)
+    finally:
+        del fleet, successes, arrays
+        shm.close()
+
+
+def _worker_died(proc) -> RuntimeError:
+    proc.join()
+    return RuntimeError(f"fleet worker exited with code {proc.exitcode}")
+
+
+def _receive(conn, proc) -> Optional[str]:
+    # a worker's reply to a batch, or RuntimeError if it died without one
+    while not conn.poll(WORKER_POLL_SECONDS):
+        # the worker may have replied just before exiting
+        if not proc.is_alive() and not conn.poll(0):
+            raise _worker_died(proc)
+    try:
+        return conn.recv()
+    except EOFError:
+        raise _worker_died(proc) from None
+
+
+class SharedFleet:
+    """
+    `size` robots on `table`, sharded over `workers` processes.
+
+    run() applies commands to every robot, in order. MOVE, LEFT, RIGHT and
+    PLACE are executed by the workers, each on its own shard; REPORT is
+    answered by the parent from shared memory. `fleet` is a Fleet over the
+    whole shared state, for setting up or inspecting robots between runs.
+    """
+
+    def __init__(self, table: Table, size: int, workers: Optional[int] = None):
+        workers = max(1, min(workers or os.cpu_count() or 1, size or 1))
+        self._table = table
+        self._shm = SharedMemory(create=True, size=_block_size(size))
+        arrays = _views(self._shm.buf, size)
+        for a in arrays:
+            a[:] = 0
+        self.successes = arrays[0]
+        self.fleet = Fleet.from_arrays(table, *arrays[1:])
+        self.shards: List[Tuple[int, int]] = [(size * i // workers, size * (i + 1) // workers)
+                                              for i in range(workers)]
+        self._conns = []
+        self._procs = []
+        ctx = mp.get_context()
+        try:
+            for lo, hi in self.shards:
+                parent, child = ctx.Pipe()
+                proc = ctx.Process(target=_worker, args=(child, self._shm.name, size, lo, hi, table),
+                                   daemon=True)
+                proc.start()
+                child.close()
+                self._conns.append(parent)
+                self._procs.append(proc)
+        except BaseException:
+            self.close()
+            raise
+
+    def __len__(self) -> int:
+        return len(self.fleet)
+
+    @property
+    def table(self) -> Table:
+        return self._table
+
+    def _dispatch(self, batch: List[Command]):
+        for conn, proc in zip(self._conns, self._procs):
+            try:
+                conn.send(batch)
+            except OSError:
+                raise _worker_died(proc) from None
+        errors = [_receive(conn, proc) for conn, proc in zip(self._conns, self._procs)]
+        errors = [e for e in errors if e is not None]
+        if errors:
+            raise RuntimeError(f"fleet worker failed: {errors[0]}")
+
+    def run(self, commands: Iterable[Command]) -> List[List[str]]:
+        """
+        Execute commands on every robot, returning the reports of each
+        REPORT command (one string per robot, in index order).
+        """
+        reports = []
+        batch: List[Command] = []
+        for cmd in commands:
+            if cmd.type != CommandType.REPORT:
+                batch.append(cmd)
+                continue
+            if batch:
+                self._dispatch(batch)
+                batch = []
+            reports.append(self.fleet.report())
+            # Robot.execute_command() returns a string for REPORT: a success
+            self.successes += 1
+        if batch:
+            self._dispatch(batch)
+        return reports
+
+    def close(self):
+        """Stop the workers and free the shared memory block."""
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for proc in self._procs:
+            proc.join()
+        for conn in self._conns:
+            conn.close()
+        self._conns, self._procs = [], []
+        if self._shm is not None:
+            del self.fleet, self.successes
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> SharedFleet:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,255 @@
+# tagged.py
+"""
+Logs that interleave commands for many robots, one tag per line:
+
+    R17: PLACE 0,0,NORTH
+    R4: MOVE
+    R17: REPORT
+
+The dispatcher reads the log in rounds of lines and hash-partitions them
+by tag (zlib.crc32, so the split is the same in every process) across
+worker processes. Each worker owns the Robots of its tags, so every robot
+sees its own lines in log order. Output is merged back into line order.
+"""
+from __future__ import annotations
+import heapq
+import multiprocessing as mp
+import os
+import queue
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cli import OutputBuffer, RunSummary, SEPARATOR, VERBOSE, QUIET, REPORTS_ONLY, SUMMARY
+from .command import CommandParser, CommandType
+from .ingest import iter_command_lines
+from .robot import Robot, Table
+
+# lines dispatched per round
+BATCH_LINES = 1 << 15
+# seconds between checks that a worker we are waiting on is still alive
+WORKER_POLL_SECONDS = 0.5
+
+# (lineno, line) pairs sent to a shard; (lineno, text) pairs it sends back
+Batch = List[Tuple[int, bytes]]
+Output = List[Tuple[int, str]]
+
+
+def shard_of(tag: bytes, shards: int) -> int:
+    """The shard that owns robot `tag`: stable across processes and runs."""
+    return zlib.crc32(tag) % shards
+
+
+class Shard:
+    """The robots of one partition of the tags, and how to run their lines."""
+
+    def __init__(self, table: Table, mode: str):
+        self.table = table
+        self.mode = mode
+        self.robots: Dict[str, Robot] = {}
+        self.first_seen: Dict[str, int] = {}
+
+    def _robot(self, tag: str, lineno: int) -> Robot:
+        robot = self.robots.get(tag)
+        if robot is None:
+            robot = self.robots[tag] = Robot(self.table)
+            self.first_seen[tag] = lineno
+        return robot
+
+    def run(self, batch: Batch) -> Tuple[Output, Tuple[int, int, int]]:
+        """Run tagged lines in order; returns the output per line and (successful, failed, invalid)."""
+        out: Output = []
+        successful = failed = invalid = 0
+        verbose = self.mode == VERBOSE
+        reports = self.mode == REPORTS_ONLY
+        report = CommandType.REPORT
+        parse = CommandParser.parse
+        split_tag = CommandParser.split_tag
+
+        for lineno, line in batch:
+            split = split_tag(line)
+            cmd = parse(split[1]) if split is not None else None
+            if cmd is None:
+                invalid += 1
+                if verbose:
+                    text = line.decode("utf-8", "replace").strip()
+                    out.append((lineno, f"[line {lineno}] >>> {text}\nInvalid command\n{SEPARATOR}\n"))
+                continue
+
+            tag = split[0].decode("ascii")
+            robot = self._robot(tag, lineno)
+            if verbose:
+                old_state = str(robot)
+            result = robot.execute_command(cmd)
+            if result is False:
+                failed += 1
+            else:
+                successful += 1
+            if verbose:
+                text = line.decode("utf-8", "replace").strip()
+                out.append((lineno, f"[line {lineno}] >>> {text}\n"
+                                    f"is_command_successful: {result}, old_state: {tag}: {old_state}, "
+                                    f"new_state: {tag}: {robot}\n{SEPARATOR}\n"))
+            elif reports and cmd.type == report and result is not False:
+                out.append((lineno, f"{tag}: {result}\n"))
+        return out, (successful, failed, invalid)
+
+    def final_states(self) -> Output:
+        """'tag: state' lines keyed by the line each robot first appeared on."""
+        return [(self.first_seen[tag], f"{tag}: {robot}\n") for tag, robot in self.robots.items()]
+
+
+def _serve(inbox, outbox, table: Table, mode: str):
+    # worker process: run batches until a None asks for the final states
+    shard = Shard(table, mode)
+    while True:
+        batch = inbox.get()
+        try:
+            outbox.put(shard.run(batch) if batch is not None else shard.final_states())
+        except Exception as e:  # re-raised by the dispatcher
+            outbox.put(e)
+        if batch is None:
+            return
+
+
+class _LocalShard:
+    # a Shard behind the same send/receive interface as a worker process
+    def __init__(self, table: Table, mode: str):
+        self._shard = Shard(table, mode)
+        self._results = []
+
+    def send(self, batch: Optional[Batch]):
+        self._results.append(self._shard.run(batch) if batch is not None else self._shard.final_states())
+
+    def receive(self):
+        return self._results.pop(0)
+
+    def close(self):
+        pass
+
+
+class _WorkerShard:
+    def __init__(self, ctx, table: Table, mode: str):
+        # queues have feeder threads, so sending never blocks on a busy worker
+        self._inbox, self._outbox = ctx.Queue(), ctx.Queue()
+        self._proc = ctx.Process(target=_serve, args=(self._inbox, self._outbox, table, mode), daemon=True)
+        self._proc.start()
+
+    def send(self, batch: Optional[Batch]):
+        self._inbox.put(batch)
+
+    def receive(self):
+        while True:
+            try:
+                result = self._outbox.get(timeout=WORKER_POLL_SECONDS)
+                break
+            except queue.Empty:
+                if self._proc.is_alive():
+                    continue
+            # the worker may have posted its result just before exiting
+            try:
+                result = self._outbox.get_nowait()
+                break
+            except queue.Empty:
+                raise RuntimeError(f"tagged-log worker exited with code {self._proc.exitcode}") from None
+        if isinstance(result, Exception):
+            raise RuntimeError(f"tagged-log worker failed: {result!r}")
+        return result
+
+    def close(self):
+        if self._proc.is_alive():
+            self._proc.terminate()
+        self._proc.join()
+
+
+def _rounds(lines: Iterable[Tuple[int, bytes]], shards: int, size: int) -> Iterator[Tuple[List[Batch], Batch]]:
+    # Per-shard batches of lines with a colon, plus the lines without one,
+    # per round. Only the text before the colon is needed to pick a shard;
+    # the shards check that it is a valid tag.
+    owners: Dict[bytes, int] = {}
+    parts: List[Batch] = [[] for _ in range(shards)]
+    untagged: Batch = []
+    count = 0
+    for lineno, line in lines:
+        tag, colon, _ = line.partition(b":")
+        if not colon:
+            untagged.append((lineno, line))
+        else:
+            owner = owners.get(tag)
+            if owner is None:
+                owner = owners[tag] = shard_of(tag.strip(), shards)
+            parts[owner].append((lineno, line))
+        count += 1
+        if count == size:
+            yield parts, untagged
+            parts, untagged, count = [[] for _ in range(shards)], [], 0
+    if count:
+        yield parts, untagged
+
+
+def run_tagged(lines: Iterable[Tuple[int, bytes]], mode: str, out: OutputBuffer, jobs: Optional[int] = None,
+               table: Optional[Table] = None, batch_lines: int = BATCH_LINES) -> RunSummary:
+    """
+    Run (lineno, line) pairs of a tagged log on one robot per tag, spread
+    over `jobs` processes, and write output for `mode` to `out` in line
+    order. Untagged lines count as invalid.
+    """
+    if jobs is not None and jobs < 1:
+        raise ValueError("jobs must be at least 1")
+    jobs = jobs or os.cpu_count() or 1
+    table = table if table is not None else Table()
+    if jobs == 1:
+        shards = [_LocalShard(table, mode)]
+    else:
+        ctx = mp.get_context()
+        shards = [_WorkerShard(ctx, table, mode) for _ in range(jobs)]
+
+    summary = RunSummary()
+    verbose = mode == VERBOSE
+
+    def finish(untagged: Batch):
+        outputs = []
+        for shard in shards:
+            output, (successful, failed, invalid) = shard.receive()
+            summary.successful += successful
+            summary.failed += failed
+            summary.invalid += invalid
+            outputs.append(output)
+        summary.invalid += len(untagged)
+        if verbose:
+            outputs.append([(n, f"[line {n}] >>> {line.decode('utf-8', 'replace').strip()}\n"
+                                f"Invalid command\n{SEPARATOR}\n") for n, line in untagged])
+        for _, text in heapq.merge(*outputs):
+            out.write(text)
+
+    try:
+        # the next round is handed out before the previous one is collected,
+        # so reading the log overlaps with the workers
+        pending: Optional[Batch] = None
+        for parts, untagged in _rounds(lines, len(shards), batch_lines):
+            for shard, part in zip(shards, parts):
+                shard.send(part)
+            if pending is not None:
+                finish(pending)
+            pending = untagged
+        if pending is not None:
+            finish(pending)
+
+        for shard in shards:
+            shard.send(None)
+        finals = [shard.receive() for shard in shards]
+    finally:
+        for shard in shards:
+            shard.close()
+
+    if mode == QUIET:
+        for _, text in heapq.merge(*(sorted(f) for f in finals)):
+            out.write(text)
+    elif mode == SUMMARY:
+        out.write(summary.format())
+    return summary
+
+
+def run_tagged_file(path: str, mode: str, out: OutputBuffer, jobs: Optional[int] = None,
+                    table: Optional[Table] = None) -> RunSummary:
+    """Run a tagged command file (raises FileNotFoundError)."""
+    return run_tagged(iter_command_lines(path), mode, out, jobs, table)
@@ -0,0 +1,158 @@
+# trace.py
+"""
+Columnar record of what each command did.
+
+A TraceRecorder appends one row per command line to typed arrays: line
+number, command type, success flag and the packed robot state after the
+command. x, y and facing are decoded from the state only when the trace
+is exported, and text is only built for the human-readable view.
+"""
+from __future__ import annotations
+import csv
+import json
+import os
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .command import CommandType
+from .robot import Table, FACINGS, NOT_PLACED
+
+COMMAND_TYPES = tuple(CommandType)
+TYPE_CODES = {t: i for i, t in enumerate(COMMAND_TYPES)}
+
+# type code of lines that did not parse
+INVALID = -1
+
+COLUMNS = ("lineno", "type", "success", "x", "y", "facing")
+
+# file extensions save() understands
+FORMATS = (".csv", ".jsonl", ".npy")
+
+Row = Tuple[int, str, bool, Optional[int], Optional[int], Optional[str]]
+
+
+class TraceRecorder:
+    """
+    Per-command rows in array columns. With a `capacity`, only the last
+    `capacity` rows are kept (a ring buffer); `dropped` counts the rest.
+    """
+
+    def __init__(self, table: Table, capacity: Optional[int] = None):
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.table = table
+        self.capacity = capacity
+        self._count = 0
+        size = capacity or 0
+        self._lineno = array("q", bytes(8 * size))
+        self._type = array("b", bytes(size))
+        self._success = array("b", bytes(size))
+        self._state = array("q", bytes(8 * size))
+
+    def record(self, lineno: int, kind: Optional[CommandType], success: bool, state: int):
+        """Add a row; `kind` is None for a line that did not parse."""
+        code = TYPE_CODES[kind] if kind is not None else INVALID
+        if self.capacity is None:
+            self._lineno.append(lineno)
+            self._type.append(code)
+            self._success.append(success)
+            self._state.append(state)
+        else:
+            i = self._count % self.capacity
+            self._lineno[i] = lineno
+            self._type[i] = code
+            self._success[i] = success
+            self._state[i] = state
+        self._count += 1
+
+    def __len__(self) -> int:
+        return self._count if self.capacity is None else min(self._count, self.capacity)
+
+    @property
+    def dropped(self) -> int:
+        """Rows recorded but no longer kept."""
+        return self._count - len(self)
+
+    def _start(self) -> int:
+        # storage index of the oldest row
+        if self.capacity is None or self._count <= self.capacity:
+            return 0
+        return self._count % self.capacity
+
+    def rows(self) -> Iterator[Row]:
+        """(lineno, type, success, x, y, facing) per row, oldest first; None for unplaced/invalid."""
+        width, n, start = self.table.width, len(self), self._start()
+        for i in range(start, start + n):
+            i %= n
+            code, state = self._type[i], self._state[i]
+            if state == NOT_PLACED:
+                x = y = facing = None
+            else:
+                cell, f = divmod(state - 1, 4)
+                y, x = divmod(cell, width)
+                facing = FACINGS[f].name
+            kind = COMMAND_TYPES[code].name if code != INVALID else "INVALID"
+            yield self._lineno[i], kind, bool(self._success[i]), x, y, facing
+
+    def columns(self) -> Dict[str, list]:
+        """The trace as one list per column, in COLUMNS order."""
+        columns = {name: [] for name in COLUMNS}
+        appends = [columns[name].append for name in COLUMNS]
+        for row in self.rows():
+            for append, value in zip(appends, row):
+                append(value)
+        return columns
+
+    def to_numpy(self):
+        """The trace as a NumPy structured array; x, y and facing are -1 when not placed."""
+        import numpy as np
+
+        n, start = len(self), self._start()
+
+        def column(values, dtype):
+            return np.roll(np.frombuffer(values, dtype=dtype)[:n], -start)
+
+        state = column(self._state, np.int64)
+        placed = state != NOT_PLACED
+        cell = (state - 1) >> 2
+        out = np.empty(n, dtype=[("lineno", "i8"), ("type", "i1"), ("success", "?"),
+                                 ("x", "i8"), ("y", "i8"), ("facing", "i1")])
+        out["lineno"] = column(self._lineno, np.int64)
+        out["type"] = column(self._type, np.int8)
+        out["success"] = column(self._success, np.int8)
+        out["x"] = np.where(placed, cell % self.table.width, -1)
+        out["y"] = np.where(placed, cell // self.table.width, -1)
+        out["facing"] = np.where(placed, (state - 1) & 3, -1)
+        return out
+
+    def write_csv(self, path: Union[str, os.PathLike]):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            writer.writerows(self.rows())
+
+    def write_jsonl(self, path: Union[str, os.PathLike]):
+        with open(path, "w") as f:
+            for row in self.rows():
+                f.write(json.dumps(dict(zip(COLUMNS, row))) + "\n")
+
+    def write_npy(self, path: Union[str, os.PathLike]):
+        import numpy as np
+
+        np.save(path, self.to_numpy())
+
+    def save(self, path: Union[str, os.PathLike]):
+        """Write the trace in the format named by the file extension: .csv, .jsonl or .npy."""
+        writers = dict(zip(FORMATS, (self.write_csv, self.write_jsonl, self.write_npy)))
+        ext = os.path.splitext(os.fspath(path))[1].lower()
+        if ext not in writers:
+            raise ValueError(f"unknown trace format {ext!r}; use .csv, .jsonl or .npy")
+        writers[ext](path)
+
+    def format(self) -> str:
+        """A human-readable view of the trace."""
+        lines: List[str] = []
+        for lineno, kind, success, x, y, facing in self.rows():
+            state = f"({x},{y}) {facing}" if facing is not None else "not placed"
+            lines.append(f"[line {lineno}] {kind:<8}{'ok' if success else 'failed':<8}{state}")
+        return "\n".join(lines) + ("\n" if lines else "")
@@ -0,0 +1,214 @@
+# world.py
+"""
+Many robots on one shared table, blocking each other.
+
+A World keeps an occupancy index of the cells robots stand on. Its
+robots are WorldRobots, which refuse to be placed on or move into an
+occupied cell. Every check is a single lookup, so a move costs the same
+however many robots share the table.
+"""
+from __future__ import annotations
+from typing import Iterator, List
+
+from .robot import Robot, Table, FACING_CODES, NOT_PLACED
+
+# tables up to this many cells use a dense occupancy array (one byte per cell)
+MAX_DENSE_CELLS = 1 << 24
+
+
+class Occupancy:
+    """Occupied cells of a table, each packed as y * width + x."""
+    __slots__ = ("_count",)
+
+    def __init__(self):
+        self._count = 0
+
+    def is_occupied(self, cell: int) -> bool:
+        raise NotImplementedError
+
+    def add(self, cell: int):
+        raise NotImplementedError
+
+    def discard(self, cell: int):
+        raise NotImplementedError
+
+    def packed_cells(self) -> Iterator[int]:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._count} cells)"
+
+
+class DenseOccupancy(Occupancy):
+    """One byte per cell: fastest lookups, memory grows with the table area."""
+    __slots__ = ("_cells",)
+
+    def __init__(self, cell_count: int):
+        super().__init__()
+        self._cells = bytearray(cell_count)
+
+    def is_occupied(self, cell: int) -> bool:
+        return bool(self._cells[cell])
+
+    def add(self, cell: int):
+        if not self._cells[cell]:
+            self._cells[cell] = 1
+            self._count += 1
+
+    def discard(self, cell: int):
+        if self._cells[cell]:
+            self._cells[cell] = 0
+            self._count -= 1
+
+    def packed_cells(self) -> Iterator[int]:
+        cells = self._cells
+        i = cells.find(1)
+        while i >= 0:
+            yield i
+            i = cells.find(1, i + 1)
+
+
+class HashedOccupancy(Occupancy):
+    """A set of cells: memory grows with the number of robots, not the table area."""
+    __slots__ = ("_cells",)
+
+    def __init__(self):
+        super().__init__()
+        self._cells = set()
+
+    def is_occupied(self, cell: int) -> bool:
+        return cell in self._cells
+
+    def add(self, cell: int):
+        self._cells.add(cell)
+        self._count = len(self._cells)
+
+    def discard(self, cell: int):
+        self._cells.discard(cell)
+        self._count = len(self._cells)
+
+    def packed_cells(self) -> Iterator[int]:
+        return iter(self._cells)
+
+
+def make_occupancy(width: int, height: int, kind: str = "auto") -> Occupancy:
+    """
+    Build an empty occupancy index. kind is "dense", "hashed" or "auto",
+    which picks dense for tables of up to MAX_DENSE_CELLS cells.
+    """
+    if kind == "auto":
+        kind = "dense" if width * height <= MAX_DENSE_CELLS else "hashed"
+    if kind == "dense":
+        return DenseOccupancy(width * height)
+    if kind == "hashed":
+        return HashedOccupancy()
+    raise ValueError(f"unknown occupancy index kind: {kind!r}")
+
+
+class World:
+    """A table shared by many robots, at most one per cell."""
+
+    def __init__(self, table: Table, kind: str = "auto"):
+        self.table = table
+        self.occupancy = make_occupancy(table.width, table.height, kind)
+        self.robots: List[WorldRobot] = []
+
+    def add_robot(self) -> WorldRobot:
+        """A new, not yet placed robot in this world."""
+        robot = WorldRobot(self)
+        self.robots.append(robot)
+        return robot
+
+    def is_occupied(self, x: int, y: int) -> bool:
+        """True if a robot stands on on-table cell (x, y)."""
+        return self.occupancy.is_occupied(y * self.table.width + x)
+
+    def is_free(self, x: int, y: int) -> bool:
+        """True if a robot could be placed on (x, y)."""
+        return self.table.is_valid_xy(x, y) and not self.is_occupied(x, y)
+
+
+class WorldRobot(Robot):
+    """
+    A Robot registered in a World's occupancy index. PLACE and MOVE fail
+    when the target cell holds another robot; turning is unaffected.
+    """
+    __slots__ = ("_world", "_occupancy")
+
+    def __init__(self, world: World):
+        super().__init__(world.table)
+        self._world = world
+        self._occupancy = world.occupancy
+
+    @property
+    def world(self) -> World:
+        return self._world
+
+    @property
+    def state(self) -> int:
+        """Current state packed with Table.encode()."""
+        return self._state
+
+    @state.setter
+    def state(self, state: int):
+        old = self._state
+        if state and (old - 1) >> 2 != (state - 1) >> 2 and self._occupancy.is_occupied((state - 1) >> 2):
+            raise ValueError("cell is occupied by another robot")
+        self._relocate(old, state)
+
+    def _relocate(self, old: int, new: int):
+        # move this robot's registration from state `old` to state `new`
+        if old:
+            self._occupancy.discard((old - 1) >> 2)
+        if new:
+            self._occupancy.add((new - 1) >> 2)
+        self._state = new
+
+    # run() must go through the occupancy checks of _place() and move()
+    _run = Robot._run_each
+
+    def remove(self):
+        """Take the robot off the table, freeing its cell."""
+        self._relocate(self._state, NOT_PLACED)
+
+    def _place(self, x: int, y: int, facing) -> bool:
+        table = self._table
+        if not table.is_valid_xy(x, y):
+            return False
+        cell = y * table.width + x
+        old = self._state
+        if (not old or (old - 1) >> 2 != cell) and self._occupancy.is_occupied(cell):
+            return False
+        self._relocate(old, (cell << 2 | FACING_CODES[facing]) + 1)
+        return True
+
+    def move(self) -> bool:
+        state = self._state
+        if not state:
+            return False
+
+        nxt = self._moves[state]
+        if nxt == state or self._occupancy.is_occupied((nxt - 1) >> 2):
+            return False
+        self._relocate(state, nxt)
+        return True
+
+    def advance(self, steps: int) -> int:
+        """Same as calling move() `steps` times; stops at the first blocked step."""
+        state = self._state
+        if not state or steps <= 0:
+            return 0
+
+        moves, is_occupied = self._moves, self._occupancy.is_occupied
+        done = 0
+        while done < steps:
+            nxt = moves[state]
+            if nxt == state or is_occupied((nxt - 1) >> 2):
+                break
+            state = nxt
+            done += 1
+        self._relocate(self._state, state)
+        return done
@@ -0,0 +1,30 @@
+# tests/helpers.py
+"""Shared helpers for the tests: seeded random scripts and a reference replay."""
+import random
+
+LINES = ["MOVE", "MOVE", "LEFT", "RIGHT", "REPORT"]
+FACINGS = ["NORTH", "EAST", "SOUTH", "WEST"]
+
+
+def random_lines(n, seed, lines=LINES, place_rate=0.0, width=5, height=5):
+    """
+    n command lines drawn from `lines`, seeded. A share `place_rate` of them
+    are PLACEs anywhere on a width x height table or one cell off it.
+    """
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        if place_rate and rng.random() < place_rate:
+            out.append(f"PLACE {rng.randint(-1, width)},{rng.randint(-1, height)},{rng.choice(FACINGS)}")
+        else:
+            out.append(rng.choice(lines))
+    return out
+
+
+def replay(robot, commands):
+    """
+    Reference run: robot.execute_command() on one command at a time.
+    Yields each result as soon as its command has run.
+    """
+    for cmd in commands:
+        yield robot.execute_command(cmd)
@@ -0,0 +1,116 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from helpers import random_lines, replay
+from toy_robot import Robot, Table
+from toy_robot.analytics import analyze
+from toy_robot.command import Position, Direction, Command, CommandType, CommandParser
+from toy_robot.obstacles import make_index
+from toy_robot.robot import NOT_PLACED
+
+MOVE, LEFT, RIGHT, REPORT = (Command(t) for t in (CommandType.MOVE, CommandType.LEFT,
+                                                   CommandType.RIGHT, CommandType.REPORT))
+
+
+def place(x, y, facing=Direction.NORTH):
+    return Command(CommandType.PLACE, x, y, facing)
+
+
+STREAM_LINES = ["MOVE"] * 8 + ["LEFT", "RIGHT", "REPORT"]
+
+
+def reference(commands, table):
+    # step-by-step statistics on Robot
+    robot = Robot(table)
+    visits = np.zeros((table.width, table.height), dtype=np.int64)
+    stats = dict(distance=0, blocked_moves=0, unplaced_commands=0, places=0, rejected_places=0, turns=0)
+    placed = False
+    for cmd, result in zip(commands, replay(robot, commands)):
+        if cmd.type == CommandType.PLACE:
+            stats["rejected_places" if result is False else "places"] += 1
+        elif cmd.type == CommandType.REPORT:
+            pass
+        elif not placed:
+            stats["unplaced_commands"] += 1
+        elif cmd.type == CommandType.MOVE:
+            stats["blocked_moves" if result is False else "distance"] += 1
+        else:
+            stats["turns"] += 1
+        if cmd.type in (CommandType.PLACE, CommandType.MOVE) and result is not False:
+            visits[robot.pos.x, robot.pos.y] += 1
+        placed = robot.state != NOT_PLACED
+    return visits, stats, robot.state
+
+
+def random_commands(n, table, seed, place_rate):
+    lines = random_lines(n, seed, STREAM_LINES, place_rate, table.width, table.height)
+    return [CommandParser.parse(line) for line in lines]
+
+
+def assert_matches_replay(commands, table):
+    visits, stats, state = reference(commands, table)
+    result = analyze(commands, table)
+    assert result.visits.shape == (table.width, table.height)
+    assert (result.visits == visits).all()
+    assert {k: getattr(result, k) for k in stats} == stats
+    assert result.final_state == state
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("width,height,place_rate", [(5, 5, 0.01), (3, 7, 0.5), (60, 40, 0.001)])
+def test_matches_replay(seed, width, height, place_rate):
+    table = Table(width, height)
+    assert_matches_replay(random_commands(20000, table, seed, place_rate), table)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_matches_replay_with_obstacles(seed):
+    rnd = random.Random(seed)
+    cells = {(rnd.randrange(30), rnd.randrange(20)) for _ in range(60)}
+    table = Table(30, 20, make_index(30, 20, cells))
+    assert_matches_replay(random_commands(20000, table, seed, 0.002), table)
+
+
+def test_unplaced_stream():
+    result = analyze([MOVE, LEFT, REPORT, place(9, 9)])
+    assert result.unplaced_commands == 2
+    assert result.rejected_places == 1
+    assert result.final_state == 0
+    assert not result.visits.any()
+
+
+def test_empty_stream():
+    result = analyze([])
+    assert result.distance == result.places == 0
+    assert result.final_state == 0
+
+
+def test_walk_into_the_edge():
+    table = Table()
+    result = analyze([place(0, 0)] + [MOVE] * 10, table)
+    assert result.distance == 4
+    assert result.blocked_moves == 6
+    assert result.visits[0].tolist() == [1, 1, 1, 1, 1]
+    assert table.decode(result.final_state)[0] == Position(0, 4)
+
+
+def test_place_without_moves_sets_final_state():
+    table = Table()
+    result = analyze([place(0, 0), MOVE, place(3, 2, Direction.WEST), RIGHT], table)
+    assert table.decode(result.final_state) == (Position(3, 2), Direction.NORTH)
+    assert result.visits[3, 2] == 1
+
+
+def test_large_table_has_no_heatmap():
+    table = Table(1 << 16, 1 << 16)
+    result = analyze([place(0, 0, Direction.EAST)] + [MOVE] * 1000, table)
+    assert result.visits is None
+    assert result.distance == 1000
+    assert table.decode(result.final_state)[0] == Position(1000, 0)
+
+
+def test_heatmap_can_be_skipped():
+    assert analyze([place(0, 0)], heatmap=False).visits is None
@@ -0,0 +1,103 @@
+import io
+import sys
+
+import pytest
+
+import toy_robot.robot as robot
+from toy_robot.batch import expand_paths, run_batch
+from toy_robot.cli import REPORTS_ONLY
+
+
+@pytest.fixture
+def scenarios(tmp_path):
+    d = tmp_path / "scenarios"
+    (d / "nested").mkdir(parents=True)
+    (d / "a.txt").write_text("PLACE 0,0,NORTH\nMOVE\nREPORT\n")
+    (d / "b.txt").write_text("PLACE 1,1,EAST\nREPORT\nMOVE\nREPORT\n")
+    (d / "nested" / "c.txt").write_text("MOVE\nREPORT\n")
+    return d
+
+
+def test_expand_directory_recursively(scenarios):
+    assert expand_paths([str(scenarios)]) == [
+        str(scenarios / "a.txt"), str(scenarios / "b.txt"), str(scenarios / "nested" / "c.txt"),
+    ]
+
+
+def test_expand_globs_and_dedupes(scenarios):
+    paths = expand_paths([str(scenarios / "b.txt"), str(scenarios / "*.txt")])
+    assert paths == [str(scenarios / "b.txt"), str(scenarios / "a.txt")]
+
+
+def test_expand_keeps_missing_files(tmp_path):
+    missing = str(tmp_path / "missing.txt")
+    assert expand_paths([missing]) == [missing]
+
+
+def test_expand_keeps_unmatched_globs_and_empty_directories(tmp_path):
+    (tmp_path / "empty").mkdir()
+    specs = [str(tmp_path / "nomatch*.txt"), str(tmp_path / "empty")]
+    assert expand_paths(specs) == specs
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_batch_results_in_input_order(scenarios, jobs):
+    paths = expand_paths([str(scenarios)]) + [str(scenarios / "missing.txt")]
+    results = list(run_batch(paths, REPORTS_ONLY, jobs=jobs, chunksize=1))
+    assert [p for p, _, _ in results] == paths
+    assert [found for _, found, _ in results] == [True, True, True, False]
+    assert [text for _, _, text in results][:3] == [
+        "x:0,y:1,facing:NORTH\n",
+        "x:1,y:1,facing:EAST\nx:2,y:1,facing:EAST\n",
+        "Robot not placed\n",
+    ]
+    assert "Error: file not found" in results[3][2]
+
+
+def run_cli(monkeypatch, argv):
+    buf = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", buf)
+    monkeypatch.setattr(sys, "stderr", buf)
+    monkeypatch.setattr(sys, "argv", argv)
+    try:
+        robot.main()
+    except SystemExit as e:
+        return e.code, buf.getvalue()
+    return 0, buf.getvalue()
+
+
+def test_cli_batch_mode(monkeypatch, scenarios):
+    code, out = run_cli(monkeypatch, ["toy_robot.py", "--batch", "--quiet", "--jobs", "1",
+                                      str(scenarios / "a.txt"), str(scenarios / "nested")])
+    assert code == 0
+    assert out == (
+        f"=== {scenarios / 'a.txt'} ===\nRobot at (0,1) facing NORTH\n"
+        f"=== {scenarios / 'nested' / 'c.txt'} ===\nRobot not placed\n"
+    )
+
+
+def test_cli_batch_mode_missing_file_exits_1(monkeypatch, tmp_path):
+    code, out = run_cli(monkeypatch, ["toy_robot.py", "--batch", "--jobs", "1", str(tmp_path / "nope.txt")])
+    assert code == 1
+    assert "Error: file not found" in out
+
+
+@pytest.mark.parametrize("name", ["nomatch*.txt", "empty"])
+def test_cli_batch_mode_unmatched_spec_exits_1(monkeypatch, tmp_path, name):
+    (tmp_path / "empty").mkdir()
+    spec = str(tmp_path / name)
+    code, out = run_cli(monkeypatch, ["toy_robot.py", "--batch", "--jobs", "1", spec])
+    assert code == 1
+    assert out == f"=== {spec} ===\nError: file not found: {spec}\n"
+
+
+@pytest.mark.parametrize("jobs", ["0", "-1"])
+def test_cli_batch_mode_rejects_jobs_below_1(monkeypatch, scenarios, jobs):
+    code, out = run_cli(monkeypatch, ["toy_robot.py", "--batch", "--jobs", jobs, str(scenarios)])
+    assert code == 2
+    assert "--jobs must be at least 1" in out
+
+
+def test_cli_many_files_without_batch_is_an_error(monkeypatch, scenarios):
+    code, _ = run_cli(monkeypatch, ["toy_robot.py", str(scenarios / "a.txt"), str(scenarios / "b.txt")])
+    assert code == 2
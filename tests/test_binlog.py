@@ -0,0 +1,99 @@
+import io
+from pathlib import Path
+import random
+
+import pytest
+from toy_robot import Robot, Table
+from toy_robot.binlog import MAGIC, BinaryLogWriter, encode, iter_commands, execute_file, convert
+from toy_robot.command import Direction, Command, CommandType, CommandParser
+
+CMD_TXT = Path(__file__).resolve().parents[1] / "cmd.txt"
+MOVE, LEFT, RIGHT, REPORT = (CommandParser.parse(s) for s in ["MOVE", "LEFT", "RIGHT", "REPORT"])
+
+
+def test_simple_commands_pack_three_per_byte():
+    data = encode([MOVE, LEFT, RIGHT, REPORT, MOVE, MOVE])
+    assert data == MAGIC + bytes([0b11_00_01_10, 0b11_11_00_00])
+
+
+def test_partial_group_before_place():
+    data = encode([LEFT, Command(CommandType.PLACE, 1, -1, Direction.WEST)])
+    assert data == MAGIC + bytes([0b01_01_00_00, 0b00_11_0000, 2, 1])
+
+
+@pytest.mark.parametrize("x,y", [(0, 0), (4, 3), (-1, 0), (300, -70000), (10**30, -(10**25))])
+def test_place_round_trip(x, y):
+    cmds = [Command(CommandType.PLACE, x, y, d) for d in Direction]
+    assert list(iter_commands(encode(cmds))) == cmds
+
+
+def test_random_round_trip_shares_simple_instances():
+    rng = random.Random(7)
+    cmds = []
+    for _ in range(2000):
+        if rng.random() < 0.1:
+            cmds.append(Command(CommandType.PLACE, rng.randint(-5, 500), rng.randint(-5, 500),
+                                rng.choice(list(Direction))))
+        else:
+            cmds.append(rng.choice([MOVE, LEFT, RIGHT, REPORT]))
+    decoded = list(iter_commands(memoryview(encode(cmds))))
+    assert decoded == cmds
+    assert all(a is b for a, b in zip(decoded, cmds) if a.type != CommandType.PLACE)
+
+
+def test_writer_flushes_in_chunks():
+    out = io.BytesIO()
+    writer = BinaryLogWriter(out, flush_size=8)
+    for _ in range(30):
+        writer.write(MOVE)
+    assert 0 < len(out.getvalue()) < 4 + 10
+    writer.close()
+    assert len(out.getvalue()) == 4 + 10
+    assert writer.count == 30
+
+
+def test_bad_header_and_truncation():
+    with pytest.raises(ValueError):
+        list(iter_commands(b"nope"))
+    with pytest.raises(ValueError):
+        list(iter_commands(MAGIC + bytes([0b00_00_0000, 0x80])))
+
+
+def test_corrupt_place_header_is_rejected():
+    with pytest.raises(ValueError, match="0x01"):
+        list(iter_commands(MAGIC + b"\x01\x02\x02"))
+    for byte in range(0x40):
+        data = MAGIC + bytes([byte, 0x02, 0x02])
+        if byte & 0xCF:
+            with pytest.raises(ValueError):
+                list(iter_commands(data))
+        else:
+            assert list(iter_commands(data)) == [Command(CommandType.PLACE, 1, 1, list(Direction)[byte >> 4])]
+
+
+def test_convert_and_execute_match_text_run(tmp_path):
+    bin_path = tmp_path / "cmd.trb"
+    count = convert(CMD_TXT, bin_path)
+
+    text_robot = Robot(Table())
+    want = []
+    n = 0
+    for line in CMD_TXT.read_text().splitlines():
+        cmd = CommandParser.parse(line)
+        if cmd is not None:
+            n += 1
+            result = text_robot.execute_command(cmd)
+            if cmd.type == CommandType.REPORT:
+                want.append(result)
+
+    robot = Robot(Table())
+    assert count == n
+    assert execute_file(bin_path, robot) == want
+    assert robot.state == text_robot.state
+    assert bin_path.stat().st_size < CMD_TXT.stat().st_size / 4
+
+
+def test_convert_missing_text_file_writes_nothing(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        convert(tmp_path / "nope.txt", tmp_path / "out.trb")
+    assert not (tmp_path / "out.trb").exists()
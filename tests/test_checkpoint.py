@@ -0,0 +1,84 @@
+# tests/test_checkpoint.py
+import pytest
+
+from helpers import LINES, random_lines, replay
+from toy_robot import Robot, Table, CommandParser
+from toy_robot.checkpoint import CheckpointIndex, build_index, index_path, main, seek
+from toy_robot.ingest import iter_command_lines
+from toy_robot.robot import NOT_PLACED
+
+
+LOG_LINES = LINES * 4 + ["", "# note", "JUMP", "  move  "]
+
+
+def random_log(n, seed=0):
+    return "\n".join(random_lines(n, seed, LOG_LINES, place_rate=0.1)) + "\n"
+
+
+def replay_to(path, lineno, table):
+    # the robot after the first `lineno` lines, one command at a time
+    robot = Robot(table)
+    commands = (CommandParser.parse(line) for n, line in iter_command_lines(path) if n <= lineno)
+    list(replay(robot, (cmd for cmd in commands if cmd is not None)))
+    return robot
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_text(random_log(500))
+    return path
+
+
+def test_seek_matches_replay(log):
+    table = Table()
+    index = CheckpointIndex.build(log, table, interval=37)
+    assert len(index) > 10
+    assert index[0] == (1, 0, NOT_PLACED)
+    for lineno in [0, 1, 2, 36, 37, 38, 39, 100, 250, 499, 500, 600]:
+        assert seek(log, index, lineno, table).state == replay_to(log, lineno, table).state
+
+
+def test_checkpoints_hold_replayed_state(log):
+    table = Table()
+    index = CheckpointIndex.build(log, table, interval=50)
+    data = log.read_bytes()
+    for lineno, offset, state in index:
+        assert offset == 0 or data[offset - 1:offset] == b"\n"
+        assert data[:offset].count(b"\n") == lineno - 1
+        assert replay_to(log, lineno - 1, table).state == state
+
+
+def test_index_round_trips_through_sidecar(log):
+    built = build_index(log, interval=20)
+    loaded = CheckpointIndex.load(index_path(log))
+    assert list(loaded) == list(built)
+    assert (loaded.interval, loaded.width, loaded.height, loaded.log_size) == (20, 5, 5, log.stat().st_size)
+    assert seek(log, None, 321).state == replay_to(log, 321, Table()).state
+
+
+def test_seek_rejects_other_table_size(log):
+    index = CheckpointIndex.build(log, Table(), interval=10)
+    with pytest.raises(ValueError):
+        seek(log, index, 10, Table(6, 6))
+
+
+def test_seek_rejects_shrunk_log(log):
+    index = CheckpointIndex.build(log, Table(), interval=10)
+    log.write_text("MOVE\n")
+    with pytest.raises(ValueError):
+        seek(log, index, 10)
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "bad.ckpt"
+    path.write_bytes(b"nope")
+    with pytest.raises(ValueError):
+        CheckpointIndex.load(path)
+
+
+def test_cli_index_and_seek(log, capsys):
+    main(["index", str(log), "--interval", "25"])
+    assert "checkpoints" in capsys.readouterr().out
+    main(["seek", str(log), "400"])
+    assert capsys.readouterr().out == f"{replay_to(log, 400, Table())}\n"
@@ -179,3 +179,52 @@ def test_parse_place_valid(line, x, y, facing):
 )
 def test_parse_invalid_returns_none(line):
     assert CommandParser.parse(line) is None    
+
+
+# ----------------- SINGLE-PASS PARSER -----------------
+
+def test_simple_commands_are_shared_instances():
+    assert CommandParser.parse("MOVE") is CommandParser.parse("  move ")
+    assert CommandParser.parse(b"REPORT") is CommandParser.parse("report")
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        (b"MOVE", Command(CommandType.MOVE)),
+        (b"  left\r\n", Command(CommandType.LEFT)),
+        (bytearray(b"RIGHT"), Command(CommandType.RIGHT)),
+        (memoryview(b"\tREPORT"), Command(CommandType.REPORT)),
+        (b"PLACE 1, 2 ,west", Command(CommandType.PLACE, 1, 2, Direction.WEST)),
+        (b"place -1,+3,NORTH", Command(CommandType.PLACE, -1, 3, Direction.NORTH)),
+        ("PLACE 1,2,NORTH\xa0".encode(), Command(CommandType.PLACE, 1, 2, Direction.NORTH)),
+        (b"MOVE\x1c", Command(CommandType.MOVE)),
+        (b"", None),
+        (b"# MOVE", None),
+        (b"PLACE 1,2", None),
+        (b"PLACE 1,2,NORTH\xff", None),
+        (b"MOVE 1", None),
+    ],
+)
+def test_parse_bytes(line, expected):
+    assert CommandParser.parse(line) == expected
+
+
+@pytest.mark.parametrize("line", [None, 42, ["MOVE"]])
+def test_parse_non_text_returns_none(line):
+    assert CommandParser.parse(line) is None
+
+
+def test_parse_agrees_with_is_valid_on_random_lines():
+    import random
+    alphabet = [
+        "PLACE", "place", "MOVE", "left", "RIGHT", "RePort", "NORTH", "south", "West", "EAST",
+        " ", "\t", "\r", "\x0b", "\x1c", "\xa0", "\x85", ",", "#", "+", "-", "_", "0", "7", "x",
+        "١", "ı", "ſ",
+    ]
+    rng = random.Random(1234)
+    for _ in range(20000):
+        line = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 8)))
+        cmd = CommandParser.parse(line)
+        assert (cmd is not None) is CommandParser.is_valid(line), repr(line)
+        assert CommandParser.parse(line.encode()) == cmd, repr(line)
@@ -96,3 +96,63 @@ def test_main_handles_only_comments_and_blanks(monkeypatch, tmp_path):
     assert code == 0
     # No “[line ...] >>> ...” lines should appear because all lines are skipped
     assert "[line " not in out
+
+
+# ---------- OUTPUT MODES ----------
+
+MODES_TEXT = "\n".join(
+    [
+        "MOVE",             # not placed -> failed
+        "PLACE 0,0,NORTH",
+        "REPORT",
+        "MOVE",
+        "JUMP",             # invalid
+        "LEFT",
+        "MOVE",             # blocked -> failed
+        "REPORT",
+    ]
+)
+
+
+@pytest.fixture
+def modes_file(tmp_path):
+    fpath = tmp_path / "modes.txt"
+    fpath.write_text(MODES_TEXT)
+    return fpath
+
+
+def test_quiet_prints_final_state_only(monkeypatch, modes_file):
+    code, out, _ = run_cli(monkeypatch, ["toy_robot.py", str(modes_file), "--quiet"])
+    assert code == 0
+    assert out == "Robot at (0,1) facing WEST\n"
+
+
+def test_reports_only_prints_reports(monkeypatch, modes_file):
+    code, out, _ = run_cli(monkeypatch, ["toy_robot.py", "--reports-only", str(modes_file)])
+    assert code == 0
+    assert out == "x:0,y:0,facing:NORTH\nx:0,y:1,facing:WEST\n"
+
+
+def test_summary_prints_counts(monkeypatch, modes_file):
+    code, out, _ = run_cli(monkeypatch, ["toy_robot.py", str(modes_file), "--summary"])
+    assert code == 0
+    assert out == "commands: 8\nsuccessful: 5\nfailed: 2\ninvalid: 1\n"
+
+
+def test_output_modes_are_exclusive(monkeypatch, modes_file):
+    code, _, _ = run_cli(monkeypatch, ["toy_robot.py", str(modes_file), "--quiet", "--summary"])
+    assert code == 2
+
+
+def test_output_buffer_writes_in_chunks():
+    from toy_robot.cli import OutputBuffer
+
+    stream = io.StringIO()
+    out = OutputBuffer(stream, limit=10)
+    out.write("abc")
+    assert stream.getvalue() == ""
+    out.write("defghijk")
+    assert stream.getvalue() == "abcdefghijk"
+    out.write("z")
+    out.flush()
+    assert stream.getvalue() == "abcdefghijkz"
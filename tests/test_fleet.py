@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from toy_robot import Robot, Table
+from toy_robot.command import Direction, Command, CommandType
+from toy_robot.fleet import Fleet, FACING_CODES
+
+
+def test_new_fleet_is_not_placed():
+    f = Fleet(Table(), 3)
+    assert len(f) == 3
+    assert not f.placed.any()
+    assert f.report() == ["Robot not placed"] * 3
+
+
+def test_place_and_report_all():
+    f = Fleet(Table(), 2)
+    ok = f.place(1, 2, Direction.EAST)
+    assert ok.tolist() == [True, True]
+    assert f.report() == ["x:1,y:2,facing:EAST"] * 2
+
+
+@pytest.mark.parametrize("x,y", [(5, 0), (-1, 2), (0, 5), (10**30, 0)])
+def test_place_off_table_is_rejected(x, y):
+    f = Fleet(Table(), 2)
+    ok = f.place(x, y, Direction.NORTH)
+    assert not ok.any()
+    assert not f.placed.any()
+
+
+def test_place_per_robot_arrays():
+    f = Fleet(Table(), 3)
+    ok = f.place(np.array([0, 4, 7]), np.array([0, 4, 0]),
+                 np.array([FACING_CODES[Direction.NORTH], FACING_CODES[Direction.WEST], 0]))
+    assert ok.tolist() == [True, True, False]
+    assert f.report() == ["x:0,y:0,facing:NORTH", "x:4,y:4,facing:WEST", "Robot not placed"]
+
+
+def test_mask_limits_the_update():
+    f = Fleet(Table(), 3)
+    f.place(0, 0, Direction.NORTH)
+    ok = f.move(np.array([True, False, True]))
+    assert ok.tolist() == [True, False, True]
+    assert f.y.tolist() == [1, 0, 1]
+    assert f.report(np.array([False, True, False])) == ["x:0,y:0,facing:NORTH"]
+
+
+def test_mask_shape_mismatch_raises():
+    f = Fleet(Table(), 3)
+    with pytest.raises(ValueError):
+        f.move(np.array([True, False]))
+
+
+def test_move_blocked_at_edge():
+    f = Fleet(Table(), 1)
+    f.place(0, 4, Direction.NORTH)
+    assert f.move().tolist() == [False]
+    assert f.report() == ["x:0,y:4,facing:NORTH"]
+
+
+def test_turns_ignored_when_not_placed():
+    f = Fleet(Table(), 1)
+    assert f.left().tolist() == [False]
+    assert f.right().tolist() == [False]
+    assert f.report() == ["Robot not placed"]
+
+
+def test_from_arrays_shares_memory():
+    x = np.zeros(2, dtype=np.int32)
+    f = Fleet.from_arrays(Table(), x, np.zeros(2, dtype=np.int32),
+                          np.zeros(2, dtype=np.int8), np.zeros(2, dtype=bool))
+    f.place(3, 1, Direction.SOUTH)
+    assert x.tolist() == [3, 3]
+
+
+def _random_command(rng):
+    kind = rng.choice(list(CommandType))
+    if kind == CommandType.PLACE:
+        return Command(kind, x=rng.randint(-1, 5), y=rng.randint(-1, 5),
+                       facing=rng.choice(list(Direction)))
+    return Command(kind)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_scalar_robots(seed):
+    rng = random.Random(seed)
+    table = Table(width=4, height=3)
+    n = 20
+    fleet = Fleet(table, n)
+    robots = [Robot(table) for _ in range(n)]
+
+    for _ in range(200):
+        cmd = _random_command(rng)
+        mask = np.array([rng.random() < 0.7 for _ in range(n)])
+        got = fleet.execute_command(cmd, mask)
+        want = [r.execute_command(cmd) for r, m in zip(robots, mask) if m]
+        if cmd.type == CommandType.REPORT:
+            assert got == want
+        else:
+            assert got[mask].tolist() == want
+            assert not got[~mask].any()
+
+    assert fleet.report() == [r.report() for r in robots]
+    assert [str(fleet.robot(i)) for i in range(n)] == [str(r) for r in robots]
@@ -0,0 +1,147 @@
+# tests/test_follow.py
+import io
+import json
+import random
+
+import pytest
+
+from toy_robot import Robot, Table, CommandParser
+from toy_robot.cli import OutputBuffer, REPORTS_ONLY, VERBOSE, main
+from toy_robot.follow import Checkpoint, Follower, load_checkpoint, save_checkpoint
+
+
+class Log:
+    def __init__(self, path):
+        self.path = path
+        path.write_bytes(b"")
+
+    def append(self, data: bytes):
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+
+def follower(path, mode=REPORTS_ONLY, **kwargs):
+    stream = io.StringIO()
+    return Follower(str(path), mode, OutputBuffer(stream), **kwargs), stream
+
+
+def test_polls_only_complete_new_lines(tmp_path):
+    log = Log(tmp_path / "log.txt")
+    f, stream = follower(log.path)
+    assert f.poll() == 0
+
+    log.append(b"PLACE 0,0,NORTH\nREP")
+    assert f.poll() == 16
+    assert stream.getvalue() == ""
+    log.append(b"ORT\nMOVE\n")
+    assert f.poll() == 12
+    assert stream.getvalue() == "x:0,y:0,facing:NORTH\n"
+    assert f.poll() == 0
+    assert (f.position.offset, f.position.lineno) == (28, 4)
+
+
+def test_splits_lines_like_text_mode(tmp_path):
+    log = Log(tmp_path / "log.txt")
+    f, stream = follower(log.path)
+    # a trailing "\r" may be the first half of "\r\n": wait for the next byte
+    log.append(b"PLACE 0,0,NORTH\rMOVE\r")
+    assert f.poll() == 16
+    log.append(b"\nREPORT\r\n")
+    assert f.poll() == 14
+    assert stream.getvalue() == "x:0,y:1,facing:NORTH\n"
+    assert f.position.lineno == 4
+
+
+def test_resumes_from_checkpoint(tmp_path):
+    log = Log(tmp_path / "log.txt")
+    ckpt = tmp_path / "log.ckpt"
+    log.append(b"PLACE 1,1,EAST\nMOVE\n")
+    f, _ = follower(log.path, checkpoint=str(ckpt))
+    f.poll()
+    assert load_checkpoint(str(ckpt), Table()) == Checkpoint(20, 3, f.robot.state)
+
+    log.append(b"JUMP\nREPORT\n")
+    restarted, stream = follower(log.path, mode=VERBOSE, checkpoint=str(ckpt))
+    assert restarted.robot.report() == "x:2,y:1,facing:EAST"
+    assert restarted.poll() == 12
+    out = stream.getvalue()
+    assert out.startswith("[line 3] >>> JUMP\nInvalid command\n")
+    assert "[line 4] >>> REPORT" in out
+
+
+def test_truncated_file_starts_over(tmp_path):
+    log = Log(tmp_path / "log.txt")
+    log.append(b"PLACE 1,1,EAST\nMOVE\nMOVE\n")
+    f, stream = follower(log.path)
+    f.poll()
+    log.path.write_bytes(b"REPORT\n")
+    f.poll()
+    assert stream.getvalue() == "Robot not placed\n"
+    assert f.position.lineno == 2
+
+
+@pytest.mark.parametrize("block_size", [1, 5, 1 << 20])
+def test_matches_one_pass_run(tmp_path, block_size):
+    rng = random.Random(block_size)
+    lines = ["PLACE 0,0,NORTH", "PLACE 4,4,SOUTH", "MOVE", "MOVE", "LEFT", "RIGHT", "REPORT", "# c", "", "JUMP"]
+    data = "".join(rng.choice(lines) + "\n" for _ in range(500)).encode()
+
+    robot, expected = Robot(Table()), []
+    for line in data.splitlines():
+        cmd = CommandParser.parse(line.strip())
+        if cmd is not None:
+            result = robot.execute_command(cmd)
+            if cmd.type.name == "REPORT":
+                expected.append(result + "\n")
+
+    log = Log(tmp_path / "log.txt")
+    ckpt = str(tmp_path / "log.ckpt")
+    got, pos = [], 0
+    while pos < len(data):
+        step = rng.randint(1, 60)
+        log.append(data[pos:pos + step])
+        pos += step
+        # a fresh Follower each time: everything must come from the checkpoint
+        f, stream = follower(log.path, checkpoint=ckpt, block_size=block_size)
+        f.poll()
+        got.append(stream.getvalue())
+    assert "".join(got) == "".join(expected)
+    assert f.robot.state == robot.state
+
+
+def test_checkpoint_table_mismatch(tmp_path):
+    path = str(tmp_path / "c.json")
+    save_checkpoint(path, Checkpoint(5, 2, 7), Table(6, 6))
+    assert json.loads(open(path).read())["width"] == 6
+    with pytest.raises(ValueError):
+        load_checkpoint(path, Table())
+
+
+def test_cli_checkpoint_runs_new_lines_once(tmp_path, capsys):
+    log = Log(tmp_path / "log.txt")
+    ckpt = str(tmp_path / "log.ckpt")
+    log.append(b"PLACE 0,0,NORTH\nREPORT\n")
+    main([str(log.path), "--reports-only", "--checkpoint", ckpt])
+    assert capsys.readouterr().out == "x:0,y:0,facing:NORTH\n"
+    log.append(b"MOVE\nREPORT\n")
+    main([str(log.path), "--reports-only", "--checkpoint", ckpt])
+    assert capsys.readouterr().out == "x:0,y:1,facing:NORTH\n"
+
+
+def test_cli_follow_stops_on_interrupt(tmp_path, capsys, monkeypatch):
+    log = Log(tmp_path / "log.txt")
+    log.append(b"PLACE 0,0,NORTH\nREPORT\n")
+
+    def interrupt(seconds):
+        raise KeyboardInterrupt
+    monkeypatch.setattr("toy_robot.follow.time.sleep", interrupt)
+    main([str(log.path), "--reports-only", "--follow", "--interval", "0.01"])
+    assert capsys.readouterr().out == "x:0,y:0,facing:NORTH\n"
+
+
+@pytest.mark.parametrize("args", [["--follow", "--summary"], ["--checkpoint", "c", "--quiet"],
+                                  ["--follow", "--batch"], ["--follow", "--reports-only", "--parallel", "2"]])
+def test_cli_follow_rejects_other_modes(tmp_path, args):
+    with pytest.raises(SystemExit) as exc:
+        main([str(tmp_path / "log.txt"), *args])
+    assert exc.value.code == 2
@@ -0,0 +1,149 @@
+import io
+
+import pytest
+from toy_robot.cli import OutputBuffer, REPORTS_ONLY, run_file
+from toy_robot.command import CommandParser, ParseCache
+from toy_robot.ingest import chunk_ranges, scan_commands, scan_lines, scan_lines_at, iter_command_lines
+from toy_robot.instrument import Profiler
+
+TEXT = (
+    "# header comment\n"
+    "\n"
+    "PLACE 0,0,NORTH\r\n"
+    "   # indented comment\n"
+    "  MOVE  \n"
+    "\t\n"
+    "JUMP\n"
+    "\xa0\n"
+    "\xa0# nbsp comment\n"
+    "REPORT"
+)
+
+
+def text_mode_lines(text):
+    out = []
+    # io.StringIO splits lines like a text-mode file: at "\n", "\r\n" and "\r"
+    for lineno, raw in enumerate(io.StringIO(text, newline=None), start=1):
+        line = raw.strip()
+        if line and not line.startswith("#"):
+            out.append((lineno, line))
+    return out
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 7, 1 << 22])
+def test_scan_matches_text_mode_iteration(block_size):
+    buf = TEXT.encode()
+    got = [(n, line.decode()) for n, line in scan_lines(buf, block_size=block_size)]
+    assert got == text_mode_lines(TEXT)
+
+
+def test_scan_range_with_start_lineno():
+    buf = b"MOVE\nLEFT\nRIGHT\n"
+    assert list(scan_lines(buf, start=5, end=10, lineno=2)) == [(2, b"LEFT")]
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 7, 1 << 22])
+@pytest.mark.parametrize("text", [TEXT, TEXT + "\n"])
+def test_scan_lines_at_offsets_resume_scan(block_size, text):
+    buf = text.encode()
+    scanned = list(scan_lines_at(buf, block_size=block_size))
+    assert [(n, line) for n, _, line in scanned] == list(scan_lines(buf))
+    for i, (n, offset, _) in enumerate(scanned):
+        assert list(scan_lines(buf, offset, lineno=n + 1)) == [(m, line) for m, _, line in scanned[i + 1:]]
+
+
+def test_iter_command_lines_from_file(tmp_path):
+    f = tmp_path / "cmds.txt"
+    f.write_bytes(TEXT.encode())
+    lines = list(iter_command_lines(f))
+    assert [n for n, _ in lines] == [3, 5, 7, 10]
+    assert [CommandParser.parse(line) is not None for _, line in lines] == [True, True, False, True]
+
+
+def test_iter_command_lines_empty_file(tmp_path):
+    f = tmp_path / "empty.txt"
+    f.write_bytes(b"")
+    assert list(iter_command_lines(f)) == []
+
+
+def test_iter_command_lines_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(iter_command_lines(tmp_path / "nope.txt"))
+
+
+@pytest.mark.parametrize("parts", [1, 2, 3, 5, 50])
+def test_chunk_ranges_split_at_line_ends(parts):
+    buf = b"PLACE 0,0,NORTH\nMOVE\n\nLEFT\nREPORT\nMOVE"
+    ranges = chunk_ranges(buf, parts)
+    assert 1 <= len(ranges) <= parts
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(buf)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and buf[end - 1:end] == b"\n"
+    assert b"".join(buf[a:b] for a, b in ranges) == buf
+
+
+def test_chunk_ranges_min_size():
+    buf = b"MOVE\n" * 100
+    assert len(chunk_ranges(buf, 8, min_size=200)) == 2
+    assert chunk_ranges(b"", 4) == [(0, 0)]
+
+
+MIXED_ENDINGS = "PLACE 0,0,NORTH\rMOVE\r\n# c\r\rREPORT\nLEFT\r\r\nREPORT\r"
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 5, 1 << 22])
+def test_scan_splits_lines_like_text_mode(block_size):
+    buf = MIXED_ENDINGS.encode()
+    got = [(n, line.decode()) for n, line in scan_lines(buf, block_size=block_size)]
+    assert got == text_mode_lines(MIXED_ENDINGS)
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 1 << 22])
+def test_scan_lines_at_offsets_with_mixed_endings(block_size):
+    buf = MIXED_ENDINGS.encode()
+    scanned = list(scan_lines_at(buf, block_size=block_size))
+    assert [(n, line) for n, _, line in scanned] == list(scan_lines(buf))
+    for i, (n, offset, _) in enumerate(scanned):
+        assert list(scan_lines(buf, offset, lineno=n + 1)) == [(m, line) for m, _, line in scanned[i + 1:]]
+
+
+def test_bare_carriage_return_file_runs_every_line(tmp_path):
+    path = tmp_path / "cr.txt"
+    path.write_bytes(b"PLACE 0,0,NORTH\rMOVE\rREPORT\r")
+    out = io.StringIO()
+    buffer = OutputBuffer(out)
+    summary = run_file(str(path), REPORTS_ONLY, buffer)
+    buffer.flush()
+    assert out.getvalue() == "x:0,y:1,facing:NORTH\n"
+    assert (summary.successful, summary.invalid) == (3, 0)
+
+
+@pytest.mark.parametrize("repeats", [1, 2000])
+@pytest.mark.parametrize("block_size", [16, 1 << 22])
+def test_scan_commands_matches_parse(repeats, block_size):
+    buf = (TEXT + "\n").encode() * repeats + b"".join(b"PLACE %d,1,EAST\n" % i for i in range(3000))
+    expected = [(n, line, CommandParser.parse(line)) for n, line in scan_lines(buf)]
+    assert list(scan_commands(buf, block_size=block_size)) == expected
+
+
+def test_scan_commands_calls_given_parse_once_per_distinct_line():
+    buf = b"MOVE\nMOVE\nJUMP\nJUMP\n" * 1000
+    cache = ParseCache(8)
+    expected = list(scan_commands(buf))
+    assert list(scan_commands(buf, parse=cache.parse)) == expected
+    assert cache.misses == 2 and cache.hits == 0
+    # unique lines are parsed one by one
+    calls = []
+    assert [cmd for _, _, cmd in scan_commands(b"MOVE\nJUMP\n", parse=lambda line: calls.append(line))] == [None] * 2
+    assert calls == [b"MOVE", b"JUMP"]
+
+
+def test_scan_commands_calls_swapped_parse_for_every_line():
+    buf = b"MOVE\nMOVE\nJUMP\nJUMP\n" * 1000
+    cache = ParseCache(8)
+    with Profiler() as profiler:
+        list(scan_commands(buf))
+        list(scan_commands(buf, parse=cache.parse))
+    assert profiler.rejected == 4000
+    assert profiler.parse[CommandParser.parse(b"MOVE").type].count == 4000
+    assert cache.hits + cache.misses == 4000
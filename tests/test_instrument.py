@@ -0,0 +1,102 @@
+# tests/test_instrument.py
+import json
+
+import pytest
+
+from toy_robot import Robot, Table, CommandParser, CommandType, ParseCache
+from toy_robot.cli import main
+from toy_robot.instrument import LatencyHistogram, Profiler
+
+
+def test_profiler_restores_methods():
+    parse, execute_command = CommandParser.__dict__["parse"], Robot.__dict__["execute_command"]
+    cache_parse = ParseCache.__dict__["parse"]
+    with Profiler():
+        assert CommandParser.__dict__["parse"] is not parse
+        assert ParseCache.__dict__["parse"] is not cache_parse
+        assert Robot.__dict__["execute_command"] is not execute_command
+    assert CommandParser.__dict__["parse"] is parse
+    assert ParseCache.__dict__["parse"] is cache_parse
+    assert Robot.__dict__["execute_command"] is execute_command
+
+
+def test_profiler_counts_by_command_type():
+    robot = Robot(Table())
+    with Profiler() as profiler:
+        for line in ["MOVE", "PLACE 0,0,SOUTH", "MOVE", "LEFT", "JUMP", "REPORT", "PLACE 9,9,NORTH"]:
+            cmd = CommandParser.parse(line)
+            if cmd is not None:
+                assert robot.execute_command(cmd) is not None
+
+    assert profiler.rejected == 1
+    assert profiler.parse[CommandType.PLACE].count == 2
+    assert profiler.execute[CommandType.MOVE].count == 2
+    assert profiler.failed == {CommandType.MOVE: 2, CommandType.PLACE: 1}
+    assert CommandType.RIGHT not in profiler.execute
+
+    data = profiler.to_dict()
+    assert data["rejected"] == 1
+    assert data["execute"]["MOVE"]["failed"] == 2
+    assert set(data["phases_ns"]) == {"parse", "execute", "output", "other"}
+
+
+def test_profiler_counts_cache_hits_once():
+    cache = ParseCache()
+    with Profiler() as profiler:
+        for line in ["JUMP", "MOVE", "JUMP", "MOVE", "JUMP", bytearray(b"MOVE")]:
+            cache.parse(line)
+    assert (cache.hits, cache.misses) == (3, 2)
+    assert profiler.rejected == 3
+    assert profiler.parse[CommandType.MOVE].count == 3
+
+
+def test_profiler_cannot_install_twice():
+    profiler = Profiler()
+    with profiler:
+        with pytest.raises(RuntimeError):
+            profiler.install()
+
+
+def test_latency_histogram_buckets():
+    hist = LatencyHistogram()
+    for ns in [0, 1, 3, 100, 100, 5000]:
+        hist.add(ns)
+    assert hist.count == 6
+    assert hist.total_ns == 5204
+    assert hist.percentile(50) == 4
+    assert hist.percentile(99) == 8192
+    assert hist.to_dict()["buckets"] == {"1": 1, "2": 1, "4": 1, "128": 2, "8192": 1}
+
+
+def test_cli_profile(monkeypatch, tmp_path, capsys):
+    path = tmp_path / "cmds.txt"
+    path.write_text("PLACE 0,0,NORTH\nMOVE\nJUMP\nREPORT\n")
+    profile_json = tmp_path / "profile.json"
+    execute_command = Robot.__dict__["execute_command"]
+
+    main([str(path), "--reports-only", "--profile", "--profile-json", str(profile_json)])
+
+    captured = capsys.readouterr()
+    assert captured.out == "x:0,y:1,facing:NORTH\n"
+    assert "execute" in captured.err and "invalid" in captured.err
+    data = json.loads(profile_json.read_text())
+    assert data["rejected"] == 1
+    assert data["execute"]["REPORT"]["count"] == 1
+    assert Robot.__dict__["execute_command"] is execute_command
+
+
+def test_cli_profile_with_parse_cache(tmp_path, capsys):
+    path = tmp_path / "cmds.txt"
+    path.write_text("JUMP\nJUMP\nJUMP\nPLACE 0,0,NORTH\nMOVE\nMOVE\nMOVE\n")
+    profile_json = tmp_path / "profile.json"
+    main([str(path), "--summary", "--parse-cache", "4", "--profile-json", str(profile_json)])
+    assert "invalid: 3" in capsys.readouterr().out
+    data = json.loads(profile_json.read_text())
+    assert data["rejected"] == 3
+    assert data["parse"]["MOVE"]["count"] == data["execute"]["MOVE"]["count"] == 3
+
+
+def test_cli_profile_rejects_batch(tmp_path):
+    with pytest.raises(SystemExit) as exc:
+        main([str(tmp_path), "--batch", "--profile"])
+    assert exc.value.code == 2
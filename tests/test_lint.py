@@ -0,0 +1,119 @@
+# tests/test_lint.py
+import random
+
+import pytest
+
+from toy_robot import CommandParser
+from toy_robot.cli import main
+from toy_robot.lint import classify, check_buffer, check_file, VALID, INVALID, IGNORED
+
+# pieces of lines, chosen to hit the edges of is_valid(): case, every kind
+# of whitespace, int() syntax and non-ASCII bytes
+ATOMS = [b"PLACE", b"place", b"PlAcE", b"MOVE", b"move", b"LEFT", b"RIGHT", b"REPORT",
+         b"NORTH", b"south", b"East", b"WEST", b",", b" ", b"\t", b"\x0b", b"\x0c", b"\r",
+         b"\x1c", b"\x1f", b"1", b"0", b"-", b"+", b"_", b"12", b"#", b"x", b"\x00",
+         b"\xc2\xa0", b"\xe2\x80\x83", b"\xc2\x85", b"\xc5\xbf", b"\xd9\xa3", b"\xff", b"\x85"]
+
+
+def expected(line: bytes) -> str:
+    text = line.decode("utf-8", "replace")
+    if CommandParser.is_valid(text):
+        return VALID
+    text = text.strip()
+    return IGNORED if not text or text.startswith("#") else INVALID
+
+
+def random_lines(n, seed, atoms=ATOMS):
+    rng = random.Random(seed)
+    return [b"".join(rng.choice(atoms) for _ in range(rng.randrange(9))) for _ in range(n)]
+
+
+@pytest.mark.parametrize("line", [
+    b"MOVE", b"  move\r", b"PLACE 1,2,NORTH", b"place\t+1 , -0 ,south", b"PLACE 1_000,2,WEST",
+    b"PLACE\x1c1,2,EAST", b"MOVE\xc2\xa0", b"PLACE \xd9\xa3,0,NORTH",
+])
+def test_valid_lines(line):
+    assert classify(line) == VALID == expected(line)
+
+
+@pytest.mark.parametrize("line", [
+    b"MOVE 1", b"PLACE", b"PLACE1,2,NORTH", b"PLACE 1,2", b"PLACE 1__0,2,NORTH",
+    b"PLACE 1,2,NORTHWEST", b"PLACE 0x1,2,NORTH", b"MO VE", b"\xff",
+])
+def test_invalid_lines(line):
+    assert classify(line) == INVALID == expected(line)
+
+
+@pytest.mark.parametrize("line", [b"", b"  \t", b"# MOVE", b"   #", b"# caf\xc3\xa9", b"\xc2\xa0"])
+def test_ignored_lines(line):
+    assert classify(line) == IGNORED == expected(line)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_is_valid(seed):
+    for line in random_lines(20000, seed):
+        assert classify(line) == expected(line), line
+
+
+@pytest.mark.parametrize("block_size", [1, 64, 1 << 16])
+def test_check_buffer_counts_and_numbers(block_size):
+    buf = b"\n".join(random_lines(5000, 7, ATOMS[:28]))
+    # lines end at "\n", "\r\n" or "\r", as in a run
+    lines = buf.splitlines()
+    result = check_buffer(buf, block_size=block_size)
+    verdicts = [expected(line) for line in lines]
+    assert result.lines == len(lines)
+    assert result.valid == verdicts.count(VALID)
+    assert result.ignored == verdicts.count(IGNORED)
+    assert list(result.invalid_lines) == [n for n, v in enumerate(verdicts, 1) if v == INVALID]
+
+
+def test_check_file_in_parallel_chunks(tmp_path):
+    buf = b"\n".join(random_lines(20000, 3, ATOMS[:28])) + b"\n"
+    path = tmp_path / "cmd.txt"
+    path.write_bytes(buf)
+    sequential = check_file(str(path))
+    parallel = check_file(str(path), jobs=3, min_chunk=1 << 12)
+    assert parallel == sequential
+    assert sequential.lines == len(buf.splitlines())
+
+
+def test_check_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    assert check_file(str(path)).lines == 0
+
+
+def test_cli_check(tmp_path, capsys):
+    path = tmp_path / "cmd.txt"
+    path.write_text("PLACE 0,0,NORTH\nJUMP\n# comment\n\nmove\nPLACE 1,x,NORTH\n")
+    with pytest.raises(SystemExit) as exc:
+        main([str(path), "--check"])
+    assert exc.value.code == 1
+    assert capsys.readouterr().out == ("[line 2] Invalid command\n[line 6] Invalid command\n"
+                                       "lines: 6\nvalid: 2\nignored: 2\ninvalid: 2\n")
+
+
+def test_cli_check_clean_file_summary(tmp_path, capsys):
+    path = tmp_path / "cmd.txt"
+    path.write_text("PLACE 0,0,NORTH\nMOVE\nREPORT\n")
+    with pytest.raises(SystemExit) as exc:
+        main([str(path), "--check", "--summary"])
+    assert exc.value.code == 0
+    assert capsys.readouterr().out == "lines: 3\nvalid: 3\nignored: 0\ninvalid: 0\n"
+
+
+def test_cli_check_missing_file(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main([str(tmp_path / "missing.txt"), "--check"])
+    assert exc.value.code == 1
+    assert "Error: file not found" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("args", [["--quiet"], ["--reports-only"], ["--parallel", "2"], ["--tagged"], ["--batch"]])
+def test_cli_check_rejects_other_modes(tmp_path, args):
+    path = tmp_path / "cmd.txt"
+    path.write_text("MOVE\n")
+    with pytest.raises(SystemExit) as exc:
+        main([str(path), "--check", *args])
+    assert exc.value.code == 2
@@ -0,0 +1,91 @@
+import pytest
+from toy_robot import Robot, Table
+from toy_robot.command import Position, Direction
+from toy_robot.obstacles import BitmapObstacles, HashedObstacles, make_index, load_obstacles
+
+CELLS = [(1, 1), (3, 0), (0, 4), (4, 4)]
+
+
+@pytest.mark.parametrize("index_cls", [BitmapObstacles, HashedObstacles])
+def test_index_lookups(index_cls):
+    index = index_cls(5, 5, CELLS + [(1, 1)])
+    assert len(index) == 4
+    assert sorted(index) == sorted(CELLS)
+    for x in range(5):
+        for y in range(5):
+            assert index.is_blocked(x, y) is ((x, y) in CELLS)
+
+
+@pytest.mark.parametrize("index_cls", [BitmapObstacles, HashedObstacles])
+def test_off_table_obstacle_rejected(index_cls):
+    with pytest.raises(ValueError):
+        index_cls(5, 5, [(5, 0)])
+
+
+
+@pytest.mark.parametrize("index_cls", [BitmapObstacles, HashedObstacles])
+def test_table_rejects_index_of_another_size(index_cls):
+    assert Table(5, 5, index_cls(5, 5, CELLS)).obstacles is not None
+    for width, height in [(6, 5), (5, 4)]:
+        with pytest.raises(ValueError, match="5x5 table"):
+            Table(width, height, index_cls(5, 5, CELLS))
+
+def test_make_index_picks_by_density():
+    assert isinstance(make_index(100_000, 100_000, [(5, 5)]), HashedObstacles)
+    assert isinstance(make_index(8, 8, CELLS), BitmapObstacles)
+    assert isinstance(make_index(8, 8, CELLS, kind="hashed"), HashedObstacles)
+    with pytest.raises(ValueError):
+        make_index(8, 8, CELLS, kind="quadtree")
+
+
+def test_load_obstacles_from_file(tmp_path):
+    f = tmp_path / "obstacles.txt"
+    f.write_text("# blocked cells\n1,1\n\n 3 , 0 \n0,4\n4,4\n")
+    index = load_obstacles(f, 5, 5, kind="bitmap")
+    assert sorted(index) == sorted(CELLS)
+
+    table = Table.with_obstacles(5, 5, str(f))
+    assert not table.is_valid(Position(1, 1))
+    assert table.is_valid(Position(1, 2))
+
+
+def test_load_obstacles_bad_line(tmp_path):
+    f = tmp_path / "obstacles.txt"
+    f.write_text("1,1\n2;2\n")
+    with pytest.raises(ValueError, match=":2:"):
+        load_obstacles(f, 5, 5)
+
+
+@pytest.mark.parametrize("kind", ["bitmap", "hashed"])
+def test_robot_respects_obstacles(kind):
+    table = Table(5, 5, make_index(5, 5, CELLS, kind))
+    r = Robot(table)
+    assert r.place(Position(1, 1), Direction.NORTH) is False
+    assert r.place(Position(1, 0), Direction.NORTH) is True
+    assert r.move() is False                      # (1,1) is blocked
+    r.right()
+    assert r.move() is True                       # (2,0)
+    assert r.move() is False                      # (3,0) is blocked
+    assert str(r) == "Robot at (2,0) facing EAST"
+
+
+def test_sparse_obstacles_on_huge_table():
+    table = Table(100_000, 100_000, HashedObstacles(100_000, 100_000, [(50_000, 50_001)]))
+    r = Robot(table)
+    r.place(Position(50_000, 50_000), Direction.NORTH)
+    assert r.move() is False
+    r.left()
+    assert r.move() is True
+    assert str(r) == "Robot at (49999,50000) facing WEST"
+
+
+def test_fleet_respects_obstacles():
+    np = pytest.importorskip("numpy")
+    from toy_robot.fleet import Fleet
+
+    table = Table(5, 5, HashedObstacles(5, 5, CELLS))
+    fleet = Fleet(table, 3)
+    ok = fleet.place(np.array([1, 1, 2]), np.array([1, 0, 0]), 0)
+    assert ok.tolist() == [False, True, True]
+    assert fleet.move().tolist() == [False, False, True]
+    assert fleet.report() == ["Robot not placed", "x:1,y:0,facing:NORTH", "x:2,y:1,facing:NORTH"]
@@ -0,0 +1,73 @@
+import pytest
+
+from helpers import random_lines, replay
+from toy_robot import Robot, Table
+from toy_robot.command import Position, Direction, Command, CommandType, CommandParser
+from toy_robot.obstacles import HashedObstacles
+from toy_robot.optimize import Run, collapse, execute_runs
+
+MOVE, LEFT, RIGHT, REPORT = (CommandParser.parse(s) for s in ["MOVE", "LEFT", "RIGHT", "REPORT"])
+PLACE = Command(CommandType.PLACE, 1, 1, Direction.NORTH)
+
+
+def test_collapse_merges_runs():
+    cmds = [MOVE] * 3 + [LEFT, LEFT, RIGHT, LEFT, LEFT, LEFT] + [REPORT, REPORT, PLACE, MOVE]
+    assert list(collapse(cmds)) == [
+        Run(MOVE, 3),
+        Run(LEFT, 6, (-4) % 4),
+        Run(REPORT),
+        Run(REPORT),
+        Run(PLACE),
+        Run(MOVE, 1),
+    ]
+
+
+def test_collapse_net_turns():
+    assert list(collapse([RIGHT] * 7)) == [Run(RIGHT, 7, 3)]
+    assert list(collapse([LEFT, RIGHT])) == [Run(LEFT, 2, 0)]
+
+
+def test_advance_clamps_at_edge():
+    r = Robot(Table())
+    r.place(Position(1, 1), Direction.NORTH)
+    assert r.advance(1000) == 3
+    assert str(r) == "Robot at (1,4) facing NORTH"
+    assert r.advance(5) == 0
+
+
+def test_advance_and_rotate_before_place():
+    r = Robot(Table())
+    assert r.advance(3) == 0
+    assert r.rotate(1) is False
+    assert not r.is_placed()
+
+
+def test_rotate_matches_single_turns():
+    r = Robot(Table())
+    r.place(Position(0, 0), Direction.NORTH)
+    assert r.rotate(-1) is True
+    assert r.facing == Direction.WEST
+    r.rotate(6)
+    assert r.facing == Direction.EAST
+
+
+# long runs of MOVEs and of turns, for collapse() to merge
+RUN_LINES = ["MOVE"] * 12 + ["LEFT", "RIGHT"] * 3 + ["REPORT"]
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("obstacles", [False, True])
+def test_runs_reproduce_per_command_results(seed, obstacles):
+    size = 6
+    table = Table(size, size, HashedObstacles(size, size, [(2, 2), (4, 1), (0, 5)]) if obstacles else None)
+    cmds = [CommandParser.parse(line) for line in random_lines(1500, seed, RUN_LINES, 0.01, size, size)]
+
+    reference = Robot(table)
+    want = list(replay(reference, cmds))
+
+    robot = Robot(table)
+    results = []
+    reports = execute_runs(robot, collapse(cmds), results)
+    assert results == want
+    assert reports == [w for w, c in zip(want, cmds) if c.type == CommandType.REPORT]
+    assert robot.state == reference.state
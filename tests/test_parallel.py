@@ -0,0 +1,74 @@
+# tests/test_parallel.py
+import pytest
+
+from helpers import LINES, random_lines, replay
+from toy_robot import Robot, Table, CommandParser, Position, Direction
+from toy_robot.cli import main
+from toy_robot.ingest import iter_command_lines
+from toy_robot.parallel import compile_chunk, run_parallel
+
+
+SCRIPT_LINES = LINES * 4 + ["", "# comment", "JUMP", " report "]
+
+
+def random_script(n, seed, place_rate=0.05):
+    return "\n".join(random_lines(n, seed, SCRIPT_LINES, place_rate)) + "\n"
+
+
+def sequential(path, table):
+    robot = Robot(table)
+    commands = [cmd for cmd in (CommandParser.parse(line) for _, line in iter_command_lines(path))
+                if cmd is not None]
+    results = list(replay(robot, commands))
+    reports = [r for cmd, r in zip(commands, results) if cmd.type.name == "REPORT"]
+    return robot, reports
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("jobs", [1, 2, 5])
+def test_parallel_matches_sequential(tmp_path, seed, jobs):
+    path = tmp_path / "cmds.txt"
+    # seed 0 has no PLACE at all: chunks never collapse to one class
+    path.write_text(random_script(2000, seed, place_rate=0.0 if seed == 0 else 0.02))
+    expected_robot, expected_reports = sequential(path, Table())
+    robot, reports = run_parallel(str(path), jobs=jobs, min_chunk=64)
+    assert reports == expected_reports
+    assert robot.state == expected_robot.state
+
+
+def test_compile_chunk_covers_byte_range(tmp_path):
+    path = tmp_path / "cmds.txt"
+    path.write_bytes(b"PLACE 0,0,NORTH\nMOVE\nREPORT\n")
+    table = Table()
+    program = compile_chunk(str(path), 16, 28, table)    # "MOVE\nREPORT\n"
+    start = table.encode(Position(0, 0), Direction.NORTH)
+    assert program.end_state(start) == table.encode(Position(0, 1), Direction.NORTH)
+    assert program.reports(start) == ("x:0,y:1,facing:NORTH",)
+    assert program.reports(0) == ("Robot not placed",)
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("")
+    robot, reports = run_parallel(str(path), jobs=3)
+    assert not robot.is_placed() and reports == []
+
+
+def test_cli_parallel(tmp_path, capsys):
+    path = tmp_path / "cmds.txt"
+    path.write_text(random_script(3000, 7))
+    for mode in ("--reports-only", "--quiet"):
+        main([str(path), mode])
+        expected = capsys.readouterr().out
+        main([str(path), mode, "--parallel", "3"])
+        assert capsys.readouterr().out == expected
+
+
+@pytest.mark.parametrize("args", [["--parallel", "2"], ["--summary", "--parallel", "2"],
+                                  ["--quiet", "--parallel", "0"]])
+def test_cli_parallel_rejects_unsupported_modes(tmp_path, args):
+    path = tmp_path / "cmds.txt"
+    path.write_text("MOVE\n")
+    with pytest.raises(SystemExit) as exc:
+        main([str(path), *args])
+    assert exc.value.code == 2
@@ -0,0 +1,99 @@
+# tests/test_parse_cache.py
+import random
+import sys
+
+import pytest
+
+from toy_robot import CommandParser, ParseCache, Robot, Table
+from toy_robot.cli import OutputBuffer, main, run_lines, VERBOSE
+
+LINES = ["MOVE", " move ", "PLACE 1,2,NORTH", "place 0 , 0 , south", "JUMP", "", "# comment",
+         "PLACE 9,x,EAST", "REPORT", "RIGHT\r"]
+
+
+@pytest.mark.parametrize("line", LINES + [line.encode() for line in LINES] + [b"MOVE\xc2\xa0", b"\xff"])
+def test_same_result_as_parse(line):
+    cache = ParseCache(4)
+    assert cache.parse(line) == CommandParser.parse(line)
+    assert cache.parse(line) == CommandParser.parse(line)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_rejected_lines_are_cached():
+    cache = ParseCache()
+    assert cache.parse(b"JUMP") is None
+    assert cache.parse(b"JUMP") is None
+    assert cache.hits == 1
+    assert len(cache) == 1
+
+
+def test_str_and_bytes_are_separate_keys():
+    cache = ParseCache()
+    assert cache.parse("MOVE") is cache.parse(b"MOVE")
+    assert cache.misses == 2
+
+
+def test_size_is_bounded():
+    cache = ParseCache(8)
+    for x in range(1000):
+        cache.parse(f"PLACE {x},0,NORTH")
+    assert len(cache) == 8
+    assert cache.misses == 1000
+    # the most recently used lines are kept
+    cache.parse("PLACE 999,0,NORTH")
+    cache.parse("PLACE 0,0,NORTH")
+    assert (cache.hits, cache.misses) == (1, 1001)
+
+
+def test_unhashable_lines_bypass_the_cache():
+    cache = ParseCache()
+    assert cache.parse(bytearray(b"PLACE 1,2,EAST")) == CommandParser.parse(b"PLACE 1,2,EAST")
+    assert len(cache) == 0
+
+
+def test_stats_and_clear():
+    cache = ParseCache(16)
+    for line in ["MOVE"] * 3 + ["LEFT"]:
+        cache.parse(line)
+    assert cache.stats() == {"hits": 2, "misses": 2, "size": 2, "maxsize": 16, "hit_rate": 0.5}
+    assert cache.format() == "parse cache: 2 hits, 2 misses (50.0%), 2/16 lines\n"
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+
+def test_maxsize_must_be_positive():
+    with pytest.raises(ValueError):
+        ParseCache(0)
+
+
+def test_run_lines_with_cache_matches_without(capsys):
+    rng = random.Random(5)
+    lines = [(n, rng.choice(LINES).encode()) for n in range(1, 2001)]
+    outputs = []
+    for cache in (None, ParseCache(4)):
+        out = OutputBuffer(sys.stdout)
+        summary = run_lines(lines, Robot(Table()), VERBOSE, out, cache=cache)
+        out.flush()
+        outputs.append((summary, capsys.readouterr().out))
+    assert outputs[0] == outputs[1]
+
+
+def test_cli_parse_cache(tmp_path, capsys):
+    path = tmp_path / "cmd.txt"
+    path.write_text("PLACE 0,0,NORTH\nMOVE\nMOVE\nREPORT\n")
+    main([str(path), "--reports-only"])
+    expected = capsys.readouterr().out
+    main([str(path), "--reports-only", "--parse-cache", "2", "--profile"])
+    captured = capsys.readouterr()
+    assert captured.out == expected
+    assert "parse cache: 1 hits, 3 misses" in captured.err
+
+
+@pytest.mark.parametrize("args", [["--parse-cache", "0"], ["--parse-cache", "8", "--check"],
+                                  ["--parse-cache", "8", "--tagged"], ["--parse-cache", "8", "--batch"]])
+def test_cli_parse_cache_rejects(tmp_path, args):
+    path = tmp_path / "cmd.txt"
+    path.write_text("MOVE\n")
+    with pytest.raises(SystemExit) as exc:
+        main([str(path), *args])
+    assert exc.value.code == 2
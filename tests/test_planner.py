@@ -0,0 +1,116 @@
+# tests/test_planner.py
+import random
+from collections import deque
+
+import pytest
+
+from toy_robot import Robot, Table, Position, Direction, CommandParser
+from toy_robot.obstacles import make_index
+from toy_robot.planner import UNREACHABLE, _search, distance_field, plan, plan_state
+
+
+def forward_bfs(table, start, goals):
+    # reference: plain BFS from the start state
+    t = table.transitions()
+    seen = {start: 0}
+    queue = deque([start])
+    while queue:
+        s = queue.popleft()
+        if s in goals:
+            return seen[s]
+        for nxt in (t.move[s], t.left[s], t.right[s]):
+            if nxt not in seen:
+                seen[nxt] = seen[s] + 1
+                queue.append(nxt)
+    return None
+
+
+def run(table, state, commands):
+    robot = Robot(table)
+    robot.state = state
+    for cmd in commands:
+        robot.execute_command(cmd)
+    return robot
+
+
+@pytest.fixture
+def table():
+    cells = [(2, 0), (2, 1), (2, 2), (2, 3), (4, 4)]
+    return Table(6, 6, make_index(6, 6, cells))
+
+
+def test_plans_are_shortest(table):
+    rng = random.Random(5)
+    for _ in range(200):
+        start = rng.randrange(1, table.state_count)
+        if not table.is_valid(table.decode(start)[0]):
+            continue
+        target = Position(rng.randrange(6), rng.randrange(6))
+        facing = rng.choice([None, *Direction])
+        commands = plan_state(table, start, target, facing)
+        goals = {table.encode(target, f) for f in Direction if facing in (None, f)} if table.is_valid(target) else set()
+        expected = forward_bfs(table, start, goals)
+        if expected is None:
+            assert commands is None
+            continue
+        assert len(commands) == expected
+        robot = run(table, start, commands)
+        assert robot.pos == target and facing in (None, robot.facing)
+
+
+def test_plan_from_robot_uses_shared_commands():
+    robot = Robot(Table())
+    robot.place(Position(0, 0), Direction.NORTH)
+    commands = plan(robot, Position(2, 1), Direction.EAST)
+    assert [c.type.name for c in commands] == ["MOVE", "RIGHT", "MOVE", "MOVE"]
+    assert all(c is CommandParser.SIMPLE_INSTANCES[c.type.name] for c in commands)
+    assert plan(robot, Position(0, 0), Direction.NORTH) == []
+
+
+def test_unreachable_and_invalid_targets(table):
+    robot = Robot(table)
+    robot.place(Position(0, 0), Direction.NORTH)
+    assert plan(robot, Position(2, 0)) is None        # blocked cell
+    assert plan(robot, Position(9, 9)) is None        # off the table
+    walled = Table(3, 1, make_index(3, 1, [(1, 0)]))
+    robot = Robot(walled)
+    robot.place(Position(0, 0), Direction.EAST)
+    assert plan(robot, Position(2, 0)) is None
+    assert distance_field(walled, Position(2, 0))[robot.state] == UNREACHABLE
+
+
+def test_unplaced_robot_raises():
+    with pytest.raises(ValueError):
+        plan(Robot(Table()), Position(1, 1))
+
+
+def test_distance_fields_are_cached(table):
+    distance_field.cache_clear()
+    first = distance_field(table, Position(5, 5), Direction.SOUTH)
+    assert distance_field(table, Position(5, 5), Direction.SOUTH) is first
+    assert distance_field.cache_info().hits == 1
+    with pytest.raises(TypeError):
+        first[0] = 0
+
+
+def test_astar_matches_distance_field(table):
+    rng = random.Random(9)
+    for _ in range(100):
+        start = table.encode(Position(rng.randrange(2), rng.randrange(6)), rng.choice(list(Direction)))
+        target = Position(rng.randrange(3, 6), rng.randrange(6))
+        facing = rng.choice([None, *Direction])
+        commands = _search(table, start, target, facing, limit=10_000)
+        dist = distance_field(table, target, facing)[start]
+        assert (commands is None) == (dist == UNREACHABLE)
+        if commands is not None:
+            assert len(commands) == dist
+
+
+def test_large_table_uses_search():
+    table = Table(100_000, 100_000)
+    robot = Robot(table)
+    robot.place(Position(50_000, 50_000), Direction.WEST)
+    commands = plan(robot, Position(50_003, 49_998), Direction.NORTH)
+    assert len(commands) == 2 + 5 + 1    # turn around, 5 moves, one turn
+    robot.state = run(table, robot.state, commands).state
+    assert robot.report() == "x:50003,y:49998,facing:NORTH"
@@ -0,0 +1,118 @@
+import itertools
+from pathlib import Path
+
+import pytest
+
+from helpers import replay
+from toy_robot import Robot, Table, CompiledProgram
+from toy_robot.command import Position, Direction, CommandType, CommandParser
+from toy_robot.obstacles import HashedObstacles
+from toy_robot.robot import NOT_PLACED
+
+CMD_TXT = Path(__file__).resolve().parents[1] / "cmd.txt"
+
+
+def replay_from(table, state, commands):
+    r = Robot(table)
+    r.state = state
+    results = list(replay(r, commands))
+    return r, tuple(result for c, result in zip(commands, results) if c.type == CommandType.REPORT)
+
+
+def test_state_encoding_round_trips():
+    t = Table(width=3, height=2)
+    seen = set()
+    for x, y, d in itertools.product(range(3), range(2), Direction):
+        s = t.encode(Position(x, y), d)
+        assert t.decode(s) == (Position(x, y), d)
+        seen.add(s)
+    assert t.encode(None, None) == NOT_PLACED
+    assert t.decode(NOT_PLACED) == (None, None)
+    assert seen | {NOT_PLACED} == set(range(t.state_count))
+
+
+def test_robot_state_property():
+    r = Robot(Table())
+    assert r.state == NOT_PLACED
+    r.place(Position(2, 3), Direction.WEST)
+    other = Robot(Table())
+    other.state = r.state
+    assert str(other) == "Robot at (2,3) facing WEST"
+
+
+@pytest.mark.parametrize("table", [Table(), Table(width=3, height=2)])
+def test_compiled_cmd_txt_matches_replay_for_every_start(table):
+    lines = CMD_TXT.read_text().splitlines()
+    commands = [c for c in map(CommandParser.parse, lines) if c is not None]
+    prog = CompiledProgram.from_lines(lines, table)
+    for start in range(table.state_count):
+        want_robot, want_reports = replay_from(table, start, commands)
+        assert prog.end_state(start) == want_robot.state
+        assert prog.reports(start) == want_reports
+
+
+def test_script_without_place_keeps_starts_apart():
+    table = Table(width=2, height=2)
+    commands = [CommandParser.parse(s) for s in ["MOVE", "REPORT", "RIGHT", "MOVE", "REPORT"]]
+    prog = CompiledProgram.compile(commands, table)
+    for start in range(table.state_count):
+        want_robot, want_reports = replay_from(table, start, commands)
+        assert prog.end_state(start) == want_robot.state
+        assert prog.reports(start) == want_reports
+
+
+def test_run_updates_robot_and_returns_reports():
+    prog = CompiledProgram.from_lines(["MOVE", "REPORT", "LEFT", "MOVE", "REPORT"])
+    robot, reports = prog.run_from(Position(1, 1), Direction.NORTH)
+    assert reports == ("x:1,y:2,facing:NORTH", "x:0,y:2,facing:WEST")
+    assert str(robot) == "Robot at (0,2) facing WEST"
+
+    unplaced = Robot(Table())
+    assert prog.run(unplaced) == ("Robot not placed", "Robot not placed")
+    assert not unplaced.is_placed()
+
+
+@pytest.mark.parametrize("table", [Table(6, 6), Table(3, 3), Table(5, 5, HashedObstacles(5, 5, [(1, 2)]))])
+def test_run_rejects_robot_on_another_table(table):
+    prog = CompiledProgram.from_lines(["PLACE 0,0,NORTH", "MOVE", "REPORT"])
+    robot = Robot(table)
+    robot.state = table.encode(Position(2, 2), Direction.EAST)
+    with pytest.raises(ValueError, match="compiled for"):
+        prog.run(robot)
+    assert robot.state == table.encode(Position(2, 2), Direction.EAST)
+
+
+@pytest.mark.parametrize("pos", [Position(5, 0), Position(-1, 1), Position(4, 5), Position(1, 2)])
+def test_run_from_rejects_illegal_starts(pos):
+    table = Table(5, 5, HashedObstacles(5, 5, [(1, 2)]))
+    prog = CompiledProgram.from_lines(["MOVE", "REPORT"], table)
+    with pytest.raises(ValueError, match="cannot start"):
+        prog.run_from(pos, Direction.NORTH)
+    robot, reports = prog.run_from(None, None)
+    assert not robot.is_placed() and reports == ("Robot not placed",)
+
+
+def test_hand_set_states_are_checked():
+    table = Table(5, 5, HashedObstacles(5, 5, [(1, 2)]))
+    prog = CompiledProgram.from_lines(["MOVE", "REPORT"], table)
+    blocked = table.encode(Position(1, 2), Direction.NORTH)
+    robot = Robot(table)
+    for state in (-1, table.state_count, blocked):
+        with pytest.raises(ValueError):
+            robot.state = state
+        with pytest.raises(ValueError):
+            prog.reports(state)
+        with pytest.raises(ValueError):
+            prog.end_state(state)
+    assert not robot.is_placed()
+
+
+def test_empty_program_is_identity():
+    prog = CompiledProgram.compile([])
+    assert all(prog.end_state(s) == s for s in range(Table().state_count))
+    assert prog.reports(5) == ()
+
+
+def test_too_many_states_rejected():
+    with pytest.raises(ValueError):
+        CompiledProgram.compile([], Table(width=1000, height=1000))
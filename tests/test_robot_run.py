@@ -0,0 +1,95 @@
+# tests/test_robot_run.py
+import pytest
+
+from helpers import random_lines, replay
+from toy_robot import Robot, RunResult, Table, CommandParser, CommandType, ParseCache
+from toy_robot.obstacles import make_index
+from toy_robot.world import World
+
+LINES = ["MOVE", "MOVE", "LEFT", "RIGHT", "REPORT", "JUMP", "", "# comment",
+         "PLACE 0,0,NORTH", "PLACE 2,3,EAST", "PLACE 9,9,WEST", "place 1 , 1 , south"]
+
+
+def bits(result: RunResult):
+    return [result.succeeded(i) for i in range(len(result))]
+
+
+@pytest.mark.parametrize("table", [Table(), Table(5, 5, make_index(5, 5, [(1, 1), (0, 2)])), Table(1000, 1000)],
+                         ids=["plain", "obstacles", "large"])
+@pytest.mark.parametrize("seed", range(3))
+def test_run_matches_execute_command(table, seed):
+    commands = [c for c in map(CommandParser.parse, random_lines(3000, seed, LINES)) if c is not None]
+    reference = Robot(table)
+    results = list(replay(reference, commands))
+    successes = [r is not False for r in results]
+    reports = [r for c, r in zip(commands, results) if c.type == CommandType.REPORT]
+
+    robot = Robot(table)
+    result = robot.run(commands)
+    assert result.state == robot.state == reference.state
+    assert bits(result) == successes
+    assert result.reports == reports
+    assert result.successful == sum(successes)
+    assert result.failed == len(commands) - sum(successes)
+
+
+def test_run_continues_from_current_state():
+    robot = Robot(Table())
+    robot.run(CommandParser.parse(line) for line in ["PLACE 0,0,NORTH", "MOVE"])
+    result = robot.run([CommandParser.parse("REPORT")])
+    assert result.reports == ["x:0,y:1,facing:NORTH"]
+
+
+def test_run_lines_counts_unparsed_lines_as_failures():
+    result = Robot(Table()).run_lines(["MOVE", "PLACE 0,0,NORTH", "JUMP", "", "MOVE", "REPORT"])
+    assert bits(result) == [False, True, False, False, True, True]
+    assert result.reports == ["x:0,y:1,facing:NORTH"]
+    assert len(result.successes) == 1
+
+
+def test_run_lines_with_cache():
+    lines = random_lines(2000, 9, LINES)
+    cache = ParseCache(16)
+    assert Robot(Table()).run_lines(lines, cache) == Robot(Table()).run_lines(lines)
+    assert cache.hits > 0
+
+
+def test_run_lines_accepts_bytes():
+    result = Robot(Table()).run_lines([b"PLACE 1,2,EAST", b"REPORT"])
+    assert result.reports == ["x:1,y:2,facing:EAST"]
+
+
+def test_empty_run():
+    result = Robot(Table()).run([])
+    assert (result.state, result.count, result.successes, result.reports) == (0, 0, bytearray(), [])
+    with pytest.raises(IndexError):
+        result.succeeded(0)
+
+
+def test_bitmap_layout():
+    # command i is bit i % 8 of byte i // 8
+    result = Robot(Table()).run_lines(["PLACE 0,0,NORTH"] + ["JUMP"] * 8 + ["LEFT"])
+    assert result.successes == bytearray([0b00000001, 0b00000010])
+
+
+def test_state_is_kept_when_commands_raise():
+    def commands():
+        yield CommandParser.parse("PLACE 0,0,NORTH")
+        yield CommandParser.parse("MOVE")
+        raise RuntimeError("stream broke")
+
+    robot = Robot(Table())
+    with pytest.raises(RuntimeError):
+        robot.run(commands())
+    assert robot.report() == "x:0,y:1,facing:NORTH"
+
+
+def test_world_robots_respect_occupancy():
+    world = World(Table())
+    blocker = world.add_robot()
+    blocker.run_lines(["PLACE 0,1,NORTH"])
+    robot = world.add_robot()
+    result = robot.run_lines(["PLACE 0,1,EAST", "PLACE 0,0,NORTH", "MOVE", "RIGHT", "MOVE", "REPORT"])
+    assert bits(result) == [False, True, False, True, True, True]
+    assert result.reports == ["x:1,y:0,facing:EAST"]
+    assert world.is_occupied(1, 0) and not world.is_occupied(0, 0)
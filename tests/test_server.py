@@ -0,0 +1,146 @@
+import asyncio
+import socket
+
+import pytest
+
+from toy_robot import Table
+from toy_robot.server import RobotServer
+
+
+async def start(**options):
+    server = RobotServer(**options)
+    tcp = await server.start_tcp("127.0.0.1", 0)
+    return server, tcp.sockets[0].getsockname()[1]
+
+
+async def exchange(port, payload: bytes, replies: int):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(payload)
+    await writer.drain()
+    lines = [await reader.readline() for _ in range(replies)]
+    writer.close()
+    return lines
+
+
+def test_pipelined_commands_get_replies_in_order():
+    async def scenario():
+        server, port = await start()
+        try:
+            return await exchange(port, b"REPORT\nPLACE 0,0,NORTH\nMOVE\n# comment\n\nREPORT\nJUMP\nLEFT\nREPORT\n", 4)
+        finally:
+            server.close()
+
+    assert asyncio.run(scenario()) == [
+        b"Robot not placed\n",
+        b"x:0,y:1,facing:NORTH\n",
+        b"Invalid command\n",
+        b"x:0,y:1,facing:WEST\n",
+    ]
+
+
+
+def test_non_ascii_blank_and_comment_lines_are_ignored():
+    async def scenario():
+        server, port = await start()
+        try:
+            return await exchange(port, "\xa0# note\n\u3000\n\x1c\nJUMP\xa0\nREPORT\n".encode(), 2)
+        finally:
+            server.close()
+
+    assert asyncio.run(scenario()) == [b"Invalid command\n", b"Robot not placed\n"]
+
+def test_sessions_have_independent_robots():
+    async def scenario():
+        server, port = await start(table=Table(width=3, height=3))
+        try:
+            r1, w1 = await asyncio.open_connection("127.0.0.1", port)
+            r2, w2 = await asyncio.open_connection("127.0.0.1", port)
+            w1.write(b"PLACE 2,2,SOUTH\nREPORT\n")
+            w2.write(b"REPORT\n")
+            out = [await r1.readline(), await r2.readline()]
+            w1.close()
+            w2.close()
+            return out
+        finally:
+            server.close()
+
+    assert asyncio.run(scenario()) == [b"x:2,y:2,facing:SOUTH\n", b"Robot not placed\n"]
+
+
+def test_oversized_line_is_rejected_and_session_continues():
+    async def scenario():
+        server, port = await start(max_line=16)
+        try:
+            return await exchange(port, b"PLACE " + b"1" * 100 + b",1,NORTH\nREPORT\n", 2)
+        finally:
+            server.close()
+
+    assert asyncio.run(scenario()) == [b"Invalid command\n", b"Robot not placed\n"]
+
+
+def test_last_line_without_newline_is_executed():
+    async def scenario():
+        server, port = await start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"PLACE 1,1,EAST\nREPORT")
+            writer.write_eof()
+            out = await reader.read()
+            writer.close()
+            return out
+        finally:
+            server.close()
+
+    assert asyncio.run(scenario()) == b"x:1,y:1,facing:EAST\n"
+
+
+def test_max_sessions_turns_away_extra_clients():
+    async def scenario():
+        server, port = await start(max_sessions=1)
+        try:
+            r1, w1 = await asyncio.open_connection("127.0.0.1", port)
+            w1.write(b"REPORT\n")
+            await r1.readline()
+            r2, w2 = await asyncio.open_connection("127.0.0.1", port)
+            out = await r2.read()
+            w1.close()
+            w2.close()
+            return out
+        finally:
+            server.close()
+
+    assert asyncio.run(scenario()) == b"Server busy\n"
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_unix_socket(tmp_path):
+    path = str(tmp_path / "robot.sock")
+
+    async def scenario():
+        server = RobotServer()
+        await server.start_unix(path)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b"PLACE 3,4,WEST\nREPORT\n")
+            out = await reader.readline()
+            writer.close()
+            return out
+        finally:
+            server.close()
+
+    assert asyncio.run(scenario()) == b"x:3,y:4,facing:WEST\n"
+
+
+def test_parse_cache_is_shared_by_sessions():
+    async def scenario():
+        server, port = await start(parse_cache=16)
+        try:
+            first = await exchange(port, b"PLACE 0,0,NORTH\nREPORT\n", 1)
+            second = await exchange(port, b"PLACE 0,0,NORTH\nMOVE\nREPORT\n", 1)
+            return server.parse_cache, first + second
+        finally:
+            server.close()
+
+    cache, replies = asyncio.run(scenario())
+    assert replies == [b"x:0,y:0,facing:NORTH\n", b"x:0,y:1,facing:NORTH\n"]
+    assert (cache.hits, cache.misses) == (2, 3)
@@ -0,0 +1,74 @@
+# tests/test_shared_fleet.py
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from helpers import random_lines, replay
+from toy_robot import Robot, Table, Command, CommandParser, CommandType, Position, Direction
+from toy_robot.obstacles import make_index
+from toy_robot import shared_fleet
+from toy_robot.shared_fleet import SharedFleet
+
+LINES = ["MOVE", "MOVE", "LEFT", "RIGHT", "REPORT",
+         "PLACE 0,0,NORTH", "PLACE 3,2,WEST", "PLACE 1,1,SOUTH", "PLACE 9,9,EAST"]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_matches_scalar_robots(workers):
+    table = Table(5, 5, make_index(5, 5, [(2, 2), (0, 3)]))
+    size = 37
+    rng = random.Random(11)
+    robots = [Robot(table) for _ in range(size)]
+    commands = [CommandParser.parse(line) for line in random_lines(300, 4, LINES)]
+
+    with SharedFleet(table, size, workers=workers) as shared:
+        assert len(shared.shards) == workers
+        assert shared.shards[0][0] == 0 and shared.shards[-1][1] == size
+        # give every robot its own start state first
+        for i, robot in enumerate(robots):
+            x, y, f = rng.randrange(5), rng.randrange(5), rng.choice(list(Direction))
+            robot.place(Position(x, y), f)
+            mask = np.zeros(size, dtype=bool)
+            mask[i] = True
+            shared.fleet.place(x, y, f, mask)
+
+        reports = shared.run(commands)
+
+        results = [list(replay(robot, commands)) for robot in robots]
+        successes = [sum(r is not False for r in res) for res in results]
+        expected_reports = [[res[i] for res in results]
+                            for i, cmd in enumerate(commands) if cmd.type == CommandType.REPORT]
+
+        assert reports == expected_reports
+        assert shared.successes.tolist() == successes
+        for i, robot in enumerate(robots):
+            assert str(shared.fleet.robot(i)) == str(robot)
+
+
+def test_runs_can_continue():
+    with SharedFleet(Table(), 10, workers=2) as shared:
+        shared.run([CommandParser.parse("PLACE 0,0,NORTH")])
+        assert shared.run([CommandParser.parse(l) for l in ["MOVE", "RIGHT", "MOVE", "REPORT"]]) == \
+            [["x:1,y:1,facing:EAST"] * 10]
+        assert shared.run([]) == []
+
+
+def test_worker_errors_are_raised():
+    with SharedFleet(Table(), 4, workers=2) as shared:
+        with pytest.raises(RuntimeError):
+            shared.run([Command(CommandType.PLACE, 0, 0, None)])
+        # the workers are still usable afterwards
+        assert shared.run([CommandParser.parse("REPORT")]) == [["Robot not placed"] * 4]
+
+
+
+def test_dead_worker_is_an_error(monkeypatch):
+    monkeypatch.setattr(shared_fleet, "WORKER_POLL_SECONDS", 0.05)
+    with SharedFleet(Table(), 4, workers=2) as shared:
+        proc = shared._procs[1]
+        proc.kill()
+        proc.join()
+        with pytest.raises(RuntimeError, match="fleet worker exited"):
+            shared.run([CommandParser.parse("MOVE")])
@@ -0,0 +1,124 @@
+# tests/test_tagged.py
+import io
+import multiprocessing as mp
+import os
+import random
+
+import pytest
+
+from toy_robot import Robot, Table, CommandParser, CommandType
+from toy_robot.cli import OutputBuffer, QUIET, REPORTS_ONLY, SUMMARY, VERBOSE, main
+from toy_robot import tagged
+from toy_robot.tagged import run_tagged, shard_of
+
+
+def test_split_and_parse_tagged():
+    assert CommandParser.split_tag("R17: MOVE") == ("R17", " MOVE")
+    assert CommandParser.split_tag(b"  bot-2.a :place 1,2,north") == (b"bot-2.a", b"place 1,2,north")
+    assert CommandParser.parse_tagged(b"R1:REPORT") == ("R1", CommandParser.SIMPLE_INSTANCES["REPORT"])
+    assert CommandParser.parse_tagged("R1: PLACE 1,2,EAST")[1].x == 1
+    for line in ["MOVE", ": MOVE", "R 1: MOVE", "R1 MOVE"]:
+        assert CommandParser.split_tag(line) is None
+    assert CommandParser.parse_tagged("R1: JUMP") is None
+
+
+def test_shard_of_is_stable():
+    assert shard_of(b"R17", 4) == shard_of(b"R17", 4)
+    assert {shard_of(f"R{i}".encode(), 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def tagged_log(n, seed, robots=12):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        r = rng.random()
+        tag = f"R{rng.randrange(robots)}"
+        if r < 0.05:
+            lines.append(rng.choice(["MOVE", "# comment", "", "R1 MOVE"]))
+        elif r < 0.15:
+            lines.append(f"{tag}: PLACE {rng.randint(-1, 5)},{rng.randint(-1, 5)},{rng.choice(['NORTH', 'WEST'])}")
+        else:
+            lines.append(f"{tag}: {rng.choice(['MOVE', 'MOVE', 'LEFT', 'RIGHT', 'REPORT', 'JUMP'])}")
+    return "\n".join(lines) + "\n"
+
+
+def scan(text):
+    return [(n, line.strip().encode()) for n, line in enumerate(text.split("\n"), 1)
+            if line.strip() and not line.strip().startswith("#")]
+
+
+def reference(text, mode):
+    # each robot's lines, run through the single-robot CLI loop
+    robots, first_seen = {}, {}
+    out, counts = [], [0, 0, 0]
+    for n, line in scan(text):
+        parsed = CommandParser.parse_tagged(line)
+        if parsed is None:
+            counts[2] += 1
+            if mode == VERBOSE:
+                out.append((n, f"[line {n}] >>> {line.decode()}\nInvalid command\n" + "-" * 40 + "\n"))
+            continue
+        tag, cmd = parsed
+        robot = robots.setdefault(tag, Robot(Table()))
+        first_seen.setdefault(tag, n)
+        old = str(robot)
+        result = robot.execute_command(cmd)
+        counts[result is False] += 1
+        if mode == VERBOSE:
+            out.append((n, f"[line {n}] >>> {line.decode()}\nis_command_successful: {result}, "
+                           f"old_state: {tag}: {old}, new_state: {tag}: {robot}\n" + "-" * 40 + "\n"))
+        elif mode == REPORTS_ONLY and cmd.type == CommandType.REPORT:
+            out.append((n, f"{tag}: {result}\n"))
+    if mode == QUIET:
+        out = [(first_seen[t], f"{t}: {r}\n") for t, r in robots.items()]
+    if mode == SUMMARY:
+        return (f"commands: {sum(counts)}\nsuccessful: {counts[0]}\nfailed: {counts[1]}\ninvalid: {counts[2]}\n")
+    return "".join(text for _, text in sorted(out))
+
+
+@pytest.mark.parametrize("mode", [VERBOSE, REPORTS_ONLY, QUIET, SUMMARY])
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_matches_per_robot_sequential_run(mode, jobs):
+    text = tagged_log(1500, seed=jobs)
+    stream = io.StringIO()
+    out = OutputBuffer(stream)
+    run_tagged(scan(text), mode, out, jobs=jobs, batch_lines=97)
+    out.flush()
+    assert stream.getvalue() == reference(text, mode)
+
+
+@pytest.mark.parametrize("jobs", [0, -1])
+def test_rejects_jobs_below_1(jobs):
+    with pytest.raises(ValueError, match="jobs must be at least 1"):
+        run_tagged(scan("R1: MOVE\n"), QUIET, OutputBuffer(io.StringIO()), jobs=jobs)
+
+
+
+@pytest.mark.skipif(mp.get_start_method() != "fork", reason="workers must inherit the patched Shard")
+def test_dead_worker_is_an_error(monkeypatch):
+    monkeypatch.setattr(tagged, "WORKER_POLL_SECONDS", 0.05)
+    monkeypatch.setattr(tagged.Shard, "run", lambda self, batch: os._exit(3))
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        run_tagged(scan("R1: MOVE\nR2: MOVE\n"), QUIET, OutputBuffer(io.StringIO()), jobs=2)
+
+def test_cli_tagged(tmp_path, capsys):
+    path = tmp_path / "log.txt"
+    path.write_text("R1: PLACE 0,0,NORTH\nR2: PLACE 4,4,SOUTH\nR1: MOVE\nR2: MOVE\nR2: REPORT\nR1: REPORT\n")
+    main([str(path), "--tagged", "--jobs", "2", "--reports-only"])
+    assert capsys.readouterr().out == "R2: x:4,y:3,facing:SOUTH\nR1: x:0,y:1,facing:NORTH\n"
+
+
+def test_cli_tagged_missing_file(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main([str(tmp_path / "nope.txt"), "--tagged", "--jobs", "2"])
+    assert exc.value.code == 1
+    assert "Error: file not found" in capsys.readouterr().out
+
+
+def test_cli_tagged_rejects_jobs_below_1(tmp_path, capsys):
+    path = tmp_path / "log.txt"
+    path.write_text("R1: MOVE\n")
+    with pytest.raises(SystemExit) as exc:
+        main([str(path), "--tagged", "--jobs", "-1"])
+    assert exc.value.code == 2
+    assert "--jobs must be at least 1" in capsys.readouterr().err
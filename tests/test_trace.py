@@ -0,0 +1,132 @@
+# tests/test_trace.py
+import csv
+import json
+
+import pytest
+
+from toy_robot import Robot, Table, CommandParser, CommandType
+from toy_robot.cli import main
+from toy_robot.trace import TraceRecorder
+
+LINES = ["MOVE", "PLACE 0,0,NORTH", "MOVE", "JUMP", "REPORT", "LEFT", "MOVE"]
+
+EXPECTED = [
+    (1, "MOVE", False, None, None, None),
+    (2, "PLACE", True, 0, 0, "NORTH"),
+    (3, "MOVE", True, 0, 1, "NORTH"),
+    (4, "INVALID", False, 0, 1, "NORTH"),
+    (5, "REPORT", True, 0, 1, "NORTH"),
+    (6, "LEFT", True, 0, 1, "WEST"),
+    (7, "MOVE", False, 0, 1, "WEST"),
+]
+
+
+def record(lines, capacity=None):
+    table = Table()
+    robot, trace = Robot(table), TraceRecorder(table, capacity)
+    for lineno, line in enumerate(lines, 1):
+        cmd = CommandParser.parse(line)
+        if cmd is None:
+            trace.record(lineno, None, False, robot.state)
+        else:
+            result = robot.execute_command(cmd)
+            trace.record(lineno, cmd.type, result is not False, robot.state)
+    return trace
+
+
+def test_rows_decode_states():
+    trace = record(LINES)
+    assert list(trace.rows()) == EXPECTED
+    assert len(trace) == 7 and trace.dropped == 0
+    assert trace.columns()["type"] == [row[1] for row in EXPECTED]
+
+
+@pytest.mark.parametrize("capacity", [1, 3, 7, 10])
+def test_ring_buffer_keeps_last_rows(capacity):
+    trace = record(LINES, capacity)
+    assert list(trace.rows()) == EXPECTED[-capacity:]
+    assert trace.dropped == max(len(LINES) - capacity, 0)
+
+
+def test_empty_trace():
+    trace = TraceRecorder(Table(), capacity=4)
+    assert list(trace.rows()) == []
+    assert trace.columns()["lineno"] == []
+    assert trace.format() == ""
+    with pytest.raises(ValueError):
+        TraceRecorder(Table(), capacity=0)
+
+
+def test_csv_and_jsonl(tmp_path):
+    trace = record(LINES, capacity=5)
+    trace.save(tmp_path / "t.csv")
+    with open(tmp_path / "t.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert [int(r["lineno"]) for r in rows] == [3, 4, 5, 6, 7]
+    assert rows[-1]["facing"] == "WEST"
+
+    trace.save(tmp_path / "t.jsonl")
+    rows = [json.loads(line) for line in (tmp_path / "t.jsonl").read_text().splitlines()]
+    assert rows[0] == {"lineno": 3, "type": "MOVE", "success": True, "x": 0, "y": 1, "facing": "NORTH"}
+
+    with pytest.raises(ValueError):
+        trace.save(tmp_path / "t.txt")
+
+
+def test_numpy_export(tmp_path):
+    np = pytest.importorskip("numpy")
+    for capacity in (None, 4):
+        trace = record(LINES, capacity)
+        arr = trace.to_numpy()
+        expected = EXPECTED[-capacity:] if capacity else EXPECTED
+        assert arr["lineno"].tolist() == [r[0] for r in expected]
+        assert arr["success"].tolist() == [r[2] for r in expected]
+        assert arr["x"].tolist() == [-1 if r[3] is None else r[3] for r in expected]
+    trace.save(tmp_path / "t.npy")
+    loaded = np.load(tmp_path / "t.npy")
+    assert loaded["type"].tolist()[-1] == list(CommandType).index(CommandType.MOVE)
+    assert loaded["facing"].tolist()[-1] == 3
+
+
+def test_format():
+    text = record(LINES[:2]).format()
+    assert text == "[line 1] MOVE    failed  not placed\n[line 2] PLACE   ok      (0,0) NORTH\n"
+
+
+def test_cli_trace(tmp_path, capsys):
+    path = tmp_path / "cmds.txt"
+    path.write_text("\n".join(LINES) + "\n")
+    main([str(path), "--summary", "--trace", str(tmp_path / "t.jsonl"), "--trace-capacity", "2"])
+    assert "invalid: 1" in capsys.readouterr().out
+    rows = [json.loads(line) for line in (tmp_path / "t.jsonl").read_text().splitlines()]
+    assert [r["lineno"] for r in rows] == [6, 7]
+
+
+def test_cli_trace_rejects_missing_directory(tmp_path, capsys):
+    path = tmp_path / "cmds.txt"
+    path.write_text("\n".join(LINES) + "\n")
+    with pytest.raises(SystemExit) as exc:
+        main([str(path), "--trace", str(tmp_path / "missing" / "t.csv")])
+    assert exc.value.code == 2
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "--trace directory not found" in captured.err
+
+
+def test_cli_trace_write_error_names_the_trace(tmp_path, capsys):
+    path = tmp_path / "cmds.txt"
+    path.write_text("\n".join(LINES) + "\n")
+    trace = tmp_path / "t.csv"
+    trace.mkdir()
+    with pytest.raises(SystemExit) as exc:
+        main([str(path), "--quiet", "--trace", str(trace)])
+    assert exc.value.code == 1
+    out = capsys.readouterr().out
+    assert f"Error: cannot write trace {trace}" in out
+    assert "file not found" not in out
+
+
+def test_cli_trace_rejects_unknown_format(tmp_path):
+    with pytest.raises(SystemExit) as exc:
+        main([str(tmp_path / "x.txt"), "--trace", str(tmp_path / "t.xml")])
+    assert exc.value.code == 2
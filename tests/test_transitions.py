@@ -0,0 +1,60 @@
+import itertools
+
+import pytest
+from toy_robot import Robot, Table
+from toy_robot.command import Position, Direction
+from toy_robot.robot import NOT_PLACED, Transitions, _MoveRule, _TurnRule
+
+
+def step(table, state, action):
+    """Reference transition built from Position/Direction arithmetic."""
+    pos, facing = table.decode(state)
+    if pos is None:
+        return state
+    if action == "left":
+        return table.encode(pos, facing.left())
+    if action == "right":
+        return table.encode(pos, facing.right())
+    dx, dy = Robot.MOVE_OFFSETS[facing]
+    nxt = Position(pos.x + dx, pos.y + dy)
+    return table.encode(nxt, facing) if table.is_valid(nxt) else state
+
+
+@pytest.mark.parametrize("table", [Table(), Table(width=3, height=2), Table(width=1, height=1)])
+def test_precomputed_tables_match_reference(table):
+    t = table.transitions()
+    assert isinstance(t.move, list)
+    for state, action in itertools.product(range(table.state_count), ["move", "left", "right"]):
+        assert getattr(t, action)[state] == step(table, state, action)
+
+
+def test_computed_rules_match_reference():
+    table = Table(width=4, height=3)
+    rules = Transitions(_MoveRule(table), _TurnRule(-1), _TurnRule(1))
+    for state, action in itertools.product(range(table.state_count), ["move", "left", "right"]):
+        assert getattr(rules, action)[state] == step(table, state, action)
+
+
+def test_large_table_uses_computed_rules():
+    table = Table(width=100_000, height=100_000)
+    assert not isinstance(table.transitions().move, list)
+    r = Robot(table)
+    assert r.place(Position(99_999, 5), Direction.EAST)
+    assert r.move() is False
+    r.left()
+    assert r.move() is True
+    assert str(r) == "Robot at (99999,6) facing NORTH"
+
+
+def test_equal_tables_share_transitions():
+    assert Table(5, 5).transitions() is Table().transitions()
+
+
+def test_robot_state_is_one_slot():
+    r = Robot(Table())
+    assert not hasattr(r, "__dict__")
+    assert r.state == NOT_PLACED
+    r.place(Position(1, 2), Direction.SOUTH)
+    assert r.state == Table().encode(Position(1, 2), Direction.SOUTH)
+    assert r.pos == Position(1, 2)
+    assert r.facing == Direction.SOUTH
@@ -0,0 +1,103 @@
+# tests/test_world.py
+import random
+
+import pytest
+
+from toy_robot import Table, CommandParser, Position, Direction
+from toy_robot.robot import Robot
+from toy_robot.world import World, DenseOccupancy, HashedOccupancy, make_occupancy
+
+
+@pytest.fixture(params=["dense", "hashed"])
+def world(request):
+    return World(Table(), kind=request.param)
+
+
+def test_make_occupancy_kinds():
+    assert isinstance(make_occupancy(5, 5), DenseOccupancy)
+    assert isinstance(make_occupancy(100_000, 100_000), HashedOccupancy)
+    assert isinstance(make_occupancy(5, 5, "hashed"), HashedOccupancy)
+    with pytest.raises(ValueError):
+        make_occupancy(5, 5, "tree")
+
+
+def test_place_rejects_occupied_cell(world):
+    a, b = world.add_robot(), world.add_robot()
+    assert a.place(Position(1, 1), Direction.NORTH)
+    assert not b.place(Position(1, 1), Direction.SOUTH)
+    assert not b.is_placed()
+    assert b.place(Position(1, 2), Direction.SOUTH)
+    assert world.is_occupied(1, 1) and world.is_occupied(1, 2)
+    assert not world.is_free(1, 1) and world.is_free(2, 2) and not world.is_free(5, 0)
+
+
+def test_replace_on_own_cell_and_elsewhere(world):
+    a = world.add_robot()
+    assert a.place(Position(0, 0), Direction.NORTH)
+    assert a.place(Position(0, 0), Direction.EAST)
+    assert a.facing == Direction.EAST
+    assert a.place(Position(3, 3), Direction.EAST)
+    assert not world.is_occupied(0, 0)
+    assert len(world.occupancy) == 1
+
+
+def test_move_blocked_by_other_robot(world):
+    a, b = world.add_robot(), world.add_robot()
+    a.place(Position(0, 0), Direction.NORTH)
+    b.place(Position(0, 2), Direction.SOUTH)
+    assert a.move()
+    assert not a.move()
+    assert not b.move()
+    assert a.pos == Position(0, 1) and b.pos == Position(0, 2)
+    b.remove()
+    assert not world.is_occupied(0, 2)
+    assert a.move()
+
+
+def test_advance_stops_before_other_robot(world):
+    a, b = world.add_robot(), world.add_robot()
+    a.place(Position(0, 0), Direction.EAST)
+    b.place(Position(3, 0), Direction.NORTH)
+    assert a.advance(10) == 2
+    assert a.pos == Position(2, 0)
+    assert sorted(world.occupancy.packed_cells()) == [2, 3]
+
+
+def test_state_setter_keeps_occupancy(world):
+    a, b = world.add_robot(), world.add_robot()
+    a.place(Position(0, 0), Direction.NORTH)
+    b.state = world.table.encode(Position(4, 4), Direction.WEST)
+    assert world.is_occupied(4, 4)
+    with pytest.raises(ValueError):
+        b.state = a.state
+
+
+@pytest.mark.parametrize("kind", ["dense", "hashed"])
+def test_matches_plain_robots_when_far_apart(kind):
+    # robots that never meet behave exactly like independent Robots
+    rng = random.Random(3)
+    table = Table(20, 20)
+    world = World(table, kind)
+    rows = [0, 10]
+    pairs = []
+    for y in rows:
+        w, r = world.add_robot(), Robot(table)
+        w.place(Position(0, y), Direction.EAST)
+        r.place(Position(0, y), Direction.EAST)
+        pairs.append((w, r))
+    for _ in range(300):
+        line = rng.choice(["MOVE", "MOVE", "REPORT"])
+        cmd = CommandParser.parse(line)
+        for w, r in pairs:
+            assert w.execute_command(cmd) == r.execute_command(cmd)
+
+
+def test_occupancy_tracks_every_robot(world):
+    rng = random.Random(7)
+    robots = [world.add_robot() for _ in range(8)]
+    lines = ["MOVE", "LEFT", "RIGHT", "PLACE 1,1,NORTH", "PLACE 2,3,EAST", "PLACE 4,0,WEST"]
+    for _ in range(2000):
+        rng.choice(robots).execute_command(CommandParser.parse(rng.choice(lines)))
+        cells = [r.pos.y * 5 + r.pos.x for r in robots if r.is_placed()]
+        assert len(cells) == len(set(cells))
+        assert sorted(world.occupancy.packed_cells()) == sorted(cells)